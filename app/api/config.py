@@ -0,0 +1,33 @@
+import os
+from dotenv import load_dotenv
+
+load_dotenv()
+
+# Request profiling, see app.api.middleware.ProfilingMiddleware
+PROFILING_ENABLED = os.getenv("PROFILING_ENABLED", "false") == "true"
+PROFILING_SAMPLE_RATE = float(os.getenv("PROFILING_SAMPLE_RATE", "0.0"))
+PROFILING_HEADER = os.getenv("PROFILING_HEADER", "X-Profile")
+PROFILING_OUTPUT_DIR = os.getenv("PROFILING_OUTPUT_DIR", "./profiles")
+PROFILING_SLOW_MS = float(os.getenv("PROFILING_SLOW_MS", "1000"))
+
+# Per-request deadline, see app.api.middleware.DeadlineMiddleware
+REQUEST_DEADLINE_MS = float(os.getenv("REQUEST_DEADLINE_MS", "9000"))
+REQUEST_DEADLINE_HEADER = os.getenv("REQUEST_DEADLINE_HEADER", "X-Request-Deadline-Ms")
+
+# Rendered responses of seeded, non-LLM quiz requests, see app.api.response_cache. 0 disables the cache.
+RESPONSE_CACHE_MAX_BYTES = int(os.getenv("RESPONSE_CACHE_MAX_BYTES", str(32 * 1024 * 1024)))
+
+# Sentences kept per user in the reading-history bank, oldest dropped first.
+USER_SENTENCE_BANK_SIZE = int(os.getenv("USER_SENTENCE_BANK_SIZE", "2000"))
+
+# Response compression: bodies below COMPRESSION_MIN_SIZE bytes are sent as they are,
+# and only content types starting with one of COMPRESSION_CONTENT_TYPES are compressed.
+# Brotli is used when the optional `brotli` package is installed.
+COMPRESSION_ENABLED = os.getenv("COMPRESSION_ENABLED", "true") == "true"
+COMPRESSION_MIN_SIZE = int(os.getenv("COMPRESSION_MIN_SIZE", "1024"))
+COMPRESSION_CONTENT_TYPES = tuple(
+    t.strip() for t in os.getenv("COMPRESSION_CONTENT_TYPES", "application/json,application/x-ndjson,text/").split(",")
+    if t.strip()
+)
+COMPRESSION_GZIP_LEVEL = int(os.getenv("COMPRESSION_GZIP_LEVEL", "6"))
+COMPRESSION_BROTLI_QUALITY = int(os.getenv("COMPRESSION_BROTLI_QUALITY", "4"))
@@ -0,0 +1,60 @@
+"""
+Strong ETags and `If-None-Match` handling for read-only endpoints.
+
+The dataset endpoints derive their ETag from the dataset's `version`, which every
+write to the dataset increments, plus the request parameters, so checking for a
+change costs one primary key lookup instead of running the query.
+"""
+import hashlib
+
+import orjson
+from fastapi import Request, Response
+
+# Suffixes `CompressionMiddleware` appends to the ETag of a compressed response.
+ENCODING_SUFFIXES = ("-gzip", "-br")
+
+
+def make_etag(*parts) -> str:
+    """A strong ETag for a representation that is fully determined by `parts`."""
+    digest = hashlib.sha256(orjson.dumps(parts, option=orjson.OPT_SORT_KEYS)).hexdigest()
+    return f'"{digest[:32]}"'
+
+
+def encoded_etag(etag: str, encoding: str) -> str:
+    """The ETag of the `encoding`-compressed representation. Weak ETags are left as they are."""
+    if etag.startswith('"') and etag.endswith('"'):
+        return f'{etag[:-1]}-{encoding}"'
+    return etag
+
+
+def _opaque_tag(etag: str) -> str:
+    tag = etag.strip().removeprefix("W/").strip('"')
+    for suffix in ENCODING_SUFFIXES:
+        if tag.endswith(suffix):
+            return tag[:-len(suffix)]
+    return tag
+
+
+def etag_matches(if_none_match: str | None, etag: str) -> bool:
+    """
+    Whether an `If-None-Match` header matches `etag`, comparing weakly as RFC 9110
+    requires for this header, and ignoring the encoding suffix of compressed responses.
+    """
+    if not if_none_match:
+        return False
+    if if_none_match.strip() == "*":
+        return True
+    tag = _opaque_tag(etag)
+    return any(_opaque_tag(candidate) == tag for candidate in if_none_match.split(","))
+
+
+def not_modified(request: Request, response: Response, etag: str) -> Response | None:
+    """
+    Sets `etag` on `response` and, when the client already has this representation,
+    returns the 304 response to send instead of the body.
+    """
+    headers = {"ETag": etag, "Cache-Control": "no-cache"}
+    response.headers.update(headers)
+    if etag_matches(request.headers.get("if-none-match"), etag):
+        return Response(status_code=304, headers=headers)
+    return None
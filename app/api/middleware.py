@@ -0,0 +1,301 @@
+import asyncio
+import cProfile
+import logging
+import os
+import pstats
+import random
+import re
+import threading
+import zlib
+from datetime import datetime
+
+from starlette.datastructures import Headers, MutableHeaders
+from starlette.types import ASGIApp, Message, Receive, Scope, Send
+
+from app.api.etags import encoded_etag
+
+from app.utils.deadline import deadline_scope
+from app.utils.profiling import RequestTrace, instrument_sqlalchemy, record_trace
+
+try:
+    import brotli
+except ImportError:
+    brotli = None
+
+logger = logging.getLogger(__name__)
+
+
+class ProfilingMiddleware:
+    """
+    Opt-in request profiling.
+
+    A request is profiled when it carries the profiling header (e.g. `X-Profile: 1`)
+    or is picked by `sample_rate`. For a profiled request the spans recorded with
+    `app.utils.profiling.span` (tokenize, pos_tag, conjugate, llm, db, serialize)
+    are written to `output_dir` as a Chrome trace, and their totals are returned in
+    a `Server-Timing` header. Requests slower than `slow_ms` also get a cProfile
+    report next to the trace.
+
+    cProfile only sees the event loop thread, including other requests interleaved
+    with this one, and misses sync routes running in the thread pool, so the span
+    breakdown is the reliable part of the report. Only one request is under cProfile
+    at a time; others still get their spans recorded.
+    """
+
+    def __init__(
+        self,
+        app: ASGIApp,
+        sample_rate: float = 0.0,
+        header: str = "X-Profile",
+        output_dir: str = "./profiles",
+        slow_ms: float = 1000,
+    ) -> None:
+        self.app = app
+        self.sample_rate = sample_rate
+        self.header = header.lower().encode("latin-1")
+        self.output_dir = output_dir
+        self.slow_ms = slow_ms
+        self._profiler_lock = threading.Lock()
+        instrument_sqlalchemy()
+
+    def _should_profile(self, scope: Scope) -> bool:
+        for name, value in scope.get("headers", []):
+            if name == self.header and value not in (b"", b"0"):
+                return True
+        return self.sample_rate > 0 and random.random() < self.sample_rate
+
+    async def __call__(self, scope: Scope, receive: Receive, send: Send) -> None:
+        if scope["type"] != "http" or not self._should_profile(scope):
+            await self.app(scope, receive, send)
+            return
+
+        profiler = cProfile.Profile() if self._profiler_lock.acquire(blocking=False) else None
+        with record_trace(f"{scope['method']} {scope['path']}") as trace:
+            try:
+                await self._call_profiled(scope, receive, send, trace, profiler)
+            finally:
+                if profiler is not None:
+                    profiler.disable()
+                    self._profiler_lock.release()
+        await asyncio.to_thread(self._export, trace, profiler)
+
+    async def _call_profiled(
+        self,
+        scope: Scope,
+        receive: Receive,
+        send: Send,
+        trace: RequestTrace,
+        profiler: cProfile.Profile | None,
+    ) -> None:
+        async def send_with_timing(message: Message) -> None:
+            if message["type"] == "http.response.start":
+                server_timing = ", ".join(
+                    f"{name};dur={ms:.1f}" for name, ms in trace.totals_ms().items()
+                )
+                if server_timing:
+                    message.setdefault("headers", [])
+                    message["headers"] = list(message["headers"]) + [
+                        (b"server-timing", server_timing.encode("latin-1"))
+                    ]
+            await send(message)
+
+        if profiler is not None:
+            profiler.enable()
+        await self.app(scope, receive, send_with_timing)
+
+    def _export(self, trace: RequestTrace, profiler: cProfile.Profile | None) -> None:
+        os.makedirs(self.output_dir, exist_ok=True)
+        slug = re.sub(r"[^A-Za-z0-9]+", "-", trace.name).strip("-")
+        base = os.path.join(self.output_dir, f"{datetime.now():%Y%m%d-%H%M%S-%f}-{slug}")
+        duration_ms = (trace.end_ns - trace.start_ns) / 1e6
+
+        trace.write_chrome_trace(f"{base}.trace.json")
+        if profiler is not None and duration_ms >= self.slow_ms:
+            with open(f"{base}.prof.txt", "w", encoding="utf-8") as f:
+                pstats.Stats(profiler, stream=f).sort_stats("cumulative").print_stats(50)
+
+        logger.info(
+            "Profiled request",
+            extra={"request": trace.name, "duration_ms": duration_ms, "spans_ms": trace.totals_ms(), "trace_file": f"{base}.trace.json"},
+        )
+
+
+class DeadlineMiddleware:
+    """
+    Puts every HTTP request under a deadline (`app.utils.deadline`) of `default_ms`.
+    A client can ask for a shorter one with the deadline header, never a longer one.
+
+    Generation code stops starting new work and cancels outstanding LLM calls once the
+    deadline passes, returning what it has so far. The number of items dropped that
+    way is returned in an `X-Dropped-Items` header.
+    """
+
+    def __init__(self, app: ASGIApp, default_ms: float = 9000, header: str = "X-Request-Deadline-Ms") -> None:
+        self.app = app
+        self.default_ms = default_ms
+        self.header = header.lower().encode("latin-1")
+
+    def _budget_ms(self, scope: Scope) -> float:
+        for name, value in scope.get("headers", []):
+            if name == self.header:
+                try:
+                    requested = float(value)
+                except ValueError:
+                    break
+                if requested > 0:
+                    return min(requested, self.default_ms)
+                break
+        return self.default_ms
+
+    async def __call__(self, scope: Scope, receive: Receive, send: Send) -> None:
+        if scope["type"] != "http":
+            await self.app(scope, receive, send)
+            return
+
+        with deadline_scope(self._budget_ms(scope) / 1000) as deadline:
+            async def send_with_dropped(message: Message) -> None:
+                if message["type"] == "http.response.start" and deadline.dropped:
+                    message["headers"] = list(message.get("headers", [])) + [
+                        (b"x-dropped-items", str(deadline.dropped).encode("latin-1"))
+                    ]
+                    logger.warning(
+                        "Deadline exceeded, returned partial results",
+                        extra={"request": f"{scope['method']} {scope['path']}", "dropped": deadline.dropped},
+                    )
+                await send(message)
+
+            await self.app(scope, receive, send_with_dropped)
+
+
+class _Compressor:
+    def __init__(self, encoding: str, gzip_level: int, brotli_quality: int) -> None:
+        if encoding == "br":
+            self._brotli = brotli.Compressor(quality=brotli_quality)
+        else:
+            self._brotli = None
+            self._zlib = zlib.compressobj(gzip_level, zlib.DEFLATED, zlib.MAX_WBITS | 16)
+
+    def chunk(self, data: bytes) -> bytes:
+        """Compresses `data` and flushes it, so a streamed chunk reaches the client right away."""
+        if self._brotli is not None:
+            return self._brotli.process(data) + self._brotli.flush()
+        return self._zlib.compress(data) + self._zlib.flush(zlib.Z_SYNC_FLUSH)
+
+    def finish(self, data: bytes = b"") -> bytes:
+        if self._brotli is not None:
+            return self._brotli.process(data) + self._brotli.finish()
+        return self._zlib.compress(data) + self._zlib.flush(zlib.Z_FINISH)
+
+
+class CompressionMiddleware:
+    """
+    Compresses responses with brotli, when the `brotli` package is installed and the
+    client accepts it, or gzip otherwise.
+
+    Only responses whose content type starts with one of `content_types` are
+    compressed, and only if the body is at least `minimum_size` bytes; streamed
+    responses are compressed chunk by chunk whatever their size. A strong ETag gets
+    the encoding appended (`"abc"` -> `"abc-gzip"`), since the compressed bytes
+    differ; `app.api.etags.etag_matches` accepts either form, and a 304 answering
+    `If-None-Match: "abc-gzip"` carries `"abc-gzip"` too.
+    """
+
+    def __init__(
+        self,
+        app: ASGIApp,
+        minimum_size: int = 1024,
+        content_types: tuple[str, ...] = ("application/json", "application/x-ndjson", "text/"),
+        gzip_level: int = 6,
+        brotli_quality: int = 4,
+    ) -> None:
+        self.app = app
+        self.minimum_size = minimum_size
+        self.content_types = tuple(content_types)
+        self.gzip_level = gzip_level
+        self.brotli_quality = brotli_quality
+
+    def _encoding(self, scope: Scope) -> str | None:
+        accepted = {}
+        for item in Headers(scope=scope).get("accept-encoding", "").split(","):
+            name, _, params = item.strip().lower().partition(";")
+            quality = 1.0
+            if params.strip().startswith("q="):
+                try:
+                    quality = float(params.strip()[2:])
+                except ValueError:
+                    quality = 0.0
+            accepted[name.strip()] = quality
+
+        def acceptable(encoding: str) -> bool:
+            return accepted.get(encoding, accepted.get("*", 0.0)) > 0
+
+        if brotli is not None and acceptable("br"):
+            return "br"
+        if acceptable("gzip"):
+            return "gzip"
+        return None
+
+    def _compressible(self, start: Message, headers: MutableHeaders) -> bool:
+        return (
+            start["status"] not in (204, 304)
+            and "content-encoding" not in headers
+            and headers.get("content-type", "").startswith(self.content_types)
+        )
+
+    async def __call__(self, scope: Scope, receive: Receive, send: Send) -> None:
+        encoding = self._encoding(scope) if scope["type"] == "http" else None
+        if encoding is None:
+            await self.app(scope, receive, send)
+            return
+
+        start: Message | None = None
+        compressor: _Compressor | None = None
+
+        async def send_compressed(message: Message) -> None:
+            nonlocal start, compressor
+            if message["type"] == "http.response.start":
+                # Held back until the first body chunk shows whether to compress.
+                start = message
+                return
+            if message["type"] != "http.response.body":
+                if start is not None:
+                    await send(start)
+                    start = None
+                await send(message)
+                return
+
+            body = message.get("body", b"")
+            more_body = message.get("more_body", False)
+            if start is None:
+                if compressor is not None:
+                    body = compressor.chunk(body) if more_body else compressor.finish(body)
+                    message = {**message, "body": body}
+                await send(message)
+                return
+
+            headers = MutableHeaders(scope=start)
+            if start["status"] == 304 and "etag" in headers:
+                # A cache matches the 304 to its stored copy by ETag: when the client revalidates
+                # the compressed representation, answer with that one's ETag.
+                encoded = encoded_etag(headers["etag"], encoding)
+                if encoded in (tag.strip() for tag in Headers(scope=scope).get("if-none-match", "").split(",")):
+                    headers["ETag"] = encoded
+            elif self._compressible(start, headers):
+                headers.add_vary_header("Accept-Encoding")
+                if more_body or len(body) >= self.minimum_size:
+                    compressor = _Compressor(encoding, self.gzip_level, self.brotli_quality)
+                    body = compressor.chunk(body) if more_body else compressor.finish(body)
+                    headers["Content-Encoding"] = encoding
+                    if "etag" in headers:
+                        headers["ETag"] = encoded_etag(headers["etag"], encoding)
+                    if more_body:
+                        del headers["Content-Length"]
+                    else:
+                        headers["Content-Length"] = str(len(body))
+                    message = {**message, "body": body}
+
+            await send(start)
+            start = None
+            await send(message)
+
+        await self.app(scope, receive, send_compressed)
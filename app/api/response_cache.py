@@ -0,0 +1,65 @@
+import hashlib
+import threading
+from collections import OrderedDict
+
+import orjson
+
+
+def cache_key(route: str, params: dict) -> str:
+    """Hash of the route and its request parameters, the source text included."""
+    payload = orjson.dumps({"route": route, "params": params}, option=orjson.OPT_SORT_KEYS)
+    return hashlib.sha256(payload).hexdigest()
+
+
+class ResponseCache:
+    """
+    In-process LRU cache of rendered response bodies, bounded by their total size in
+    bytes rather than by the number of entries, since a response for a long text can
+    be hundreds of times larger than one for a sentence. Bodies larger than
+    `max_entry_bytes` are not cached. Safe to use from the thread pool.
+    """
+
+    def __init__(self, max_bytes: int, max_entry_bytes: int | None = None) -> None:
+        self.max_bytes = max_bytes
+        self.max_entry_bytes = max_entry_bytes if max_entry_bytes is not None else max_bytes // 8
+        self.size_bytes = 0
+        self.hits = 0
+        self.misses = 0
+        self.evictions = 0
+        self._entries: OrderedDict[str, bytes] = OrderedDict()
+        self._lock = threading.Lock()
+
+    def __len__(self) -> int:
+        return len(self._entries)
+
+    def get(self, key: str) -> bytes | None:
+        with self._lock:
+            body = self._entries.get(key)
+            if body is None:
+                self.misses += 1
+                return None
+            self._entries.move_to_end(key)
+            self.hits += 1
+            return body
+
+    def put(self, key: str, body: bytes) -> bool:
+        """Stores `body`, evicting the least recently used entries to make room. False if it is too large to cache."""
+        size = len(key) + len(body)
+        if self.max_bytes <= 0 or size > self.max_entry_bytes:
+            return False
+        with self._lock:
+            old = self._entries.pop(key, None)
+            if old is not None:
+                self.size_bytes -= len(key) + len(old)
+            while self._entries and self.size_bytes + size > self.max_bytes:
+                evicted_key, evicted = self._entries.popitem(last=False)
+                self.size_bytes -= len(evicted_key) + len(evicted)
+                self.evictions += 1
+            self._entries[key] = body
+            self.size_bytes += size
+            return True
+
+    def clear(self) -> None:
+        with self._lock:
+            self._entries.clear()
+            self.size_bytes = 0
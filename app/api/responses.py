@@ -0,0 +1,23 @@
+from typing import Sequence
+
+import orjson
+from fastapi import Response
+
+from app.domain.quiz import AbstractQuiz
+from app.models.mappings import quiz_to_dict
+from app.utils.profiling import span
+
+
+class QuizListResponse(Response):
+    """
+    Encodes domain quizzes straight to `{"quizzes": [...]}` JSON bytes.
+
+    Returning this from a route bypasses the `response_model` validation, so the
+    route's `response_model` only documents the schema. The payload is identical
+    to serializing a `GenerateFromTextResponse` built with `quiz_to_dto`.
+    """
+    media_type = "application/json"
+
+    def render(self, content: Sequence[AbstractQuiz]) -> bytes:
+        with span("serialize"):
+            return orjson.dumps({"quizzes": [quiz_to_dict(q) for q in content]})
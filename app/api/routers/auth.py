@@ -8,9 +8,10 @@ from app.db.dependencies import get_db
 from app.db.models import User
 from app.models.user import UserCreate, UserDTO
 from app.models.auth import ApiKey, Token
-from app.service.auth.auth_handler import authenticate_user, create_access_token, create_refresh_token, create_user, generate_api_key
+from app.service.auth.auth_handler import authenticate_user, count_api_keys, create_access_token, create_refresh_token, create_user, generate_api_key
 from app.service.auth.config import ACCESS_TOKEN_EXPIRE_MINUTES, REFRESH_TOKEN_EXPIRE_DAYS
 from app.service.auth.dependencies import get_current_active_user, get_current_user_from_refresh_token
+from app.service.rate_limit.config import MAX_API_KEYS_PER_USER
 
 
 router = APIRouter(
@@ -55,6 +56,12 @@ async def login_for_access_token(
 
 @router.post("/key", response_model=ApiKey)
 def create_api_key(current_user=Depends(get_current_active_user), db: Session = Depends(get_db)):
+    # Rate limits apply per user whichever key is used; the cap keeps keys from piling up unrevoked.
+    if count_api_keys(db, user_id=current_user.id) >= MAX_API_KEYS_PER_USER:
+        raise HTTPException(
+            status_code=status.HTTP_409_CONFLICT,
+            detail=f"A user can have at most {MAX_API_KEYS_PER_USER} API keys",
+        )
     return generate_api_key(db, user_id=current_user.id)
 
 
@@ -1,14 +1,18 @@
-from os import listdir
-from fastapi import APIRouter, Depends, HTTPException, UploadFile, File
-from requests import Session
+import json
+from fastapi import APIRouter, Depends, Header, HTTPException, Request, Response, UploadFile, File
+from fastapi.responses import StreamingResponse
+from sqlalchemy.orm import Session
 import shutil
-from os.path import isfile, isdir, join
 
+from app.api.etags import make_etag, not_modified
+from app.api.routers import jobs
 from app.db import text_crud, schemas
-from app.db.database import SessionLocal
+from app.db.dependencies import get_db
+from app.models.auth import User as UserModel
+from app.service.auth.dependencies import get_current_user_or_api_key
 
-from app.service.text_parser.config import CHAPTER_TAG
-from nltk.tokenize import sent_tokenize
+from app.service.quiz_generator.tagging import extract_verb_tags
+from app.service.quiz_generator.tokenizer import FastEnglishTokenizer
 
 router = APIRouter(
     prefix="/api/data",
@@ -16,14 +20,6 @@ router = APIRouter(
 )
 
 
-def get_db():
-    db = SessionLocal()
-    try:
-        yield db
-    finally:
-        db.close()
-
-
 @router.post("/dataset",  response_model=schemas.Dataset)
 async def create_dataset(dataset: schemas.DatasetCreate, db: Session = Depends(get_db)):
     db_dataset = text_crud.get_dataset_by_title(db, dataset.title)
@@ -33,72 +29,113 @@ async def create_dataset(dataset: schemas.DatasetCreate, db: Session = Depends(g
 
 
 @router.get("/dataset",  response_model=list[schemas.Dataset])
-async def get_datasets(offset: int = 0, limit: int = 100, db: Session = Depends(get_db)):
-    datasets = text_crud.get_datasets(db=db, offset=offset, limit=limit)
-    return datasets
+async def get_datasets(request: Request, response: Response, offset: int = 0, limit: int = 100,
+                       after_id: int | None = None, db: Session = Depends(get_db)):
+    """
+    Lists datasets ordered by id, with their entries. `/dataset/summaries` lists the
+    same page with entry counts instead, which is much cheaper for large datasets.
+    For deep pages pass the id of the last dataset of the previous page as `after_id`.
+    Send the returned ETag as `If-None-Match` to get a 304 while the page is unchanged.
+    """
+    versions = text_crud.get_dataset_versions(db=db, offset=offset, limit=limit, after_id=after_id)
+    etag = make_etag("datasets", offset, limit, after_id, [tuple(v) for v in versions])
+    if (cached := not_modified(request, response, etag)) is not None:
+        return cached
+
+    return text_crud.get_datasets(db=db, offset=offset, limit=limit, after_id=after_id)
+
+
+@router.get("/dataset/summaries",  response_model=list[schemas.DatasetSummary])
+async def get_dataset_summaries(request: Request, response: Response, offset: int = 0, limit: int = 100,
+                                after_id: int | None = None, db: Session = Depends(get_db)):
+    """
+    Lists datasets like `/dataset`, with the number of entries instead of the entries
+    themselves. Use `/dataset/{dataset_id}/entries` or `/text` to read the entries.
+    """
+    versions = text_crud.get_dataset_versions(db=db, offset=offset, limit=limit, after_id=after_id)
+    etag = make_etag("dataset-summaries", offset, limit, after_id, [tuple(v) for v in versions])
+    if (cached := not_modified(request, response, etag)) is not None:
+        return cached
+
+    summaries = text_crud.get_dataset_summaries(db=db, offset=offset, limit=limit, after_id=after_id)
+    return [schemas.DatasetSummary(**s._mapping) for s in summaries]
 
 
 @router.get("/dataset/{dataset_id}",  response_model=schemas.Dataset)
-async def get_dataset(dataset_id: int, db: Session = Depends(get_db)):
-    db_dataset = text_crud.get_dataset(db=db, dataset_id=dataset_id)
-    if db_dataset is None:
+async def get_dataset(dataset_id: int, request: Request, response: Response, db: Session = Depends(get_db)):
+    version = text_crud.get_dataset_version(db=db, dataset_id=dataset_id)
+    if version is None:
         raise HTTPException(status_code=404, detail="Dataset not found")
-    return db_dataset
+    if (cached := not_modified(request, response, make_etag("dataset", dataset_id, version))) is not None:
+        return cached
+    return text_crud.get_dataset(db=db, dataset_id=dataset_id)
+
+
+@router.get("/dataset/{dataset_id}/entries")
+async def stream_dataset_entries(dataset_id: int, request: Request, response: Response, db: Session = Depends(get_db)):
+    """
+    Streams every entry of a dataset as newline-delimited JSON.
+    """
+    version = text_crud.get_dataset_version(db=db, dataset_id=dataset_id)
+    if version is None:
+        raise HTTPException(status_code=404, detail="Dataset not found")
+    etag = make_etag("entries", dataset_id, version)
+    if (cached := not_modified(request, response, etag)) is not None:
+        return cached
+
+    # The request session is closed once the endpoint returns, so the stream
+    # gets its own session on the same engine for the lifetime of the response.
+    stream_db = Session(bind=db.get_bind())
+
+    def generate_lines():
+        try:
+            for row in text_crud.iter_text_features(db=stream_db, dataset_id=dataset_id):
+                yield json.dumps({"id": row.id, "text": row.text, "dataset_id": row.dataset_id}) + "\n"
+        finally:
+            stream_db.close()
+
+    return StreamingResponse(generate_lines(), media_type="application/x-ndjson",
+                             headers={"ETag": etag, "Cache-Control": "no-cache"})
 
 
 @router.get("/text",  response_model=list[schemas.TextFeature])
-async def get_texts(dataset_id: int, offset: int = 0, limit: int = 100, db: Session = Depends(get_db)):
+async def get_texts(dataset_id: int, request: Request, response: Response, offset: int = 0, limit: int = 100,
+                    after_id: int | None = None, db: Session = Depends(get_db)):
+    """
+    Lists the entries of a dataset ordered by id. For deep pages pass the id of the
+    last entry of the previous page as `after_id` instead of an offset.
+    Send the returned ETag as `If-None-Match` to get a 304 while the dataset is unchanged.
+    """
+    version = text_crud.get_dataset_version(db=db, dataset_id=dataset_id)
+    if version is not None:
+        etag = make_etag("text", dataset_id, version, offset, limit, after_id)
+        if (cached := not_modified(request, response, etag)) is not None:
+            return cached
+
     texts = text_crud.get_text_features(
-        db=db, dataset_id=dataset_id, offset=offset, limit=limit)
+        db=db, dataset_id=dataset_id, offset=offset, limit=limit, after_id=after_id)
     return texts
 
 
 @router.post("/text",  response_model=schemas.TextFeature)
 async def create_text(feature: schemas.TextFeatureCreate, db: Session = Depends(get_db)):
     # should check first, but whatever...
-    return text_crud.create_text_feature(db, feature)
-
-
-@router.post("/create")
-async def create_dataset_from_parsed_text(db: Session = Depends(get_db)):
-    source_dir = "./source/parsed"
-
-    if not isdir(source_dir):
-        return {"message": "source directory is a file"}
-
-    try:
-        files = [f for f in listdir(source_dir) if isfile(join(source_dir, f))]
-        print(files)
-        for file in files:
-            f = open(join(source_dir, file), 'r', encoding='utf-8')
-            contents = f.read()
-            f.close()
-            chapters = contents.split(CHAPTER_TAG)
-            # sentences = [sent_tokenize(c) for c in chapters]
-            sentences = []
-            for c in chapters:
-                sentences.extend(sent_tokenize(c))
-            print(len(sentences))
-
-            db_dataset = text_crud.get_dataset_by_title(db=db, title=file)
-            if not db_dataset:
-                dataset = schemas.DatasetCreate(
-                    title=file, source=join(source_dir, file))
-                db_dataset = text_crud.create_dataset(dataset=dataset, db=db)
-
-            text_features = []
-            for s in sentences:
-                if len(s) > 150 or len(s) <= 50:
-                    continue
-                text_features.append(schemas.TextFeatureCreate(
-                    text=s, dataset_id=db_dataset.id))
-
-            for feature in text_features:
-                text_crud.create_text_feature(db=db, feature=feature)
-
-            return {"processed files": f"{files}", "new features": len(text_features), "dataset": db_dataset.id}
-    except Exception as e:
-        return {"message": f"encountered error {e}"}
+    return text_crud.create_text_feature(db, feature, verb_tags=extract_verb_tags(feature.text, FastEnglishTokenizer()))
+
+
+@router.post("/create", response_model=schemas.Job, status_code=202)
+def create_dataset_from_parsed_text(
+    response: Response,
+    idempotency_key: str | None = Header(default=None),
+    db: Session = Depends(get_db),
+    current_user: UserModel = Depends(get_current_user_or_api_key),
+):
+    """
+    Queues ingestion of the parsed texts in ./source/parsed as a background job of the
+    current user and returns it. Poll `/api/jobs/{job_id}` for the result.
+    """
+    job = schemas.JobCreate(kind="ingest_parsed_texts", payload={})
+    return jobs.enqueue(db, current_user.id, job, idempotency_key, response)
 
 
 # @router.post("/parse")
@@ -0,0 +1,75 @@
+from fastapi import APIRouter, Depends, Header, HTTPException, Response, status
+from sqlalchemy.orm import Session
+
+from app.db import job_crud, schemas
+from app.db.dependencies import get_db
+from app.models.auth import User as UserModel
+from app.service.auth.dependencies import get_current_user_or_api_key
+from app.service.jobs import config as jobs_config
+from app.service.jobs.handlers import validate_payload
+
+router = APIRouter(
+    prefix="/api/jobs",
+    tags=["jobs"],
+)
+
+
+def enqueue(db: Session, user_id: int, job: schemas.JobCreate, idempotency_key: str | None, response: Response):
+    """
+    Queues `job` for the worker (`python -m app.service.jobs.worker`) on behalf of
+    `user_id`. Responds 202 for a new job and 200 when the user already used
+    `idempotency_key` for the same job.
+    """
+    try:
+        validate_payload(job.kind, job.payload)
+    except ValueError as e:
+        raise HTTPException(status_code=status.HTTP_422_UNPROCESSABLE_ENTITY, detail=str(e))
+    try:
+        db_job, created = job_crud.enqueue_job(
+            db, job.kind, job.payload, idempotency_key=idempotency_key, max_attempts=jobs_config.JOB_MAX_ATTEMPTS,
+            user_id=user_id)
+    except job_crud.IdempotencyConflict as e:
+        raise HTTPException(status_code=status.HTTP_409_CONFLICT, detail=str(e))
+    response.status_code = status.HTTP_202_ACCEPTED if created else status.HTTP_200_OK
+    return db_job
+
+
+@router.post("/", response_model=schemas.Job, status_code=status.HTTP_202_ACCEPTED)
+def create_job(
+    job: schemas.JobCreate,
+    response: Response,
+    idempotency_key: str | None = Header(default=None),
+    db: Session = Depends(get_db),
+    current_user: UserModel = Depends(get_current_user_or_api_key),
+):
+    """
+    Queues a background job: `ingest_parsed_texts`, or `generate_quizzes` for large
+    batches and LLM backfills. Poll `/api/jobs/{job_id}` for its status and result.
+    """
+    return enqueue(db, current_user.id, job, idempotency_key, response)
+
+
+@router.get("/", response_model=list[schemas.Job])
+def get_jobs(
+    status: str | None = None,
+    kind: str | None = None,
+    limit: int = 100,
+    after_id: int | None = None,
+    db: Session = Depends(get_db),
+    current_user: UserModel = Depends(get_current_user_or_api_key),
+):
+    """The current user's jobs."""
+    return job_crud.get_jobs(db, current_user.id, status=status, kind=kind, limit=limit, after_id=after_id)
+
+
+@router.get("/{job_id}", response_model=schemas.Job)
+def get_job(
+    job_id: int,
+    db: Session = Depends(get_db),
+    current_user: UserModel = Depends(get_current_user_or_api_key),
+):
+    # Other users' jobs are reported as missing.
+    db_job = job_crud.get_user_job(db, current_user.id, job_id)
+    if db_job is None:
+        raise HTTPException(status_code=404, detail="Job not found")
+    return db_job
@@ -1,22 +1,31 @@
 import random
 import logging
-from typing import List, Literal, Optional
-from fastapi import APIRouter, Depends, HTTPException
+from datetime import datetime, timezone
+from typing import Callable, List, Literal, Optional, Sequence
+from fastapi import APIRouter, Depends, HTTPException, Query, Response
 from pydantic import BaseModel, Field, model_validator
 from sqlalchemy.orm import Session
 
-from app.db import quiz_crud, text_crud, schemas
-from app.db.database import SessionLocal
+from app.db import quiz_crud, review_crud, sentence_bank_crud, text_crud, schemas
+from app.api.response_cache import ResponseCache, cache_key
+from app.api.responses import QuizListResponse
+from app.api import config
+from app.db.dependencies import get_db
 from app.domain.quiz import SequenceQuiz, SingleAnswerQuiz
-from app.models.mappings import quiz_to_dto
+from app.models.auth import User as UserModel
+from app.models.mappings import quiz_to_dict
 from app.models.quiz import QuizDTO
 from app.service.auth.dependencies import get_current_user_or_api_key
+from app.service.rate_limit.dependencies import rate_limit
 from app.service.quiz_generator.generator import QuizGenerator
+from app.service.quiz_generator.generator_hybrid import HybridQuizStrategy
 from app.service.quiz_generator.generator_llm import SimpleQuizStrategyLLM
 from app.service.quiz_generator.generator_strategy import SequenceQuizStrategy, SimpleQuizStrategy
 from app.service.quiz_generator.generator_strategy import SequenceQuizStrategy, SimpleQuizStrategy
 from app.service.quiz_generator.strategies import ContextQuizStrategyLLM
-from app.service.quiz_generator.tokenizer import EnglishTokenizer
+from app.service.quiz_generator.distractors import get_distractor_engine
+from app.service.quiz_generator.tokenizer import FastEnglishTokenizer
+from app.utils.deadline import current_deadline
 
 
 router = APIRouter(
@@ -28,28 +37,75 @@ router = APIRouter(
 logger = logging.getLogger(name="quizzes_router")
 
 
-def get_db():
-    db = SessionLocal()
-    try:
-        yield db
-    finally:
-        db.close()
+# Length strata (in characters) used when sampling session sentences from a dataset.
+SESSION_LENGTH_BUCKETS = [(0, 80), (80, 110), (110, None)]
 
+# Seeded requests to the rule-based endpoints always produce the same quizzes, so their
+# responses are cached and a retried request is served without generating again.
+response_cache = ResponseCache(config.RESPONSE_CACHE_MAX_BYTES)
 
-def get_data_db():
-    db_texts = SessionLocal()
-    try:
-        yield db_texts
-    finally:
-        db_texts.close()
+SEED_DESCRIPTION = "Makes the generated quizzes reproducible: the same input, parameters and seed give the same quizzes."
+
+
+def cached_quiz_response(route: str, body: BaseModel, seed: int | None,
+                         generate: Callable[[random.Random | None], Sequence]) -> Response:
+    """
+    Calls `generate` with a `random.Random(seed)`, or None without a seed, and returns its
+    quizzes. Seeded responses are cached by route and body. A response cut short by the
+    request deadline is not cached.
+    """
+    if seed is None:
+        return QuizListResponse(generate(None))
+
+    key = cache_key(route, body.model_dump())
+    body_bytes = response_cache.get(key)
+    if body_bytes is not None:
+        return Response(content=body_bytes, media_type="application/json", headers={"X-Cache": "hit"})
+
+    response = QuizListResponse(generate(random.Random(seed)))
+    deadline = current_deadline()
+    if deadline is None or not deadline.dropped:
+        response_cache.put(key, response.body)
+    response.headers["X-Cache"] = "miss"
+    return response
+
+
+def generate_from_bank(db: Session, user_id: int, simple_limit: int, sequence_limit: int,
+                       number_of_answers: int, rng: random.Random | None = None) -> list:
+    """
+    Simple and sequence quizzes from sentences sampled from the user's sentence bank.
+    Simple quizzes use the tags stored with each sentence instead of tagging it again.
+    """
+    # Sample twice the limit, some sentences won't produce a valid quiz.
+    sentences = sentence_bank_crud.sample_user_sentences(
+        db, user_id, n=(simple_limit + sequence_limit) * 2, rng=rng
+    )
+    tokenizer = FastEnglishTokenizer()
+    quizzes = []
+
+    if simple_limit > 0:
+        simple_strategy = SimpleQuizStrategy(tokenizer=tokenizer, distractor_engine=get_distractor_engine(), rng=rng)
+        quizzes.extend(simple_strategy.generate_many_tagged(
+            [s.pos_tags for s in sentences], simple_limit, number_of_answers
+        ))
+
+    if sequence_limit > 0:
+        text_block = " ".join(
+            s.text if s.text.endswith((".", "!", "?")) else s.text + "." for s in sentences
+        )
+        sequence_strategy = SequenceQuizStrategy(tokenizer=tokenizer, rng=rng)
+        quizzes.extend(sequence_strategy.generate_many(text_block, sequence_limit, number_of_answers))
+
+    return quizzes
 
 
 class GenerateFromTextBody(BaseModel):
     input: str = Field(..., description="A source text to generate quiz from. Text is expected to be a paragraph with correct punctuation.")
     limit: int = Field(..., description="A maximum number of quizzes to generate. Endpoint may return less if there is no reasonable quiz to generate from given text.")
     number_of_answers: int = Field(..., description="A maximum number of answers in quiz. Endpoint may return less if there is no reasonable answer to generate from given text.")
-    type: Literal["simple", "sequence", "simple_llm"] = Field(..., description="A type of quizzes to generate")
+    type: Literal["simple", "sequence", "simple_llm", "hybrid"] = Field(..., description="A type of quizzes to generate")
     language: Literal["en"] = Field(..., description="In which language to generate quizzes")
+    seed: Optional[int] = Field(default=None, description=SEED_DESCRIPTION + " Ignored by LLM endpoints.")
 
 class GenerateContextQuizBody(BaseModel):
     input: str = Field(
@@ -82,17 +138,28 @@ class GenerateContextQuizBody(BaseModel):
     )
 
 class GenerateSessionQuizBody(BaseModel):
-    input_sentences: List[str] = Field(..., min_length=1, description="A list of clean sentences from the user's reading history.")
+    input_sentences: Optional[List[str]] = Field(default=None, min_length=1, description="A list of clean sentences from the user's reading history.")
+    dataset_id: Optional[int] = Field(default=None, description="A dataset to sample sentences from instead of input_sentences.")
     limit: int = Field(default=10, gt=0, le=20, description="The total number of quizzes to generate.")
     number_of_answers: int = Field(default=4, gt=2, le=5)
+    seed: Optional[int] = Field(default=None, description=SEED_DESCRIPTION + " Only cached with input_sentences.")
 
     @model_validator(mode='after')
     def validate_limit_against_sentences(self) -> 'GenerateSessionQuizBody':
+        if (self.input_sentences is None) == (self.dataset_id is None):
+            raise ValueError("Provide either input_sentences or dataset_id")
+        if self.input_sentences is None:
+            return self
         num_sentences = len(self.input_sentences)
         if self.limit > num_sentences:
             self.limit = num_sentences
         return self
 
+class GenerateBankSessionQuizBody(BaseModel):
+    limit: int = Field(default=10, gt=0, le=20, description="The total number of quizzes to generate.")
+    number_of_answers: int = Field(default=4, gt=2, le=5)
+    seed: Optional[int] = Field(default=None, description="Makes the sentences sampled from the bank, and the quizzes built from them, reproducible while the bank is unchanged.")
+
 class GenerateFromTextResponse(BaseModel):
     quizzes: List[QuizDTO]
 
@@ -100,26 +167,110 @@ class GenerateFromTextResponse(BaseModel):
 class GenerateContextQuizResponse(BaseModel):
     quizzes: List[QuizDTO]
 
-@router.get("/")
-async def get_quiz_batch(simple: int = 10, voice: int = 0, sequence: int = 0, context: int = 0, db: Session = Depends(get_db)):
-    return {"message": "get batch of different quizzes"}
 
+class QuizBatchItem(BaseModel):
+    review_id: int
+    is_new: bool = Field(..., description="False when the quiz was served before and is due for review.")
+    quiz: QuizDTO
 
-@router.post("/session/from-text", response_model=GenerateFromTextResponse)
+
+class QuizBatchResponse(BaseModel):
+    quizzes: List[QuizBatchItem]
+
+@router.get("/", response_model=QuizBatchResponse, dependencies=[Depends(rate_limit("nlp"))])
+def get_quiz_batch(
+    simple: int = Query(default=10, ge=0, le=20),
+    sequence: int = Query(default=0, ge=0, le=20),
+    number_of_answers: int = Query(default=4, gt=2, le=5),
+    db: Session = Depends(get_db),
+    current_user: UserModel = Depends(get_current_user_or_api_key),
+):
+    """
+    Serves the user's quizzes that are due for review first, and only generates the
+    shortfall, from the user's sentence bank. New quizzes are scheduled for review;
+    report answers to `/reviews/{review_id}`. Unanswered quizzes stay due.
+    """
+    user_id = current_user.id
+    now = datetime.now(timezone.utc)
+    limits = {"simple": simple, "sequence": sequence}
+    due = {
+        quiz_type: review_crud.get_due_reviews(db, user_id, quiz_type, limit, now)
+        for quiz_type, limit in limits.items() if limit > 0
+    }
+    shortfall = {quiz_type: limit - len(due.get(quiz_type, [])) for quiz_type, limit in limits.items()}
+    logger.info(f"Serving quiz batch: {sum(map(len, due.values()))} due, {sum(shortfall.values())} to generate")
+
+    new_items = []
+    if any(shortfall.values()):
+        try:
+            generated = [
+                quiz_to_dict(q) for q in generate_from_bank(
+                    db, user_id, shortfall["simple"], shortfall["sequence"], number_of_answers
+                )
+            ]
+        except Exception as e:
+            logger.error(f"Error generating quizzes for batch: {e}", exc_info=True)
+            raise HTTPException(status_code=500, detail="An unexpected error occurred during quiz generation.")
+        for quiz_type, limit in shortfall.items():
+            if limit > 0:
+                new_items.extend(review_crud.add_review_items(
+                    db, user_id, [q for q in generated if q["type"] == quiz_type], limit, now
+                ))
+
+    return {"quizzes": [
+        {"review_id": item.id, "is_new": False, "quiz": item.quiz} for items in due.values() for item in items
+    ] + [
+        {"review_id": item.id, "is_new": True, "quiz": item.quiz} for item in new_items
+    ]}
+
+
+@router.post("/reviews/{review_id}", response_model=schemas.ReviewItem)
+def answer_review(
+    review_id: int,
+    body: schemas.ReviewAnswer,
+    db: Session = Depends(get_db),
+    current_user: UserModel = Depends(get_current_user_or_api_key),
+):
+    """Records how well the user answered a quiz served by `GET /api/quizzes/` and schedules its next review."""
+    item = review_crud.get_review_item(db, current_user.id, review_id)
+    if item is None:
+        raise HTTPException(status_code=404, detail="Review not found")
+    return review_crud.record_answer(db, item, body.quality)
+
+
+@router.post("/session/from-text", response_model=GenerateFromTextResponse, dependencies=[Depends(rate_limit("nlp"))])
 def create_session_quiz_from_text(
     body: GenerateSessionQuizBody,
-) -> GenerateFromTextResponse:
+    db: Session = Depends(get_db),
+) -> QuizListResponse:
     """
-    Generates a "quiz session" from a block of user's read text.
+    Generates a "quiz session" from a block of user's read text, or from sentences
+    sampled from a dataset when `dataset_id` is given.
     This combines simple and sequence quizzes (non-LLM) and shuffles them.
     """
-    try:
+    def generate(rng: random.Random | None) -> list:
         all_quizzes = []
-        tokenizer = EnglishTokenizer()
+        tokenizer = FastEnglishTokenizer()
+
+        if body.dataset_id is not None:
+            # Sample twice the limit, some sentences won't produce a valid quiz.
+            features = text_crud.sample_text_features_stratified(
+                db,
+                dataset_id=body.dataset_id,
+                n=body.limit * 2,
+                length_buckets=SESSION_LENGTH_BUCKETS,
+                rng=rng,
+            )
+            sentences = [f.text for f in features]
+        else:
+            sentences = body.input_sentences
 
         # --- Re-join the list of sentences into a perfect paragraph ---
         # This gives the tokenizer clean data to work with.
-        text_block = ". ".join(body.input_sentences) + "."
+        text_block = " ".join(
+            s if s.endswith((".", "!", "?")) else s + "."
+            for s in (s.strip() for s in sentences) if s
+        )
 
         # --- Calculate 1/3 and 2/3 proportions ---
         total_limit = body.limit
@@ -132,7 +283,7 @@ def create_session_quiz_from_text(
 
         # 1. Generate Simple Quizzes
         if simple_limit > 0:
-            simple_strategy = SimpleQuizStrategy(tokenizer=tokenizer)
+            simple_strategy = SimpleQuizStrategy(tokenizer=tokenizer, distractor_engine=get_distractor_engine(), rng=rng)
             simple_quizzes = simple_strategy.generate_many(
                 text_block,  # Use the joined text block
                 simple_limit, 
@@ -142,7 +293,7 @@ def create_session_quiz_from_text(
         
         # 2. Generate Sequence Quizzes
         if sequence_limit > 0:
-            sequence_strategy = SequenceQuizStrategy(tokenizer=tokenizer)
+            sequence_strategy = SequenceQuizStrategy(tokenizer=tokenizer, rng=rng)
             sequence_quizzes = sequence_strategy.generate_many(
                 text_block,  # Use the joined text block
                 sequence_limit, 
@@ -151,18 +302,21 @@ def create_session_quiz_from_text(
             all_quizzes.extend(sequence_quizzes)
 
         # 3. Shuffle the combined list
-        random.shuffle(all_quizzes)
+        (rng or random).shuffle(all_quizzes)
 
-        # 4. Map to DTOs
-        quiz_dtos = [quiz_to_dto(q) for q in all_quizzes]
-        
-        if not quiz_dtos:
+        if not all_quizzes:
             raise HTTPException(
                 status_code=400, 
                 detail="Could not generate any quizzes from the provided text. Read more to build your sentence bank."
             )
 
-        return GenerateFromTextResponse(quizzes=quiz_dtos)
+        return all_quizzes
+
+    try:
+        if body.dataset_id is not None:
+            # Sampled from the database, so the same seed gives the same session only while the dataset is unchanged.
+            return QuizListResponse(generate(random.Random(body.seed) if body.seed is not None else None))
+        return cached_quiz_response("session", body, body.seed, generate)
 
     except Exception as e:
         if isinstance(e, HTTPException):
@@ -171,55 +325,102 @@ def create_session_quiz_from_text(
         raise HTTPException(status_code=500, detail="An unexpected error occurred during quiz generation.")
 
 
-@router.post("/simple/from-text", response_model=GenerateFromTextResponse)
-def create_simple_quiz_from_text(body: GenerateFromTextBody) -> GenerateFromTextResponse:
+@router.post("/session/from-bank", response_model=GenerateFromTextResponse, dependencies=[Depends(rate_limit("nlp"))])
+def create_session_quiz_from_bank(
+    body: GenerateBankSessionQuizBody,
+    db: Session = Depends(get_db),
+    current_user: UserModel = Depends(get_current_user_or_api_key),
+) -> QuizListResponse:
+    """
+    Generates a "quiz session" from sentences sampled from the user's sentence bank
+    (`/api/sentences`). Like `/session/from-text`, it combines simple and sequence
+    quizzes, but simple quizzes use the tags stored with each sentence instead of
+    tagging it again.
+    """
+    rng = random.Random(body.seed) if body.seed is not None else None
     try:
-        strategy = SimpleQuizStrategy(tokenizer=EnglishTokenizer())
-        print(body.limit, body.number_of_answers)
-        quizzes = strategy.generate_many(body.input, body.limit, body.number_of_answers)
-        quiz_dtos = [quiz_to_dto(q) for q in quizzes]
-        print([q.model_dump() for q in quiz_dtos])
+        sequence_limit = body.limit // 3
+        all_quizzes = generate_from_bank(
+            db, current_user.id, body.limit - sequence_limit, sequence_limit, body.number_of_answers, rng
+        )
+        (rng or random).shuffle(all_quizzes)
 
-        return GenerateFromTextResponse(quizzes=quiz_dtos)
+        if not all_quizzes:
+            raise HTTPException(
+                status_code=400,
+                detail="Could not generate any quizzes from the sentence bank. Read more to build your sentence bank."
+            )
+        return QuizListResponse(all_quizzes)
 
     except Exception as e:
-        raise HTTPException(status_code=500, detail=f"Encountered error: {e}")
+        if isinstance(e, HTTPException):
+            raise e
+        logger.error(f"Error generating session quiz from bank: {e}", exc_info=True)
+        raise HTTPException(status_code=500, detail="An unexpected error occurred during quiz generation.")
 
 
-@router.post("/sequence/from-text")
-async def get_sequence_quiz(body: GenerateFromTextBody) -> GenerateFromTextResponse:
+@router.post("/simple/from-text", response_model=GenerateFromTextResponse, dependencies=[Depends(rate_limit("nlp"))])
+def create_simple_quiz_from_text(body: GenerateFromTextBody) -> QuizListResponse:
+    def generate(rng: random.Random | None):
+        strategy = SimpleQuizStrategy(tokenizer=FastEnglishTokenizer(), distractor_engine=get_distractor_engine(), rng=rng)
+        return strategy.generate_many(body.input, body.limit, body.number_of_answers)
+
     try:
-        strategy = SequenceQuizStrategy(tokenizer=EnglishTokenizer())
-        quizzes = strategy.generate_many(body.input, body.limit, body.number_of_answers)
-        quiz_dtos = [quiz_to_dto(q) for q in quizzes]
-        print([q.model_dump() for q in quiz_dtos])
+        return cached_quiz_response("simple", body, body.seed, generate)
+
+    except Exception as e:
+        raise HTTPException(status_code=500, detail=f"Encountered error: {e}")
+
 
-        return GenerateFromTextResponse(quizzes=quiz_dtos)
+@router.post("/sequence/from-text", response_model=GenerateFromTextResponse, dependencies=[Depends(rate_limit("nlp"))])
+async def get_sequence_quiz(body: GenerateFromTextBody) -> QuizListResponse:
+    def generate(rng: random.Random | None):
+        strategy = SequenceQuizStrategy(tokenizer=FastEnglishTokenizer(), rng=rng)
+        return strategy.generate_many(body.input, body.limit, body.number_of_answers)
+
+    try:
+        return cached_quiz_response("sequence", body, body.seed, generate)
 
     except Exception as e:
         raise HTTPException(status_code=500, detail=f"Encountered error: {e}")
 
 
-@router.post("/simple/llm/from-text", response_model=GenerateFromTextResponse)
-async def create_simple_quiz_from_text_using_llm(body: GenerateFromTextBody) -> GenerateFromTextResponse:
+@router.post("/simple/llm/from-text", response_model=GenerateFromTextResponse, dependencies=[Depends(rate_limit("llm"))])
+async def create_simple_quiz_from_text_using_llm(body: GenerateFromTextBody) -> QuizListResponse:
     try:
         strategy = SimpleQuizStrategyLLM()
         quizzes = await strategy.generate_many(body.input, body.limit, body.number_of_answers)
-        quiz_dtos = [quiz_to_dto(q) for q in quizzes]
-        print([q.model_dump() for q in quiz_dtos])
-        return GenerateFromTextResponse(quizzes=quiz_dtos)
+        return QuizListResponse(quizzes)
 
     except Exception as e:
         raise HTTPException(status_code=500, detail=f"Encountered error: {e}")
     
 
+@router.post("/hybrid/from-text", response_model=GenerateFromTextResponse, dependencies=[Depends(rate_limit("llm"))])
+async def create_hybrid_quiz_from_text(body: GenerateFromTextBody) -> QuizListResponse:
+    """
+    Rule-based simple quizzes, with only the sentences they handle poorly sent to the LLM.
+    Returns what is ready within the latency budget.
+    """
+    try:
+        strategy = HybridQuizStrategy(
+            rule_strategy=SimpleQuizStrategy(tokenizer=FastEnglishTokenizer(), distractor_engine=get_distractor_engine()),
+            llm_strategy=SimpleQuizStrategyLLM(),
+        )
+        quizzes = await strategy.generate_many(body.input, body.limit, body.number_of_answers)
+        return QuizListResponse(quizzes)
+
+    except Exception as e:
+        raise HTTPException(status_code=500, detail=f"Encountered error: {e}")
+
+
 @router.get("/voice/from-text")
 async def get_voice_quiz():
     return {"message": "generate voice quiz"}
 
 
-@router.post("/context/from-text", response_model=GenerateContextQuizResponse)
-async def create_context_quiz_from_text(body: GenerateContextQuizBody) -> GenerateContextQuizResponse:
+@router.post("/context/from-text", response_model=GenerateContextQuizResponse, dependencies=[Depends(rate_limit("llm"))])
+async def create_context_quiz_from_text(body: GenerateContextQuizBody) -> QuizListResponse:
     try:
         strategy = ContextQuizStrategyLLM(native_language=body.native_language, target_language=body.language)
         
@@ -235,11 +436,7 @@ async def create_context_quiz_from_text(body: GenerateContextQuizBody) -> Genera
                 detail="Could not identify a testable grammatical structure in the provided text."
             )
 
-        quiz_dtos = [quiz_to_dto(q) for q in quizzes]
-
-        return GenerateContextQuizResponse(
-            quizzes=quiz_dtos
-        )
+        return QuizListResponse(quizzes)
     except HTTPException as e:
         raise e
     except Exception as e:
@@ -0,0 +1,67 @@
+from fastapi import APIRouter, Depends
+from sqlalchemy.orm import Session
+
+from app.api import config
+from app.db import schemas, sentence_bank_crud
+from app.db.dependencies import get_db
+from app.models.auth import User as UserModel
+from app.service.auth.dependencies import get_current_user_or_api_key
+from app.service.quiz_generator.tagging import pos_tag_with_confidence
+from app.service.quiz_generator.tokenizer import FastEnglishTokenizer
+from app.utils.profiling import span
+
+router = APIRouter(
+    prefix="/api/sentences",
+    tags=["sentences"],
+    dependencies=[Depends(get_current_user_or_api_key)]
+)
+
+
+@router.post("/", response_model=schemas.UserSentencesAppendResult)
+def append_sentences(
+    body: schemas.UserSentencesAppend,
+    db: Session = Depends(get_db),
+    current_user: UserModel = Depends(get_current_user_or_api_key),
+):
+    """
+    Adds sentences the user has read to their sentence bank, which
+    `/api/quizzes/session/from-bank` builds sessions from. Sentences already in the bank
+    are skipped. New ones are tagged here, once, and the oldest sentences beyond the
+    bank size are dropped.
+    """
+    by_hash = {}
+    non_empty = 0
+    for text in body.sentences:
+        text = " ".join(text.split())
+        if text:
+            non_empty += 1
+            by_hash.setdefault(sentence_bank_crud.sentence_hash(text), text)
+    known = sentence_bank_crud.existing_hashes(db, current_user.id, by_hash)
+
+    tokenizer = FastEnglishTokenizer()
+    new_sentences = []
+    with span("pos_tag"):
+        for text_hash, text in by_hash.items():
+            if text_hash not in known:
+                tagged = pos_tag_with_confidence(tokenizer.tokenize(text))
+                new_sentences.append((text, text_hash, [list(t) for t in tagged]))
+
+    added = sentence_bank_crud.append_user_sentences(
+        db, current_user.id, new_sentences, capacity=config.USER_SENTENCE_BANK_SIZE)
+    return schemas.UserSentencesAppendResult(
+        added=added,
+        # Blank entries are neither added nor duplicates.
+        duplicates=non_empty - added,
+        size=sentence_bank_crud.count_user_sentences(db, current_user.id),
+    )
+
+
+@router.get("/", response_model=list[schemas.UserSentence])
+def get_sentences(
+    limit: int = 100,
+    after_id: int | None = None,
+    db: Session = Depends(get_db),
+    current_user: UserModel = Depends(get_current_user_or_api_key),
+):
+    """Lists the user's sentences, oldest first. Pass the last id of a page as `after_id` for the next one."""
+    return sentence_bank_crud.get_user_sentences(db, current_user.id, limit=limit, after_id=after_id)
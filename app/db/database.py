@@ -1,47 +1,58 @@
-import os
-from sqlalchemy import create_engine
+import logging
+from sqlalchemy import create_engine, event
 from sqlalchemy.orm import declarative_base
 from sqlalchemy.orm import sessionmaker
 from dotenv import load_dotenv
-from app.utils.aws_secrets import get_aws_secret 
+from app.service.secrets import config as secrets_config
+from app.service.secrets.providers import get_db_secrets_provider
+from app.service.secrets.refresh import RefreshingSecret
 
 # for local development
 load_dotenv()
 
-if os.environ.get("USE_AWS_SECRETS") == "true":
-    
-    print("Using AWS RDS and Secrets Manager")
-    
-    db_creds = get_aws_secret("DB_SECRET_NAME")
-    
-    DB_USER = db_creds['username']
-    DB_PASS = db_creds['password']
-    DB_HOST = db_creds['host']
-    DB_PORT = db_creds.get('port', 5432)
-    DB_NAME = db_creds['dbname']
-    
-    SQLALCHEMY_DATABASE_URL = f"postgresql+psycopg://{DB_USER}:{DB_PASS}@{DB_HOST}:{DB_PORT}/{DB_NAME}"
-    
-    engine = create_engine(SQLALCHEMY_DATABASE_URL)
-
-else:
-    
-    print("Using local Docker PostgreSQL database")
-    
-    DB_USER = os.environ.get("DB_USER")
-    DB_PASS = os.environ.get("DB_PASS")
-    DB_HOST = os.environ.get("DB_HOST")
-    DB_PORT = os.environ.get("DB_PORT", 5432)
-    DB_NAME = os.environ.get("DB_NAME")
-
-    if not all([DB_USER, DB_PASS, DB_HOST, DB_NAME]):
-        raise ValueError("Missing local database environment variables. Did you create .env?")
-
-    SQLALCHEMY_DATABASE_URL = f"postgresql+psycopg://{DB_USER}:{DB_PASS}@{DB_HOST}:{DB_PORT}/{DB_NAME}"
-    
-    engine = create_engine(SQLALCHEMY_DATABASE_URL)
+logger = logging.getLogger(__name__)
+
+# Credentials from Secrets Manager, a file or the DB_* variables (SECRETS_PROVIDER),
+# fetched when a gunicorn worker starts (see gunicorn.conf.py) or else on the first
+# connection, never at import, then refreshed in the background.
+db_secret = RefreshingSecret(get_db_secrets_provider(), ttl=secrets_config.SECRETS_REFRESH_S)
+
+# The URL has no credentials: each new connection gets the current ones in `_connect`.
+SQLALCHEMY_DATABASE_URL = "postgresql+psycopg://"
+
+engine = create_engine(SQLALCHEMY_DATABASE_URL)
+
+
+def connect_params(secret: dict) -> dict:
+    """psycopg connection arguments for an RDS-shaped secret."""
+    return {
+        "user": secret["username"],
+        "password": secret["password"],
+        "host": secret["host"],
+        "port": int(secret.get("port", 5432)),
+        "dbname": secret["dbname"],
+    }
+
+
+@event.listens_for(engine, "do_connect")
+def _connect(dialect, connection_record, cargs, cparams):
+    try:
+        return dialect.connect(*cargs, **cparams, **connect_params(db_secret.get()))
+    except dialect.loaded_dbapi.OperationalError:
+        # The password may have been rotated since the last refresh: retry once with a fresh one.
+        if not db_secret.refresh():
+            raise
+        return dialect.connect(*cargs, **cparams, **connect_params(db_secret.get()))
+
+
+@db_secret.on_change
+def _recycle_pool(secret: dict) -> None:
+    # Pooled connections opened with the old credentials are closed; checked out ones
+    # are discarded when they are returned.
+    logger.info("Database credentials changed, replacing the connection pool")
+    engine.dispose()
 
 
 SessionLocal = sessionmaker(autocommit=False, autoflush=False, bind=engine)
 
-Base = declarative_base()
\ No newline at end of file
+Base = declarative_base()
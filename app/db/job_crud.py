@@ -0,0 +1,186 @@
+from datetime import datetime, timedelta, timezone
+
+from sqlalchemy import select, update
+from sqlalchemy.exc import IntegrityError
+from sqlalchemy.orm import Session
+
+from app.db import models
+
+QUEUED = "queued"
+RUNNING = "running"
+SUCCEEDED = "succeeded"
+FAILED = "failed"
+
+
+class IdempotencyConflict(Exception):
+    """The idempotency key already belongs to a job with a different kind or payload."""
+
+
+def _utcnow() -> datetime:
+    return datetime.now(timezone.utc)
+
+
+def get_job(db: Session, job_id: int) -> models.Job | None:
+    return db.get(models.Job, job_id)
+
+
+def get_user_job(db: Session, user_id: int, job_id: int) -> models.Job | None:
+    return db.scalars(select(models.Job).where(models.Job.id == job_id, models.Job.user_id == user_id)).first()
+
+
+def get_job_by_idempotency_key(db: Session, user_id: int | None, key: str) -> models.Job | None:
+    return db.scalars(
+        select(models.Job).where(models.Job.user_id == user_id, models.Job.idempotency_key == key)
+    ).first()
+
+
+def get_jobs(db: Session, user_id: int, status: str | None = None, kind: str | None = None, limit: int = 100,
+             after_id: int | None = None) -> list[models.Job]:
+    query = select(models.Job).where(models.Job.user_id == user_id).order_by(models.Job.id).limit(limit)
+    if status is not None:
+        query = query.where(models.Job.status == status)
+    if kind is not None:
+        query = query.where(models.Job.kind == kind)
+    if after_id is not None:
+        query = query.where(models.Job.id > after_id)
+    return list(db.scalars(query))
+
+
+def enqueue_job(
+    db: Session,
+    kind: str,
+    payload: dict,
+    idempotency_key: str | None = None,
+    max_attempts: int = 3,
+    user_id: int | None = None,
+) -> tuple[models.Job, bool]:
+    """
+    Queues a job for `user_id` and returns it with True, or, when the user used
+    `idempotency_key` before, returns that job with False. Raises IdempotencyConflict
+    if the earlier job was for different work.
+    """
+    if idempotency_key is not None:
+        existing = get_job_by_idempotency_key(db, user_id, idempotency_key)
+        if existing is not None:
+            return _check_same_job(existing, kind, payload), False
+
+    job = models.Job(
+        user_id=user_id, kind=kind, payload=payload, idempotency_key=idempotency_key, max_attempts=max_attempts)
+    db.add(job)
+    try:
+        db.commit()
+    except IntegrityError:
+        # Another request inserted the same key between the lookup and the insert.
+        db.rollback()
+        existing = get_job_by_idempotency_key(db, user_id, idempotency_key) if idempotency_key else None
+        if existing is None:
+            raise
+        return _check_same_job(existing, kind, payload), False
+    db.refresh(job)
+    return job, True
+
+
+def _check_same_job(job: models.Job, kind: str, payload: dict) -> models.Job:
+    if job.kind != kind or job.payload != payload:
+        raise IdempotencyConflict(f"Idempotency key already used for job {job.id}")
+    return job
+
+
+def claim_job(db: Session, kinds: list[str], worker_id: str) -> models.Job | None:
+    """
+    Marks the oldest due job of one of `kinds` as running and returns it, or None when
+    there is nothing to do. Rows locked by other workers are skipped, so concurrent
+    claims never wait on each other or get the same job.
+    """
+    now = _utcnow()
+    job = db.scalars(
+        select(models.Job)
+        .where(models.Job.status == QUEUED, models.Job.kind.in_(kinds), models.Job.run_after <= now)
+        .order_by(models.Job.run_after, models.Job.id)
+        .limit(1)
+        .with_for_update(skip_locked=True)
+    ).first()
+    if job is None:
+        db.rollback()
+        return None
+
+    job.status = RUNNING
+    job.attempts += 1
+    job.locked_by = worker_id
+    job.locked_at = now
+    db.commit()
+    db.refresh(job)
+    return job
+
+
+def _held_by(job_id: int, worker_id: str) -> tuple:
+    """Conditions matching the job only while `worker_id` is running it."""
+    return models.Job.id == job_id, models.Job.status == RUNNING, models.Job.locked_by == worker_id
+
+
+def renew_lease(db: Session, job_id: int, worker_id: str) -> bool:
+    """
+    Moves `locked_at` of a job this worker is running to now, so `requeue_stale_jobs`
+    leaves it alone. Returns False when the worker no longer holds the job.
+    """
+    result = db.execute(update(models.Job).where(*_held_by(job_id, worker_id)).values(locked_at=_utcnow()))
+    db.commit()
+    return result.rowcount == 1
+
+
+def complete_job(db: Session, job: models.Job, result: dict | None, worker_id: str) -> models.Job | None:
+    """
+    Marks the job succeeded with `result`. Returns None, leaving the job untouched, when
+    the worker lost its lease, e.g. because the job was requeued and another worker runs it.
+    """
+    updated = db.execute(
+        update(models.Job)
+        .where(*_held_by(job.id, worker_id))
+        .values(status=SUCCEEDED, result=result, error=None, finished_at=_utcnow())
+    )
+    db.commit()
+    if updated.rowcount != 1:
+        return None
+    db.refresh(job)
+    return job
+
+
+def fail_job(db: Session, job: models.Job, error: str, retry_delay: timedelta, worker_id: str) -> models.Job | None:
+    """
+    Requeues the job after `retry_delay` while it has attempts left, marks it failed otherwise.
+    Returns None, leaving the job untouched, when the worker lost its lease.
+    """
+    values = {"error": error, "locked_by": None, "locked_at": None}
+    if job.attempts < job.max_attempts:
+        values.update(status=QUEUED, run_after=_utcnow() + retry_delay)
+    else:
+        values.update(status=FAILED, finished_at=_utcnow())
+    updated = db.execute(update(models.Job).where(*_held_by(job.id, worker_id)).values(**values))
+    db.commit()
+    if updated.rowcount != 1:
+        return None
+    db.refresh(job)
+    return job
+
+
+def requeue_stale_jobs(db: Session, lease: timedelta) -> int:
+    """
+    Requeues running jobs whose worker took them more than `lease` ago and never
+    finished, e.g. because it was killed. Jobs without attempts left are marked failed
+    instead, so a job that crashes its worker can't take down every worker in turn.
+    Returns the number of jobs requeued.
+    """
+    now = _utcnow()
+    stale = (models.Job.status == RUNNING, models.Job.locked_at < now - lease)
+    db.execute(
+        update(models.Job)
+        .where(*stale, models.Job.attempts >= models.Job.max_attempts)
+        .values(status=FAILED, error="Worker lease expired", locked_by=None, locked_at=None, finished_at=now)
+    )
+    result = db.execute(
+        update(models.Job)
+        .where(*stale)
+        .values(status=QUEUED, locked_by=None, locked_at=None)
+    )
+    db.commit()
+    return result.rowcount
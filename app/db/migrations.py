@@ -0,0 +1,166 @@
+"""
+Schema migrations for databases created before a change to `models`.
+
+`Base.metadata.create_all` only creates missing tables, so indexes and columns
+added to existing tables have to be applied here. Every statement is idempotent
+and recorded in `schema_migrations`, so running this repeatedly is safe. Large
+tables are changed without rewriting them or holding exclusive locks for long:
+columns are added without volatile defaults and backfilled in id-range batches.
+
+Usage:
+    python -m app.db.migrations     # creates missing tables, then applies pending migrations
+"""
+import logging
+
+from typing import Callable
+
+from sqlalchemy import text
+from sqlalchemy.engine import Connection, Engine
+
+from app.db.database import Base, engine as default_engine
+from app.db import models  # noqa: F401, registers the tables on Base.metadata
+
+logger = logging.getLogger(__name__)
+
+
+BACKFILL_BATCH_SIZE = 10000
+
+
+def _backfill_text_features(conn: Connection, column: str, value: str) -> None:
+    """
+    Sets `column` to the SQL expression `value` where it is NULL, walking the primary key
+    in ranges of BACKFILL_BATCH_SIZE ids. Each batch is one short transaction (the
+    connection autocommits) that reads only its own id range, instead of rescanning the
+    rows earlier batches already updated.
+    """
+    max_id = conn.execute(text("SELECT max(id) FROM text_features")).scalar()
+    last = 0
+    while max_id is not None and last < max_id:
+        conn.execute(text(
+            f"UPDATE text_features SET {column} = {value} "
+            f"WHERE id > :low AND id <= :high AND {column} IS NULL"
+        ), {"low": last, "high": last + BACKFILL_BATCH_SIZE})
+        last += BACKFILL_BATCH_SIZE
+
+
+def _backfill_length(conn: Connection) -> None:
+    _backfill_text_features(conn, "length", "char_length(text)")
+
+
+def _backfill_random_key(conn: Connection) -> None:
+    # Rows inserted after max(id) was read get the default from 0011.
+    _backfill_text_features(conn, "random_key", "random()")
+
+
+def _random_key_not_null(conn: Connection) -> None:
+    # SET NOT NULL alone scans the table under an ACCESS EXCLUSIVE lock. Validating a CHECK
+    # constraint first only takes a SHARE UPDATE EXCLUSIVE lock, and lets SET NOT NULL skip the scan.
+    conn.execute(text("ALTER TABLE text_features DROP CONSTRAINT IF EXISTS ck_text_features_random_key_not_null"))
+    conn.execute(text(
+        "ALTER TABLE text_features ADD CONSTRAINT ck_text_features_random_key_not_null "
+        "CHECK (random_key IS NOT NULL) NOT VALID"
+    ))
+    conn.execute(text("ALTER TABLE text_features VALIDATE CONSTRAINT ck_text_features_random_key_not_null"))
+    conn.execute(text("ALTER TABLE text_features ALTER COLUMN random_key SET NOT NULL"))
+    conn.execute(text("ALTER TABLE text_features DROP CONSTRAINT ck_text_features_random_key_not_null"))
+
+
+# (name, statement) pairs, applied in order. Never edit an applied entry, append a new one.
+# A statement is SQL, or a function running several statements on an autocommit connection.
+# CONCURRENTLY keeps the tables writable while the index builds on large tables.
+MIGRATIONS: list[tuple[str, str | Callable[[Connection], None]]] = [
+    (
+        "0001_text_features_dataset_id_id",
+        "CREATE INDEX CONCURRENTLY IF NOT EXISTS ix_text_features_dataset_id_id "
+        "ON text_features (dataset_id, id)",
+    ),
+    (
+        "0002_datasets_title",
+        "CREATE INDEX CONCURRENTLY IF NOT EXISTS ix_datasets_title "
+        "ON datasets (title)",
+    ),
+    (
+        "0003_simple_quizzes_text",
+        "CREATE INDEX CONCURRENTLY IF NOT EXISTS ix_simple_quizzes_text "
+        "ON simple_quizzes USING hash (text)",
+    ),
+    (
+        "0004_text_features_sampling_columns",
+        # Without a default: a volatile one (random()) would rewrite the table under an exclusive lock.
+        "ALTER TABLE text_features "
+        "ADD COLUMN IF NOT EXISTS random_key DOUBLE PRECISION, "
+        "ADD COLUMN IF NOT EXISTS length INTEGER, "
+        "ADD COLUMN IF NOT EXISTS verb_tags VARCHAR",
+    ),
+    ("0005_text_features_length_backfill", _backfill_length),
+    (
+        "0006_text_features_dataset_id_random_key",
+        "CREATE INDEX CONCURRENTLY IF NOT EXISTS ix_text_features_dataset_id_random_key "
+        "ON text_features (dataset_id, random_key)",
+    ),
+    (
+        "0007_datasets_version",
+        "ALTER TABLE datasets ADD COLUMN IF NOT EXISTS version INTEGER NOT NULL DEFAULT 1",
+    ),
+    (
+        "0008_jobs_user_id",
+        "ALTER TABLE jobs ADD COLUMN IF NOT EXISTS user_id INTEGER REFERENCES users (id) ON DELETE CASCADE",
+    ),
+    (
+        "0009_jobs_user_id_idempotency_key",
+        "CREATE UNIQUE INDEX CONCURRENTLY IF NOT EXISTS uq_jobs_user_id_idempotency_key "
+        "ON jobs (user_id, idempotency_key)",
+    ),
+    (
+        "0010_jobs_drop_global_idempotency_key",
+        "ALTER TABLE jobs DROP CONSTRAINT IF EXISTS jobs_idempotency_key_key",
+    ),
+    (
+        # Rows inserted from now on get a key; only the default changes, no row is rewritten.
+        "0011_text_features_random_key_default",
+        "ALTER TABLE text_features ALTER COLUMN random_key SET DEFAULT random()",
+    ),
+    ("0012_text_features_random_key_backfill", _backfill_random_key),
+    ("0013_text_features_random_key_not_null", _random_key_not_null),
+]
+
+
+def get_applied_migrations(engine: Engine) -> set[str]:
+    with engine.begin() as conn:
+        conn.execute(text(
+            "CREATE TABLE IF NOT EXISTS schema_migrations ("
+            "name VARCHAR PRIMARY KEY, "
+            "applied_at TIMESTAMP NOT NULL DEFAULT CURRENT_TIMESTAMP)"
+        ))
+        return set(conn.execute(text("SELECT name FROM schema_migrations")).scalars())
+
+
+def apply_migrations(engine: Engine = default_engine) -> list[str]:
+    """
+    Applies all pending migrations and returns the names of the ones that ran.
+    """
+    applied = get_applied_migrations(engine)
+    ran = []
+
+    for name, statement in MIGRATIONS:
+        if name in applied:
+            continue
+
+        logger.info(f"Applying migration {name}")
+        # CREATE INDEX CONCURRENTLY cannot run inside a transaction block.
+        with engine.connect().execution_options(isolation_level="AUTOCOMMIT") as conn:
+            if callable(statement):
+                statement(conn)
+            else:
+                conn.execute(text(statement))
+            conn.execute(text("INSERT INTO schema_migrations (name) VALUES (:name)"), {"name": name})
+        ran.append(name)
+
+    return ran
+
+
+if __name__ == "__main__":
+    logging.basicConfig(level=logging.INFO, format="%(asctime)-15s %(levelname)-8s %(message)s")
+    Base.metadata.create_all(bind=default_engine)
+    ran = apply_migrations()
+    logger.info(f"Applied {len(ran)} migration(s): {ran}")
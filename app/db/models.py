@@ -1,4 +1,6 @@
-from sqlalchemy import Boolean, Column, ForeignKey, Integer, String
+import random
+from datetime import datetime, timezone
+from sqlalchemy import JSON, Boolean, Column, DateTime, Float, ForeignKey, Index, Integer, String, UniqueConstraint
 from sqlalchemy.orm import relationship
 from sqlalchemy.ext.hybrid import hybrid_property
 from app.db.database import Base
@@ -8,10 +10,12 @@ class Dataset(Base):
     __tablename__ = "datasets"
 
     id = Column(Integer, primary_key=True)
-    title = Column(String)
+    title = Column(String, index=True)
     source = Column(String)
+    # Incremented on every write to the dataset's entries; the ETags of dataset reads are built from it.
+    version = Column(Integer, nullable=False, default=1, server_default="1")
 
-    entries = relationship("TextFeature", back_populates="dataset")
+    entries = relationship("TextFeature", back_populates="dataset", order_by="TextFeature.id")
 
 
 class TextFeature(Base):
@@ -21,8 +25,22 @@ class TextFeature(Base):
     text = Column(String)
     dataset_id = Column(Integer, ForeignKey("datasets.id"))
 
+    # Uniform [0, 1) key assigned at write time, used for random sampling.
+    random_key = Column(Float, nullable=False, default=random.random)
+    # Number of characters in `text`.
+    length = Column(Integer)
+    # Distinct verb tags found in `text`, space separated and padded (e.g. " VBD VBZ "),
+    # so a single tag can be matched with LIKE '% VBD %'.
+    verb_tags = Column(String)
+
     dataset = relationship("Dataset", back_populates="entries")
 
+    # Serves both the dataset filter and keyset pagination on (dataset_id, id).
+    __table_args__ = (
+        Index("ix_text_features_dataset_id_id", "dataset_id", "id"),
+        Index("ix_text_features_dataset_id_random_key", "dataset_id", "random_key"),
+    )
+
 
 class QuizType(Base):
     __tablename__ = "quiz_type"
@@ -40,6 +58,11 @@ class SimpleQuiz(Base):
 
     answers = relationship("SimpleAnswer", back_populates="quiz")
 
+    # Only ever looked up by equality; a hash index also avoids the btree row size limit.
+    __table_args__ = (
+        Index("ix_simple_quizzes_text", "text", postgresql_using="hash"),
+    )
+
 
 class SequenceQuiz(Base):
     __tablename__ = "sequence_quizzes"
@@ -139,3 +162,110 @@ class APIKey(Base):
     user_id = Column(Integer, ForeignKey("users.id"))
 
     user = relationship("User", back_populates="api_keys")
+
+
+
+class UserSentence(Base):
+    """
+    A sentence from a user's reading history. Each user keeps only their most recent
+    sentences (see `sentence_bank_crud.append_user_sentences`), oldest dropped first.
+    """
+    __tablename__ = "user_sentences"
+
+    id = Column(Integer, primary_key=True)
+    user_id = Column(Integer, ForeignKey("users.id", ondelete="CASCADE"), nullable=False)
+    text = Column(String, nullable=False)
+    # sha256 of the whitespace-normalized text, for deduplication.
+    text_hash = Column(String(64), nullable=False)
+    # [[word, tag, confidence], ...] tagged on write, so generating quizzes doesn't tag again.
+    pos_tags = Column(JSON, nullable=False)
+
+    # (user_id, id) serves sampling and trimming to the newest rows.
+    __table_args__ = (
+        UniqueConstraint("user_id", "text_hash", name="uq_user_sentences_user_id_text_hash"),
+        Index("ix_user_sentences_user_id_id", "user_id", "id"),
+    )
+
+
+def _utcnow() -> datetime:
+    return datetime.now(timezone.utc)
+
+
+class Job(Base):
+    """
+    A unit of background work, claimed by `app.service.jobs.worker` with
+    SELECT ... FOR UPDATE SKIP LOCKED, so several workers can share the table.
+    """
+    __tablename__ = "jobs"
+
+    id = Column(Integer, primary_key=True)
+    # The user who queued it, the only one who can see it.
+    user_id = Column(Integer, ForeignKey("users.id", ondelete="CASCADE"))
+    # Name of the handler in app.service.jobs.handlers.JOB_HANDLERS.
+    kind = Column(String, nullable=False)
+    payload = Column(JSON, nullable=False, default=dict)
+    # queued -> running -> succeeded | failed. A failed attempt with attempts left goes back to queued.
+    status = Column(String, nullable=False, default="queued")
+    # Enqueueing again with the same key returns the user's existing job instead of a new one.
+    idempotency_key = Column(String)
+    result = Column(JSON)
+    error = Column(String)
+    attempts = Column(Integer, nullable=False, default=0)
+    max_attempts = Column(Integer, nullable=False, default=3)
+    # Not claimed before this time, pushed back after a failed attempt.
+    run_after = Column(DateTime(timezone=True), nullable=False, default=_utcnow)
+    locked_by = Column(String)
+    locked_at = Column(DateTime(timezone=True))
+    created_at = Column(DateTime(timezone=True), nullable=False, default=_utcnow)
+    finished_at = Column(DateTime(timezone=True))
+
+    # Serves the claim query: the oldest queued job of a kind that is due.
+    __table_args__ = (
+        Index("ix_jobs_status_kind_run_after", "status", "kind", "run_after"),
+        UniqueConstraint("user_id", "idempotency_key", name="uq_jobs_user_id_idempotency_key"),
+    )
+
+
+class ReviewItem(Base):
+    """
+    A quiz served to a user, with its spaced repetition state (see
+    `app.service.review.scheduler`). Served again once `due_at` has passed.
+    """
+    __tablename__ = "review_items"
+
+    id = Column(Integer, primary_key=True)
+    user_id = Column(Integer, ForeignKey("users.id", ondelete="CASCADE"), nullable=False)
+    # "simple" or "sequence".
+    quiz_type = Column(String, nullable=False)
+    # The quiz as served, in the API's JSON shape, so a review needs no generation.
+    quiz = Column(JSON, nullable=False)
+    # sha256 of the quiz type and text, so a user isn't given the same quiz twice.
+    quiz_hash = Column(String(64), nullable=False)
+    repetitions = Column(Integer, nullable=False, default=0)
+    interval_days = Column(Float, nullable=False, default=0.0)
+    ease = Column(Float, nullable=False, default=2.5)
+    due_at = Column(DateTime(timezone=True), nullable=False, default=_utcnow)
+    last_reviewed_at = Column(DateTime(timezone=True))
+    created_at = Column(DateTime(timezone=True), nullable=False, default=_utcnow)
+
+    # (user_id, due_at) serves the due queue: a user's items that are due, most overdue first.
+    __table_args__ = (
+        UniqueConstraint("user_id", "quiz_hash", name="uq_review_items_user_id_quiz_hash"),
+        Index("ix_review_items_user_id_due_at", "user_id", "due_at"),
+    )
+
+
+class RateLimitBucket(Base):
+    """
+    The shared state of a token bucket, which every API process folds its local
+    consumption into (see `app.service.rate_limit.limiter`).
+    """
+    __tablename__ = "rate_limit_buckets"
+
+    # e.g. "user:42"
+    principal = Column(String, primary_key=True)
+    # "nlp" or "llm", see app.service.rate_limit.config.
+    route_class = Column(String, primary_key=True)
+    tokens = Column(Float, nullable=False)
+    # Unix time the tokens were last refilled up to.
+    updated_at = Column(Float, nullable=False)
@@ -0,0 +1,38 @@
+from sqlalchemy import select
+from sqlalchemy.exc import IntegrityError
+from sqlalchemy.orm import Session
+
+from app.db import models
+
+
+def sync_bucket(db: Session, principal: str, route_class: str, capacity: float, rate: float,
+                consumed: float, now: float) -> float:
+    """
+    Refills the shared bucket up to `now`, takes the `consumed` tokens out of it and
+    returns the tokens left. The row is locked while it is updated, so concurrent
+    processes don't lose each other's consumption.
+    """
+    for attempt in range(2):
+        bucket = db.scalars(
+            select(models.RateLimitBucket)
+            .where(models.RateLimitBucket.principal == principal, models.RateLimitBucket.route_class == route_class)
+            .with_for_update()
+        ).first()
+        if bucket is None:
+            bucket = models.RateLimitBucket(principal=principal, route_class=route_class, tokens=capacity, updated_at=now)
+            db.add(bucket)
+        else:
+            elapsed = max(0.0, now - bucket.updated_at)
+            bucket.tokens = min(capacity, bucket.tokens + elapsed * rate)
+            bucket.updated_at = max(now, bucket.updated_at)
+        bucket.tokens = max(0.0, bucket.tokens - consumed)
+        tokens = bucket.tokens
+        try:
+            db.commit()
+            return tokens
+        except IntegrityError:
+            # Another process created the bucket first; update that one.
+            db.rollback()
+            if attempt:
+                raise
+    return tokens
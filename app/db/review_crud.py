@@ -0,0 +1,82 @@
+import hashlib
+from datetime import datetime, timedelta, timezone
+
+from sqlalchemy import select
+from sqlalchemy.exc import IntegrityError
+from sqlalchemy.orm import Session
+
+from app.db import models
+from app.service.review import scheduler
+
+
+def _utcnow() -> datetime:
+    return datetime.now(timezone.utc)
+
+
+def quiz_hash(quiz_type: str, text: str) -> str:
+    return hashlib.sha256(f"{quiz_type}\n{text}".encode("utf-8")).hexdigest()
+
+
+def get_review_item(db: Session, user_id: int, item_id: int) -> models.ReviewItem | None:
+    return db.scalars(
+        select(models.ReviewItem).where(models.ReviewItem.id == item_id, models.ReviewItem.user_id == user_id)
+    ).first()
+
+
+def get_due_reviews(db: Session, user_id: int, quiz_type: str, limit: int,
+                    now: datetime | None = None) -> list[models.ReviewItem]:
+    """Up to `limit` of the user's quizzes of `quiz_type` that are due, most overdue first."""
+    return list(db.scalars(
+        select(models.ReviewItem)
+        .where(
+            models.ReviewItem.user_id == user_id,
+            models.ReviewItem.due_at <= (now or _utcnow()),
+            models.ReviewItem.quiz_type == quiz_type,
+        )
+        .order_by(models.ReviewItem.due_at, models.ReviewItem.id)
+        .limit(limit)
+    ))
+
+
+def add_review_items(db: Session, user_id: int, quizzes: list[dict], limit: int,
+                     now: datetime | None = None) -> list[models.ReviewItem]:
+    """
+    Schedules up to `limit` of `quizzes` (in the API's JSON shape) for the user, due
+    now, skipping quizzes the user already has. Returns the new items.
+    """
+    by_hash = {}
+    for quiz in quizzes:
+        by_hash.setdefault(quiz_hash(quiz["type"], quiz["text"]), quiz)
+    known = set(db.scalars(
+        select(models.ReviewItem.quiz_hash)
+        .where(models.ReviewItem.user_id == user_id, models.ReviewItem.quiz_hash.in_(list(by_hash)))
+    ))
+
+    now = now or _utcnow()
+    items = [
+        models.ReviewItem(user_id=user_id, quiz_type=quiz["type"], quiz=quiz, quiz_hash=h, due_at=now, created_at=now)
+        for h, quiz in by_hash.items() if h not in known
+    ][:limit]
+    db.add_all(items)
+    try:
+        db.commit()
+    except IntegrityError:
+        # A concurrent request scheduled one of the same quizzes first.
+        db.rollback()
+        return []
+    return items
+
+
+def record_answer(db: Session, item: models.ReviewItem, quality: int,
+                  now: datetime | None = None) -> models.ReviewItem:
+    """Grades the answer to `item` and schedules its next review."""
+    now = now or _utcnow()
+    state = scheduler.review(scheduler.ReviewState(item.repetitions, item.interval_days, item.ease), quality)
+    item.repetitions = state.repetitions
+    item.interval_days = state.interval_days
+    item.ease = state.ease
+    item.due_at = now + timedelta(days=state.interval_days)
+    item.last_reviewed_at = now
+    db.commit()
+    db.refresh(item)
+    return item
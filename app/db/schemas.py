@@ -1,5 +1,6 @@
-from pydantic import BaseModel, ConfigDict
-from typing import List
+from datetime import datetime
+from pydantic import BaseModel, ConfigDict, Field
+from typing import Any, List
 
 class SimpleAnswerBase(BaseModel):
     text: str
@@ -153,6 +154,15 @@ class Dataset(DatasetBase):
         from_attributes = True
 
 
+class DatasetSummary(DatasetBase):
+    """Schema used for listing datasets without loading their entries."""
+    id: int
+    entry_count: int
+
+    class ConfigDict:
+        from_attributes = True
+
+
 class UserSettingsBase(BaseModel):
     """Base schema with common fields."""
     native_language_code: str
@@ -168,3 +178,61 @@ class UserSettings(UserSettingsBase):
 
     class ConfigDict:
         from_attributes = True
+
+
+class JobBase(BaseModel):
+    kind: str
+    payload: dict[str, Any] = {}
+
+
+class JobCreate(JobBase):
+    """Schema used for enqueueing a background job."""
+    pass
+
+
+class Job(JobBase):
+    """Schema used for returning a job's status and, once it finished, its result."""
+    id: int
+    status: str
+    result: dict[str, Any] | None = None
+    error: str | None = None
+    attempts: int
+    created_at: datetime
+    finished_at: datetime | None = None
+
+    model_config = ConfigDict(from_attributes=True)
+
+
+class UserSentencesAppend(BaseModel):
+    """Schema used for adding sentences from the user's reading history to their bank."""
+    sentences: list[str] = Field(..., min_length=1, max_length=500)
+
+
+class UserSentencesAppendResult(BaseModel):
+    added: int
+    duplicates: int
+    size: int
+
+
+class UserSentence(BaseModel):
+    id: int
+    text: str
+
+    model_config = ConfigDict(from_attributes=True)
+
+
+class ReviewAnswer(BaseModel):
+    """Schema used for grading an answer to a served quiz."""
+    quality: int = Field(..., ge=0, le=5, description="0 for no recall at all up to 5 for a perfect answer; below 3 counts as wrong.")
+
+
+class ReviewItem(BaseModel):
+    id: int
+    quiz_type: str
+    repetitions: int
+    interval_days: float
+    ease: float
+    due_at: datetime
+    last_reviewed_at: datetime | None = None
+
+    model_config = ConfigDict(from_attributes=True)
@@ -0,0 +1,99 @@
+import hashlib
+import random
+from typing import Iterable
+
+from sqlalchemy import delete, func, select
+from sqlalchemy.exc import IntegrityError
+from sqlalchemy.orm import Session
+
+from app.db import models
+
+
+def sentence_hash(text: str) -> str:
+    return hashlib.sha256(" ".join(text.split()).encode("utf-8")).hexdigest()
+
+
+def count_user_sentences(db: Session, user_id: int) -> int:
+    return db.scalar(select(func.count(models.UserSentence.id)).where(models.UserSentence.user_id == user_id))
+
+
+def get_user_sentences(db: Session, user_id: int, limit: int = 100, after_id: int | None = None) -> list[models.UserSentence]:
+    query = select(models.UserSentence)\
+        .where(models.UserSentence.user_id == user_id)\
+        .order_by(models.UserSentence.id)\
+        .limit(limit)
+    if after_id is not None:
+        query = query.where(models.UserSentence.id > after_id)
+    return list(db.scalars(query))
+
+
+def existing_hashes(db: Session, user_id: int, hashes: Iterable[str]) -> set[str]:
+    return set(db.scalars(
+        select(models.UserSentence.text_hash)
+        .where(models.UserSentence.user_id == user_id, models.UserSentence.text_hash.in_(list(hashes)))
+    ))
+
+
+def append_user_sentences(
+    db: Session,
+    user_id: int,
+    sentences: list[tuple[str, str, list]],
+    capacity: int,
+) -> int:
+    """
+    Stores (text, text_hash, pos_tags) sentences whose hash the user doesn't have yet,
+    then deletes the user's oldest sentences beyond `capacity`. Returns how many were added.
+    """
+    try:
+        added = _insert_new(db, user_id, sentences)
+    except IntegrityError:
+        # A concurrent append stored some of the same sentences first; they are known now.
+        db.rollback()
+        added = _insert_new(db, user_id, sentences)
+
+    # The id of the oldest sentence still kept, everything before it is dropped.
+    oldest_kept = db.scalar(
+        select(models.UserSentence.id)
+        .where(models.UserSentence.user_id == user_id)
+        .order_by(models.UserSentence.id.desc())
+        .offset(max(capacity, 1) - 1)
+        .limit(1)
+    )
+    if oldest_kept is not None:
+        db.execute(
+            delete(models.UserSentence)
+            .where(models.UserSentence.user_id == user_id, models.UserSentence.id < oldest_kept)
+        )
+    db.commit()
+    return added
+
+
+def _insert_new(db: Session, user_id: int, sentences: list[tuple[str, str, list]]) -> int:
+    known = existing_hashes(db, user_id, [h for _, h, _ in sentences])
+    added = 0
+    for text, text_hash, pos_tags in sentences:
+        if text_hash in known:
+            continue
+        known.add(text_hash)
+        db.add(models.UserSentence(user_id=user_id, text=text, text_hash=text_hash, pos_tags=pos_tags))
+        added += 1
+    db.flush()
+    return added
+
+
+def sample_user_sentences(db: Session, user_id: int, n: int, rng: random.Random | None = None) -> list[models.UserSentence]:
+    """
+    Picks up to `n` random sentences of the user. The bank is capped, so drawing from
+    all of the user's ids is cheap.
+    """
+    rng = rng or random.Random()
+    ids = list(db.scalars(
+        select(models.UserSentence.id)
+        .where(models.UserSentence.user_id == user_id)
+        .order_by(models.UserSentence.id)
+    ))
+    picked = rng.sample(ids, min(n, len(ids)))
+    if not picked:
+        return []
+    rows = {s.id: s for s in db.scalars(select(models.UserSentence).where(models.UserSentence.id.in_(picked)))}
+    return [rows[i] for i in picked if i in rows]
@@ -1,8 +1,14 @@
-from sqlalchemy.orm import Session
-from sqlalchemy import select
+import itertools
+import random
+from typing import Iterator
+from sqlalchemy.orm import Session, selectinload
+from sqlalchemy import Row, func, select, update
 
 from app.db import models, schemas
 
+# Entries taken after each random starting point by `sample_text_features`.
+SAMPLE_WINDOW = 4
+
 
 def create_dataset(db: Session, dataset: schemas.DatasetCreate) -> models.Dataset:
     db_dataset = models.Dataset(title=dataset.title, source=dataset.source)
@@ -20,21 +26,253 @@ def get_dataset_by_title(db: Session, title: str) -> models.Dataset:
     return db.scalars(select(models.Dataset).where(models.Dataset.title == title)).first()
 
 
-def get_datasets(db: Session, offset: int, limit: int) -> list[models.Dataset]:
-    return db.scalars(select(models.Dataset).offset(offset).limit(limit))
+def get_datasets(db: Session, offset: int, limit: int, after_id: int | None = None) -> list[models.Dataset]:
+    """
+    Pages datasets in id order. Passing the last seen id as `after_id` uses keyset
+    pagination and ignores `offset`, so deep pages cost the same as the first one.
+    The entries of the whole page are loaded with one extra query.
+    """
+    query = select(models.Dataset)\
+        .options(selectinload(models.Dataset.entries))\
+        .order_by(models.Dataset.id)\
+        .limit(limit)
+    if after_id is not None:
+        return db.scalars(query.where(models.Dataset.id > after_id))
+    return db.scalars(query.offset(offset))
+
+
+def get_dataset_summaries(db: Session, offset: int, limit: int, after_id: int | None = None) -> list[Row]:
+    """
+    Same paging as `get_datasets`, but returns (id, title, source, entry_count) rows.
+    Entry counts come from a correlated subquery in the same statement, so listing
+    never touches `Dataset.entries`.
+    """
+    entry_count = select(func.count(models.TextFeature.id))\
+        .where(models.TextFeature.dataset_id == models.Dataset.id)\
+        .scalar_subquery()
+    query = select(
+        models.Dataset.id,
+        models.Dataset.title,
+        models.Dataset.source,
+        entry_count.label("entry_count"),
+    ).order_by(models.Dataset.id).limit(limit)
+    if after_id is not None:
+        return db.execute(query.where(models.Dataset.id > after_id)).all()
+    return db.execute(query.offset(offset)).all()
 
 
-def create_text_feature(db: Session, feature: schemas.TextFeatureCreate) -> models.TextFeature:
-    db_feature = models.TextFeature(text=feature.text, dataset_id=feature.dataset_id)
+def create_text_feature(db: Session, feature: schemas.TextFeatureCreate, verb_tags: list[str] | None = None) -> models.TextFeature:
+    db_feature = models.TextFeature(
+        text=feature.text,
+        dataset_id=feature.dataset_id,
+        length=len(feature.text),
+        verb_tags=format_verb_tags(verb_tags) if verb_tags is not None else None,
+    )
     db.add(db_feature)
+    bump_dataset_version(db, feature.dataset_id)
     db.commit()
     db.refresh(db_feature)
     return db_feature
 
 
+def create_text_features(db: Session, dataset_id: int, entries: list[tuple[str, list[str] | None]]) -> int:
+    """
+    Adds (text, verb_tags) entries to a dataset in one transaction, so a failure
+    stores none of them. Returns the number added.
+    """
+    db.add_all(
+        models.TextFeature(
+            text=text,
+            dataset_id=dataset_id,
+            length=len(text),
+            verb_tags=format_verb_tags(verb_tags) if verb_tags is not None else None,
+        )
+        for text, verb_tags in entries
+    )
+    if entries:
+        bump_dataset_version(db, dataset_id)
+    db.commit()
+    return len(entries)
+
+
+def get_dataset_texts(db: Session, dataset_id: int) -> set[str]:
+    return set(db.scalars(select(models.TextFeature.text).where(models.TextFeature.dataset_id == dataset_id)))
+
+
+def bump_dataset_version(db: Session, dataset_id: int) -> None:
+    """Marks the dataset as changed, in the caller's transaction."""
+    db.execute(
+        update(models.Dataset)
+        .where(models.Dataset.id == dataset_id)
+        .values(version=models.Dataset.version + 1)
+    )
+
+
+def get_dataset_version(db: Session, dataset_id: int) -> int | None:
+    return db.scalar(select(models.Dataset.version).where(models.Dataset.id == dataset_id))
+
+
+def get_dataset_versions(db: Session, offset: int, limit: int, after_id: int | None = None) -> list[Row]:
+    """(id, version) rows of the page `get_dataset_summaries` returns for the same arguments."""
+    query = select(models.Dataset.id, models.Dataset.version).order_by(models.Dataset.id).limit(limit)
+    if after_id is not None:
+        return db.execute(query.where(models.Dataset.id > after_id)).all()
+    return db.execute(query.offset(offset)).all()
+
+
 def get_text_feature(db: Session, feature_id: int) -> models.TextFeature:
     return db.scalars(select(models.TextFeature).where(models.TextFeature.id == feature_id)).first()
 
 
-def get_text_features(db: Session, dataset_id: int, offset: int, limit: int) -> list[models.TextFeature]:
-    return db.scalars(select(models.TextFeature).where(models.TextFeature.dataset_id == dataset_id).offset(offset).limit(limit))
+def get_text_features(db: Session, dataset_id: int, offset: int, limit: int, after_id: int | None = None) -> list[models.TextFeature]:
+    """
+    Pages the entries of a dataset in id order, served by the (dataset_id, id) index.
+    Passing the last seen id as `after_id` uses keyset pagination and ignores `offset`.
+    """
+    query = select(models.TextFeature)\
+        .where(models.TextFeature.dataset_id == dataset_id)\
+        .order_by(models.TextFeature.id)\
+        .limit(limit)
+    if after_id is not None:
+        return db.scalars(query.where(models.TextFeature.id > after_id))
+    return db.scalars(query.offset(offset))
+
+
+def iter_text_features(db: Session, dataset_id: int, batch_size: int = 1000) -> Iterator[Row]:
+    """
+    Yields (id, text, dataset_id) rows of a dataset in id order. `yield_per` streams
+    them through a server-side cursor, so memory stays bounded by `batch_size`.
+    """
+    query = select(models.TextFeature.id, models.TextFeature.text, models.TextFeature.dataset_id)\
+        .where(models.TextFeature.dataset_id == dataset_id)\
+        .order_by(models.TextFeature.id)\
+        .execution_options(yield_per=batch_size)
+    yield from db.execute(query)
+
+
+def get_text_features_without_verb_tags(
+    db: Session, limit: int, after_id: int = 0, dataset_id: int | None = None,
+) -> list[Row]:
+    """(id, text) rows with no `verb_tags` yet, in id order after `after_id`."""
+    query = select(models.TextFeature.id, models.TextFeature.text)\
+        .where(models.TextFeature.verb_tags.is_(None), models.TextFeature.id > after_id)\
+        .order_by(models.TextFeature.id)\
+        .limit(limit)
+    if dataset_id is not None:
+        query = query.where(models.TextFeature.dataset_id == dataset_id)
+    return db.execute(query).all()
+
+
+def set_verb_tags(db: Session, verb_tags_by_id: dict[int, list[str]]) -> None:
+    """Stores the verb tags of existing entries, in one transaction."""
+    for feature_id, verb_tags in verb_tags_by_id.items():
+        db.execute(
+            update(models.TextFeature)
+            .where(models.TextFeature.id == feature_id)
+            .values(verb_tags=format_verb_tags(verb_tags))
+        )
+    db.commit()
+
+
+def format_verb_tags(verb_tags: list[str]) -> str:
+    """Formats tags for `TextFeature.verb_tags`, e.g. ["VBZ", "VBD"] -> " VBD VBZ "."""
+    return f" {' '.join(sorted(set(verb_tags)))} "
+
+
+def sample_text_features(
+    db: Session,
+    dataset_id: int,
+    n: int,
+    length_range: tuple[int, int | None] | None = None,
+    verb_tag: str | None = None,
+    rng: random.Random | None = None,
+) -> list[models.TextFeature]:
+    """
+    Picks up to `n` random entries of a dataset.
+
+    Every entry carries a uniform `random_key`, so the entries following a random
+    point in (dataset_id, random_key) index order are a random sample. This reads
+    about `n` index entries (divided by the selectivity of the filters) instead of
+    sorting the whole dataset like ORDER BY random() does. The sample is taken in
+    windows of `SAMPLE_WINDOW` entries, each after its own random point, so the same
+    neighbours in key order don't keep appearing together.
+
+    Args:
+        length_range: Optional (min, max) bounds on `length`, max exclusive and
+                      None for unbounded.
+        verb_tag: Only pick entries containing this verb tag, e.g. "VBD".
+        rng: Random source for the starting points.
+    """
+    rng = rng or random.Random()
+    query = select(models.TextFeature).where(models.TextFeature.dataset_id == dataset_id)
+    if length_range is not None:
+        min_length, max_length = length_range
+        query = query.where(models.TextFeature.length >= min_length)
+        if max_length is not None:
+            query = query.where(models.TextFeature.length < max_length)
+    if verb_tag is not None:
+        query = query.where(models.TextFeature.verb_tags.like(f"% {verb_tag} %"))
+
+    sample: dict[int, models.TextFeature] = {}
+    for _ in range(-(-n // SAMPLE_WINDOW)):
+        for feature in _sample_window(db, query, rng.random(), min(SAMPLE_WINDOW, n - len(sample))):
+            sample.setdefault(feature.id, feature)
+        if len(sample) >= n:
+            break
+    if len(sample) < n:
+        # Windows overlapped, the dataset (after filtering) is about as small as the sample.
+        sample.update((f.id, f) for f in db.scalars(
+            query.where(models.TextFeature.id.not_in(sample))
+            .order_by(models.TextFeature.random_key)
+            .limit(n - len(sample))
+        ))
+    return list(sample.values())
+
+
+def _sample_window(db: Session, query, start: float, size: int) -> list[models.TextFeature]:
+    """The `size` entries of `query` following `start` in key order, wrapping around."""
+    window = list(db.scalars(
+        query.where(models.TextFeature.random_key >= start)
+        .order_by(models.TextFeature.random_key)
+        .limit(size)
+    ))
+    if len(window) < size:
+        # Wrap around to the beginning of the key space.
+        window.extend(db.scalars(
+            query.where(models.TextFeature.random_key < start)
+            .order_by(models.TextFeature.random_key)
+            .limit(size - len(window))
+        ))
+    return window
+
+
+def sample_text_features_stratified(
+    db: Session,
+    dataset_id: int,
+    n: int,
+    length_buckets: list[tuple[int, int | None]] | None = None,
+    verb_tags: list[str] | None = None,
+    rng: random.Random | None = None,
+) -> list[models.TextFeature]:
+    """
+    Picks up to `n` random entries of a dataset, spread evenly over strata built from
+    every combination of `length_buckets` and `verb_tags`. Strata are visited in random
+    order and each takes its share of what is still missing, so a stratum that runs
+    short is made up by the ones sampled after it.
+    """
+    rng = rng or random.Random()
+    strata = list(itertools.product(length_buckets or [None], verb_tags or [None]))
+    rng.shuffle(strata)
+
+    sample: dict[int, models.TextFeature] = {}
+    remaining_strata = len(strata)
+    for length_range, verb_tag in strata:
+        # Share what is left between the strata not visited yet.
+        quota = -(-(n - len(sample)) // remaining_strata)
+        remaining_strata -= 1
+        if quota <= 0:
+            break
+        for feature in sample_text_features(db, dataset_id, quota, length_range, verb_tag, rng):
+            sample.setdefault(feature.id, feature)
+
+    return list(sample.values())[:n]
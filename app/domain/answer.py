@@ -1,10 +1,10 @@
-from abc import ABC, abstractmethod
+from abc import ABC
+from dataclasses import dataclass
 
 
+@dataclass(frozen=True, slots=True)
 class AbstractAnswer(ABC):
-
-    def __init__(self, text: str) -> None:
-        self.text = text
+    text: str
 
     def equals(self, x) -> bool:
         return self.text == x.text
@@ -13,32 +13,26 @@ class AbstractAnswer(ABC):
         return f"{self.text}"
     
 
+@dataclass(frozen=True, slots=True)
 class SimpleAnswer(AbstractAnswer):
-
-    def __init__(self, text: str, is_correct: bool) -> None:
-        super().__init__(text)
-        self.is_correct = is_correct
+    is_correct: bool
 
     def __str__(self) -> str:
         return f"{self.text} [Correct = {self.is_correct}]"
     
 
+@dataclass(frozen=True, slots=True)
 class ContextAnswer(AbstractAnswer):
-
-    def __init__(self, text: str, is_correct: bool, reasoning: str) -> None:
-        super().__init__(text)
-        self.is_correct = is_correct
-        self.reasoning = reasoning
+    is_correct: bool
+    reasoning: str
 
     def __str__(self) -> str:
         return f"{self.text} [Correct = {self.is_correct}]"
     
 
+@dataclass(frozen=True, slots=True)
 class SequenceAnswer(AbstractAnswer):
-
-    def __init__(self, text: str, correct_position: int) -> None:
-        super().__init__(text)
-        self.correct_position = correct_position
+    correct_position: int
 
     def __str__(self) -> str:
         return f"{self.text} [Correct position = {self.correct_position}]"
@@ -1,27 +1,31 @@
 from abc import ABC, abstractmethod
+from dataclasses import dataclass, field
 from app.db import schemas
 from app.domain.answer import AbstractAnswer, ContextAnswer, SequenceAnswer, SimpleAnswer
 
-class AbstractQuiz(ABC):
 
-    def __init__(self, text= "", answers: list[AbstractAnswer] = []) -> None:
-        self.text: str = text
-        self.answers: list = answers
+@dataclass(frozen=True, slots=True)
+class AbstractQuiz(ABC):
+    """
+    Immutable quiz. Answers are stored as a tuple and validity is computed once
+    at construction, so `is_valid()` and `get_correct_answers()` are cheap to repeat.
+    """
+    text: str
+    answers: tuple[AbstractAnswer, ...]
+    _valid: bool = field(init=False, repr=False, compare=False)
+
+    def __post_init__(self) -> None:
+        object.__setattr__(self, "answers", tuple(self.answers))
+        object.__setattr__(self, "_valid", self._check_valid())
 
-    def set_question(self, text: str) -> None:
-        self.text = text
+    def __str__(self) -> str:
+        return f"{self.text}\n" + "".join(f"{i+1}. {a}\n" for i, a in enumerate(self.answers))
 
-    def add_answer(self, answer: AbstractAnswer) -> None:
-        self.answers.append(answer)
+    def is_valid(self) -> bool:
+        return self._valid
 
-    def __str__(self) -> str:
-        res = f"{self.text}\n"
-        for i, a in enumerate(self.answers):
-            res += f"{i+1}. {a}\n"
-        return res
-    
     @abstractmethod
-    def is_valid(self) -> bool:
+    def _check_valid(self) -> bool:
         pass
 
     @abstractmethod
@@ -33,17 +37,26 @@ class AbstractQuiz(ABC):
         pass
 
 
-class SingleAnswerQuiz(AbstractQuiz):
+def _has_single_correct_answer(text: str, answers: tuple[AbstractAnswer, ...], answer_type: type) -> bool:
+    if text is None:
+        return False
+    correct = 0
+    for a in answers:
+        if not a.text:
+            return False
+        if isinstance(a, answer_type) and a.is_correct:
+            correct += 1
+    return correct == 1
 
-    def __init__(self, text: str, answers: list) -> None:
-        super().__init__(text, answers)
 
-    def is_valid(self) -> bool:
-        correct_answers = [a for a in self.answers if isinstance(a, SimpleAnswer) and a.is_correct]
-        return self.text is not None and len(correct_answers) == 1 and all(a.text for a in self.answers)
+@dataclass(frozen=True, slots=True)
+class SingleAnswerQuiz(AbstractQuiz):
+
+    def _check_valid(self) -> bool:
+        return _has_single_correct_answer(self.text, self.answers, SimpleAnswer)
 
     def get_correct_answers(self) -> list[SimpleAnswer]:
-        if not self.is_valid():
+        if not self._valid:
             return []
         return [a for a in self.answers if a.is_correct]
 
@@ -56,24 +69,24 @@ class SingleAnswerQuiz(AbstractQuiz):
         return quiz_schema, answer_schemas
 
 
+@dataclass(frozen=True, slots=True)
 class SequenceQuiz(AbstractQuiz):
 
-    def __init__(self, text: str, answers: list) -> None:
-        super().__init__(text, answers)
-
-    def is_valid(self) -> bool:
+    def _check_valid(self) -> bool:
         if self.text is None or not self.answers:
             return False
-        positions = [a.correct_position for a in self.answers if isinstance(a, SequenceAnswer)]
-        return sorted(positions) == list(range(len(self.answers)))  # Must be 0-based contiguous sequence
+        # Must be 0-based contiguous sequence
+        seen = [False] * len(self.answers)
+        for a in self.answers:
+            if not isinstance(a, SequenceAnswer) or not 0 <= a.correct_position < len(seen) or seen[a.correct_position]:
+                return False
+            seen[a.correct_position] = True
+        return True
 
     def get_correct_answers(self) -> list[SequenceAnswer]:
-        if not self.is_valid():
+        if not self._valid:
             return []
-        return sorted(
-            [a for a in self.answers if isinstance(a, SequenceAnswer)],
-            key=lambda a: a.correct_position
-        )
+        return sorted(self.answers, key=lambda a: a.correct_position)
 
     def to_create_schema(self) -> tuple[schemas.SequenceQuizCreate, list[schemas.SequenceAnswerCreate]]:
         quiz_schema = schemas.SequenceQuizCreate(text=self.text)
@@ -84,19 +97,16 @@ class SequenceQuiz(AbstractQuiz):
         return quiz_schema, answer_schemas
 
 
+@dataclass(frozen=True, slots=True)
 class ContextQuiz(AbstractQuiz):
+    explanation: str
+    identified_grammar: str
 
-    def __init__(self, text: str, answers: list, explanation: str, identified_grammar: str) -> None:
-        super().__init__(text, answers)
-        self.explanation = explanation
-        self.identified_grammar = identified_grammar
-
-    def is_valid(self) -> bool:
-        correct_answers = [a for a in self.answers if isinstance(a, ContextAnswer) and a.is_correct]
-        return self.text is not None and len(correct_answers) == 1 and all(a.text for a in self.answers)
+    def _check_valid(self) -> bool:
+        return _has_single_correct_answer(self.text, self.answers, ContextAnswer)
 
     def get_correct_answers(self) -> list[ContextAnswer]:
-        if not self.is_valid():
+        if not self._valid:
             return []
         return [a for a in self.answers if a.is_correct]
 
@@ -106,4 +116,4 @@ class ContextQuiz(AbstractQuiz):
             schemas.ContextAnswerCreate(text=a.text, is_correct=a.is_correct)
             for a in self.answers if isinstance(a, ContextAnswer)
         ]
-        return quiz_schema, answer_schemas
\ No newline at end of file
+        return quiz_schema, answer_schemas
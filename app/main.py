@@ -1,10 +1,12 @@
 from contextlib import asynccontextmanager
-import logging
 from fastapi import Depends, FastAPI
 
-from app.api.routers import data, quizzes, auth, user_settings
+from app.api import config
+from app.api.middleware import CompressionMiddleware, DeadlineMiddleware, ProfilingMiddleware
+from app.api.routers import data, jobs, quizzes, auth, sentence_bank, user_settings
 from app.db import models
 from app.db.database import engine
+from app.utils.logging_config import configure_logging
 # import nltk
 
 # nltk.download('punkt')
@@ -12,10 +14,7 @@ from app.db.database import engine
 # nltk.download('averaged_perceptron_tagger')
 # nltk.download('averaged_perceptron_tagger_eng')
 
-logging.basicConfig(
-    level=2,
-    format="%(asctime)-15s %(levelname)-8s %(message)s"
-)
+configure_logging()
 
 
 
@@ -26,10 +25,36 @@ async def lifespan(app: FastAPI):
 
 app = FastAPI()
 
+if config.COMPRESSION_ENABLED:
+    app.add_middleware(
+        CompressionMiddleware,
+        minimum_size=config.COMPRESSION_MIN_SIZE,
+        content_types=config.COMPRESSION_CONTENT_TYPES,
+        gzip_level=config.COMPRESSION_GZIP_LEVEL,
+        brotli_quality=config.COMPRESSION_BROTLI_QUALITY,
+    )
+
+app.add_middleware(
+    DeadlineMiddleware,
+    default_ms=config.REQUEST_DEADLINE_MS,
+    header=config.REQUEST_DEADLINE_HEADER,
+)
+
+if config.PROFILING_ENABLED:
+    app.add_middleware(
+        ProfilingMiddleware,
+        sample_rate=config.PROFILING_SAMPLE_RATE,
+        header=config.PROFILING_HEADER,
+        output_dir=config.PROFILING_OUTPUT_DIR,
+        slow_ms=config.PROFILING_SLOW_MS,
+    )
+
 app.include_router(quizzes.router)
 app.include_router(data.router)
 app.include_router(auth.router)
 app.include_router(user_settings.router)
+app.include_router(jobs.router)
+app.include_router(sentence_bank.router)
 
 @app.get("/")
 async def root():
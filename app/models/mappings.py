@@ -36,15 +36,15 @@ def quiz_to_dto(quiz) -> QuizDTO:
         )
     elif isinstance(quiz, ContextQuiz):
         try:
-            logger.warning(f"--- ContextQuiz answers before mapping: {quiz.answers} ---")
-            logger.warning(f"--- Types in ContextQuiz answers: {[type(a) for a in quiz.answers]} ---")
+            logger.debug(f"--- ContextQuiz answers before mapping: {quiz.answers} ---")
+            logger.debug(f"--- Types in ContextQuiz answers: {[type(a) for a in quiz.answers]} ---")
 
             answers_dto = [
                     ContextAnswerDTO(text=a.text, is_correct=a.is_correct, reasoning=a.reasoning)
                     for a in quiz.answers if isinstance(a, ContextAnswer)
                 ]
             
-            logger.warning(f"--- Mapped ContextAnswerDTOs: {answers_dto} ---")
+            logger.debug(f"--- Mapped ContextAnswerDTOs: {answers_dto} ---")
             
             return ContextQuizDTO(
                 type="context",
@@ -57,4 +57,42 @@ def quiz_to_dto(quiz) -> QuizDTO:
              logger.error(f"Error mapping ContextQuiz answers: {e}", exc_info=True)
              raise
     else:
-        raise ValueError(f"Unsupported quiz type: {type(quiz)}")
\ No newline at end of file
+        raise ValueError(f"Unsupported quiz type: {type(quiz)}")
+
+
+def quiz_to_dict(quiz) -> dict:
+    """
+    Builds the same dict as `quiz_to_dto(quiz).model_dump()` straight from the
+    domain object, without constructing and validating the pydantic DTOs.
+    """
+    if isinstance(quiz, SingleAnswerQuiz):
+        return {
+            "text": quiz.text,
+            "type": "simple",
+            "answers": [
+                {"text": a.text, "is_correct": a.is_correct}
+                for a in quiz.answers if isinstance(a, SimpleAnswer)
+            ],
+        }
+    elif isinstance(quiz, SequenceQuiz):
+        return {
+            "text": quiz.text,
+            "type": "sequence",
+            "answers": [
+                {"text": a.text, "correct_position": a.correct_position}
+                for a in quiz.answers if isinstance(a, SequenceAnswer)
+            ],
+        }
+    elif isinstance(quiz, ContextQuiz):
+        return {
+            "text": quiz.text,
+            "type": "context",
+            "answers": [
+                {"text": a.text, "reasoning": a.reasoning, "is_correct": a.is_correct}
+                for a in quiz.answers if isinstance(a, ContextAnswer)
+            ],
+            "explanation": quiz.explanation,
+            "identified_grammar": quiz.identified_grammar,
+        }
+    else:
+        raise ValueError(f"Unsupported quiz type: {type(quiz)}")
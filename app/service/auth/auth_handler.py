@@ -51,6 +51,10 @@ def create_refresh_token(data: dict, expires_delta: timedelta | None = None) ->
     return jwt.encode(to_encode, JWT_SECRET, algorithm=JWT_ALGORITHM)
 
 
+def count_api_keys(db: Session, user_id: int) -> int:
+    return db.query(APIKey).filter(APIKey.user_id == user_id).count()
+
+
 def generate_api_key(db: Session, user_id: int) -> APIKey:
     key = secrets.token_hex(32)
     db_api_key = APIKey(key=key, user_id=user_id)
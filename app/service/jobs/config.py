@@ -0,0 +1,26 @@
+import os
+from dotenv import load_dotenv
+
+load_dotenv()
+
+# Seconds an idle worker slot waits before polling the queue again.
+JOB_POLL_INTERVAL_S = float(os.getenv("JOB_POLL_INTERVAL_S", "1.0"))
+# A running job whose lease its worker hasn't renewed for this long is requeued; workers
+# renew the leases of their running jobs every quarter of it.
+JOB_LEASE_S = float(os.getenv("JOB_LEASE_S", "1800"))
+# Delay before a failed job is retried, doubled on every further attempt.
+JOB_RETRY_DELAY_S = float(os.getenv("JOB_RETRY_DELAY_S", "30"))
+JOB_MAX_ATTEMPTS = int(os.getenv("JOB_MAX_ATTEMPTS", "3"))
+# Concurrent jobs per kind in one worker process, e.g. "ingest_parsed_texts=1,generate_quizzes=4".
+# Kinds not listed run one at a time.
+JOB_CONCURRENCY = os.getenv("JOB_CONCURRENCY", "ingest_parsed_texts=1,generate_quizzes=4")
+
+
+def parse_concurrency(value: str) -> dict[str, int]:
+    limits = {}
+    for item in value.split(","):
+        if not item.strip():
+            continue
+        kind, _, limit = item.partition("=")
+        limits[kind.strip()] = int(limit) if limit.strip() else 1
+    return limits
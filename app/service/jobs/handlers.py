@@ -0,0 +1,108 @@
+"""
+Background job handlers, keyed by `Job.kind`.
+
+A handler takes a session and the job payload and returns a JSON-serializable
+result. Sync handlers run in a worker thread, async ones on the worker's event loop.
+"""
+import asyncio
+from typing import Any, Awaitable, Callable
+
+from sqlalchemy.orm import Session
+
+from app.db import text_crud
+from app.models.mappings import quiz_to_dict
+from app.service.quiz_generator.distractors import get_distractor_engine
+from app.service.quiz_generator.generator_hybrid import HybridQuizStrategy
+from app.service.quiz_generator.generator_llm import SimpleQuizStrategyLLM
+from app.service.quiz_generator.generator_strategy import SequenceQuizStrategy, SimpleQuizStrategy
+from app.service.quiz_generator.tagging import extract_verb_tags
+from app.service.quiz_generator.tokenizer import FastEnglishTokenizer
+from app.service.text_parser.ingestion import ingest_parsed_texts
+
+JobHandler = Callable[[Session, dict], dict | Awaitable[dict]]
+
+QUIZ_TYPES = ("simple", "sequence", "simple_llm", "hybrid")
+
+
+def ingest_parsed_texts_job(db: Session, payload: dict) -> dict:
+    """Payload: optional `source_dir`."""
+    return ingest_parsed_texts(db, **({"source_dir": payload["source_dir"]} if "source_dir" in payload else {}))
+
+
+def backfill_verb_tags_job(db: Session, payload: dict) -> dict:
+    """
+    Tags the entries stored before `TextFeature.verb_tags` existed, so verb-tag sampling
+    sees them. Each batch is committed on its own and only untagged entries are read,
+    so a retried job continues where the last one stopped.
+
+    Payload: optional `dataset_id` and `batch_size` (default 500).
+    """
+    dataset_id = int(payload["dataset_id"]) if "dataset_id" in payload else None
+    batch_size = int(payload.get("batch_size", 500))
+    tokenizer = FastEnglishTokenizer()
+    tagged = 0
+    after_id = 0
+    while rows := text_crud.get_text_features_without_verb_tags(db, batch_size, after_id, dataset_id):
+        text_crud.set_verb_tags(db, {row.id: extract_verb_tags(row.text, tokenizer) for row in rows})
+        tagged += len(rows)
+        after_id = rows[-1].id
+    return {"tagged": tagged}
+
+
+def _quiz_strategy(quiz_type: str):
+    if quiz_type == "simple":
+        return SimpleQuizStrategy(tokenizer=FastEnglishTokenizer(), distractor_engine=get_distractor_engine())
+    if quiz_type == "sequence":
+        return SequenceQuizStrategy(tokenizer=FastEnglishTokenizer())
+    if quiz_type == "simple_llm":
+        return SimpleQuizStrategyLLM()
+    if quiz_type == "hybrid":
+        return HybridQuizStrategy(
+            rule_strategy=SimpleQuizStrategy(tokenizer=FastEnglishTokenizer(), distractor_engine=get_distractor_engine()),
+            llm_strategy=SimpleQuizStrategyLLM(),
+        )
+    raise ValueError(f"Unknown quiz type: {quiz_type}")
+
+
+async def generate_quizzes_job(db: Session, payload: dict) -> dict:
+    """
+    Pre-generates quizzes, e.g. a large LLM backfill, and returns them in the job result.
+
+    Payload: `type` (simple, sequence, simple_llm or hybrid), `limit`, `number_of_answers`,
+    and either `input` text or a `dataset_id` to sample sentences from.
+    """
+    limit = int(payload["limit"])
+    number_of_answers = int(payload.get("number_of_answers", 4))
+    if "dataset_id" in payload:
+        # Sample twice the limit, some sentences won't produce a valid quiz.
+        features = await asyncio.to_thread(text_crud.sample_text_features, db, int(payload["dataset_id"]), limit * 2)
+        source = " ".join(f.text for f in features)
+    else:
+        source = payload["input"]
+
+    strategy = _quiz_strategy(payload.get("type", "simple"))
+    if asyncio.iscoroutinefunction(strategy.generate_many):
+        quizzes = await strategy.generate_many(source, limit, number_of_answers)
+    else:
+        quizzes = await asyncio.to_thread(strategy.generate_many, source, limit, number_of_answers)
+    return {"quizzes": [quiz_to_dict(q) for q in quizzes]}
+
+
+JOB_HANDLERS: dict[str, JobHandler] = {
+    "ingest_parsed_texts": ingest_parsed_texts_job,
+    "generate_quizzes": generate_quizzes_job,
+    "backfill_verb_tags": backfill_verb_tags_job,
+}
+
+
+def validate_payload(kind: str, payload: dict[str, Any]) -> None:
+    """Rejects jobs no handler can run before they are queued."""
+    if kind not in JOB_HANDLERS:
+        raise ValueError(f"Unknown job kind: {kind}")
+    if kind == "generate_quizzes":
+        if ("input" in payload) == ("dataset_id" in payload):
+            raise ValueError("Provide either input or dataset_id")
+        if "limit" not in payload:
+            raise ValueError("limit is required")
+        if payload.get("type", "simple") not in QUIZ_TYPES:
+            raise ValueError(f"type must be one of {', '.join(QUIZ_TYPES)}")
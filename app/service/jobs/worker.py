@@ -0,0 +1,170 @@
+"""
+Background job worker.
+
+Claims queued jobs from the `jobs` table with FOR UPDATE SKIP LOCKED, so any number
+of worker processes can run next to the API without handing out a job twice. While
+a job runs its lease is renewed, so only jobs of dead workers are requeued. Each
+job kind gets its own number of concurrent slots (`JOB_CONCURRENCY`), so a slow
+ingestion can't hold up quiz generation and the other way round.
+
+Usage:
+    python -m app.service.jobs.worker
+    python -m app.service.jobs.worker --kinds generate_quizzes --concurrency generate_quizzes=8
+"""
+import argparse
+import asyncio
+import inspect
+import logging
+import os
+import signal
+import socket
+import time
+from datetime import timedelta
+from typing import Callable
+
+from sqlalchemy.orm import Session
+
+from app.db import job_crud, models
+from app.service.jobs import config
+from app.service.jobs.handlers import JOB_HANDLERS, JobHandler
+
+logger = logging.getLogger(__name__)
+
+
+class Worker:
+
+    def __init__(
+        self,
+        session_factory: Callable[[], Session],
+        handlers: dict[str, JobHandler] = JOB_HANDLERS,
+        concurrency: dict[str, int] | None = None,
+        poll_interval: float = config.JOB_POLL_INTERVAL_S,
+        lease: float = config.JOB_LEASE_S,
+        retry_delay: float = config.JOB_RETRY_DELAY_S,
+        worker_id: str | None = None,
+    ) -> None:
+        self.session_factory = session_factory
+        self.handlers = handlers
+        self.concurrency = {kind: (concurrency or {}).get(kind, 1) for kind in handlers}
+        self.poll_interval = poll_interval
+        self.lease = timedelta(seconds=lease)
+        self.retry_delay = retry_delay
+        self.worker_id = worker_id or f"{socket.gethostname()}:{os.getpid()}"
+        self._stopping = asyncio.Event()
+
+    def stop(self) -> None:
+        """Stops claiming jobs; running ones are finished first."""
+        self._stopping.set()
+
+    async def run(self) -> None:
+        logger.info("Job worker started", extra={"worker_id": self.worker_id, "concurrency": self.concurrency})
+        slots = [
+            self._slot(kind)
+            for kind, limit in self.concurrency.items()
+            for _ in range(limit)
+        ]
+        await asyncio.gather(self._requeue_stale(), *slots)
+        logger.info("Job worker stopped", extra={"worker_id": self.worker_id})
+
+    async def run_once(self, kinds: list[str] | None = None) -> models.Job | None:
+        """Claims and runs one job of `kinds` (default: every kind), returning it or None if the queue was empty."""
+        with self.session_factory() as db:
+            job = await asyncio.to_thread(job_crud.claim_job, db, kinds or list(self.handlers), self.worker_id)
+            if job is None:
+                return None
+            await self._execute(db, job)
+            return job
+
+    async def _slot(self, kind: str) -> None:
+        while not self._stopping.is_set():
+            try:
+                job = await self.run_once([kind])
+            except Exception:
+                logger.exception("Job worker slot failed", extra={"kind": kind})
+                job = None
+            if job is None:
+                await self._sleep(self.poll_interval)
+
+    async def _requeue_stale(self) -> None:
+        while not self._stopping.is_set():
+            try:
+                with self.session_factory() as db:
+                    requeued = await asyncio.to_thread(job_crud.requeue_stale_jobs, db, self.lease)
+                if requeued:
+                    logger.warning("Requeued stale jobs", extra={"count": requeued})
+            except Exception:
+                logger.exception("Requeueing stale jobs failed")
+            await self._sleep(self.lease.total_seconds() / 4)
+
+    async def _renew_lease(self, job_id: int) -> None:
+        """Renews the job's lease every quarter lease until cancelled."""
+        while True:
+            await asyncio.sleep(self.lease.total_seconds() / 4)
+            try:
+                with self.session_factory() as db:
+                    held = await asyncio.to_thread(job_crud.renew_lease, db, job_id, self.worker_id)
+                if not held:
+                    logger.warning("Lost the lease of a running job", extra={"job_id": job_id})
+                    return
+            except Exception:
+                logger.exception("Renewing a job lease failed", extra={"job_id": job_id})
+
+    async def _sleep(self, seconds: float) -> None:
+        try:
+            await asyncio.wait_for(self._stopping.wait(), seconds)
+        except asyncio.TimeoutError:
+            pass
+
+    async def _execute(self, db: Session, job: models.Job) -> None:
+        handler = self.handlers[job.kind]
+        extra = {"job_id": job.id, "kind": job.kind, "attempt": job.attempts}
+        start = time.perf_counter()
+        # Renewed with its own session: the handler may be using `db` in another thread.
+        heartbeat = asyncio.create_task(self._renew_lease(job.id))
+        try:
+            if inspect.iscoroutinefunction(handler):
+                result = await handler(db, dict(job.payload))
+            else:
+                result = await asyncio.to_thread(handler, db, dict(job.payload))
+        except Exception as e:
+            db.rollback()
+            delay = timedelta(seconds=self.retry_delay * 2 ** (job.attempts - 1))
+            failed = await asyncio.to_thread(
+                job_crud.fail_job, db, job, f"{type(e).__name__}: {e}", delay, self.worker_id)
+            if failed is None:
+                logger.exception("Job failed after its lease was lost, discarding the failure", extra=extra)
+            else:
+                logger.exception("Job failed", extra={**extra, "status": failed.status})
+            return
+        finally:
+            heartbeat.cancel()
+
+        # A job whose lease was lost may have been requeued and run by another worker:
+        # its status and result are that worker's to write.
+        if await asyncio.to_thread(job_crud.complete_job, db, job, result, self.worker_id) is None:
+            logger.warning("Job finished after its lease was lost, discarding the result", extra=extra)
+            return
+        logger.info("Job succeeded", extra={**extra, "duration_ms": (time.perf_counter() - start) * 1000})
+
+
+if __name__ == "__main__":
+    from app.db.database import SessionLocal
+    from app.utils.logging_config import configure_logging
+
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--kinds", nargs="+", choices=sorted(JOB_HANDLERS), help="Only run these job kinds")
+    parser.add_argument("--concurrency", default=config.JOB_CONCURRENCY,
+                        help="Concurrent jobs per kind, e.g. ingest_parsed_texts=1,generate_quizzes=4")
+    args = parser.parse_args()
+
+    configure_logging()
+    handlers = {kind: JOB_HANDLERS[kind] for kind in (args.kinds or JOB_HANDLERS)}
+    worker = Worker(SessionLocal, handlers=handlers, concurrency=config.parse_concurrency(args.concurrency))
+
+    async def main():
+        loop = asyncio.get_running_loop()
+        for sig in (signal.SIGINT, signal.SIGTERM):
+            loop.add_signal_handler(sig, worker.stop)
+        await worker.run()
+
+    asyncio.run(main())
@@ -1,20 +1,27 @@
+import functools
+import logging
 import os
 from dotenv import load_dotenv
-from openai import AsyncOpenAI
 
 load_dotenv()
 
+logger = logging.getLogger(__name__)
+
 LLM_API = os.getenv("LLM_API", "http://localhost:8000/v1")
 LLM_MODEL = os.getenv("LLM_MODEL", "meta-llama/Llama-3.2-1B-Instruct")
 OPENAI_KEY = os.getenv("OPENAI_KEY", "some_key")
+# Sentences packed into one structured request by SimpleQuizStrategyLLM, 1 sends one request per sentence.
+LLM_BATCH_SIZE = int(os.getenv("LLM_BATCH_SIZE", "5"))
+# Requests per sentence before giving up on it, including the first one.
+LLM_MAX_ATTEMPTS = int(os.getenv("LLM_MAX_ATTEMPTS", "2"))
+
+logger.debug("LLM configuration", extra={"llm_api": LLM_API, "llm_model": LLM_MODEL})
 
-print(LLM_API)
 
-# client = AsyncOpenAI(
-#     base_url=LLM_API,
-#     api_key="empty"
-# )
+@functools.cache
+def get_client():
+    """The shared AsyncOpenAI client, created (and openai imported) on first use."""
+    from openai import AsyncOpenAI
 
-client = AsyncOpenAI(
-    api_key=OPENAI_KEY
-)
\ No newline at end of file
+    # return AsyncOpenAI(base_url=LLM_API, api_key="empty")
+    return AsyncOpenAI(api_key=OPENAI_KEY)
@@ -21,6 +21,14 @@ class SingleSimpleQuizResponse(BaseModel):
 class MultipleSimpleQuizResponse(BaseModel):
     quizzes: list[SingleSimpleQuizResponse] = Field(..., description="A list of grammar quizzes")
 
+
+class IndexedSimpleQuizResponse(SingleSimpleQuizResponse):
+    sentence_index: int = Field(..., description="The number of the input sentence the quiz is built from")
+
+
+class BatchSimpleQuizResponse(BaseModel):
+    quizzes: list[IndexedSimpleQuizResponse] = Field(..., description="One grammar quiz per input sentence")
+
 class SingleContextQuizResponse(BaseModel):
     identified_grammar: str = Field(..., description="The specific grammar concept you chose to test (e.g., 'Third Conditional', 'Phrasal Verb: look into').")
     text: str = Field(..., description="The new question you have generated.")
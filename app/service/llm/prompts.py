@@ -85,6 +85,46 @@ Instructions:
 """
 
 
+def generate_batch_grammar_prompt(sentences: list[str], answers_limit: int) -> str:
+    numbered = "\n".join(f"[{i}] {sentence}" for i, sentence in enumerate(sentences, start=1))
+    return f"""
+Your task is to generate one grammar quiz for each of the {len(sentences)} numbered input sentences.
+
+Input sentences:
+{numbered}
+
+Instructions:
+1. For each sentence, select a single verb and replace it with the character '_' to create a gap-fill grammar quiz.
+2. Set "sentence_index" to the number of the sentence the quiz is built from. Use every number exactly once.
+3. Create {answers_limit} unique answer options per quiz — only **one** should be grammatically correct in context.
+4. Each answer must include a brief explanation in a "reasoning" field (1–2 short sentences).
+5. All options should be realistic verb forms or conjugations.
+6. Do not repeat the same answer multiple times. Be concise.
+
+Return the result as a valid JSON object in the following format:
+{{
+  "quizzes": [
+    {{
+      "sentence_index": 1,
+      "text": "Sentence with _",
+      "explanation": "Why the correct answer fits.",
+      "answers": [
+        {{
+          "text": "verb1",
+          "is_correct": true,
+          "reasoning": "Explain why this is correct in context."
+        }},
+        ...
+      ]
+    }},
+    ...
+  ]
+}}
+
+Only return the JSON — no explanations, markdown, or extra commentary.
+"""
+
+
 def generate_single_context_quiz_prompt(
     source_text: str,
     answer_limit: int,
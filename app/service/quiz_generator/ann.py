@@ -0,0 +1,118 @@
+"""
+Inverted-file (IVF) index for approximate nearest-neighbour search over unit-normalized
+vectors, in plain NumPy.
+
+The vectors are clustered with spherical k-means and stored grouped by cluster, so a
+query scores the centroids, then only the `nprobe` closest clusters, each one a
+contiguous slice of a memory-mapped array. `nprobe` is calibrated at build time to
+the smallest value that reaches a recall target against brute-force search.
+"""
+import json
+import os
+
+import numpy as np
+
+_ARRAYS = ("centroids", "offsets", "ids", "vectors")
+
+
+class IVFIndex:
+
+    def __init__(self, centroids: np.ndarray, offsets: np.ndarray, ids: np.ndarray, vectors: np.ndarray,
+                 nprobe: int = 1, recall: float | None = None):
+        self.centroids = centroids  # (n_lists, dim)
+        self.offsets = offsets      # (n_lists + 1,), list i is rows offsets[i]:offsets[i + 1]
+        self.ids = ids              # (n,), original row of each stored vector
+        self.vectors = vectors      # (n, dim), grouped by list
+        self.nprobe = nprobe
+        self.recall = recall
+
+    def __len__(self) -> int:
+        return len(self.ids)
+
+    @classmethod
+    def build(cls, vectors: np.ndarray, n_lists: int | None = None, iterations: int = 20,
+              seed: int = 0) -> "IVFIndex":
+        """Clusters unit-normalized `vectors` into `n_lists` lists, about sqrt(n) by default."""
+        vectors = np.asarray(vectors, dtype=np.float32)
+        n = len(vectors)
+        n_lists = max(1, min(n, n_lists or int(np.sqrt(n))))
+        rng = np.random.default_rng(seed)
+
+        centroids = vectors[rng.choice(n, n_lists, replace=False)].copy()
+        for _ in range(iterations):
+            assignment = np.argmax(vectors @ centroids.T, axis=1)
+            sums = np.zeros_like(centroids)
+            np.add.at(sums, assignment, vectors)
+            norms = np.linalg.norm(sums, axis=1, keepdims=True)
+            # Empty lists keep their previous centroid.
+            centroids = np.where(norms > 0, sums / np.maximum(norms, 1e-12), centroids)
+        assignment = np.argmax(vectors @ centroids.T, axis=1)
+
+        ids = np.argsort(assignment, kind="stable")
+        offsets = np.zeros(n_lists + 1, dtype=np.int64)
+        offsets[1:] = np.cumsum(np.bincount(assignment, minlength=n_lists))
+        return cls(centroids, offsets, ids, vectors[ids])
+
+    def candidates(self, queries: np.ndarray, nprobe: int | None = None) -> list[tuple[np.ndarray, np.ndarray]]:
+        """
+        For each query, the original row ids in its `nprobe` closest lists and their
+        similarity to the query.
+        """
+        nprobe = min(nprobe or self.nprobe, len(self.centroids))
+        queries = np.atleast_2d(queries)
+        centroid_scores = queries @ self.centroids.T
+        probes = np.argpartition(-centroid_scores, nprobe - 1, axis=1)[:, :nprobe]
+
+        results = []
+        for query, lists in zip(queries, probes):
+            slices = [slice(self.offsets[l], self.offsets[l + 1]) for l in np.sort(lists)]
+            ids = np.concatenate([self.ids[s] for s in slices])
+            scores = np.concatenate([self.vectors[s] @ query for s in slices])
+            results.append((ids, scores))
+        return results
+
+    def search(self, queries: np.ndarray, k: int, nprobe: int | None = None) -> list[np.ndarray]:
+        """The original row ids of the (approximately) `k` most similar vectors, best first."""
+        results = []
+        for ids, scores in self.candidates(queries, nprobe):
+            if len(ids) > k:
+                top = np.argpartition(-scores, k - 1)[:k]
+                ids, scores = ids[top], scores[top]
+            results.append(ids[np.argsort(-scores)])
+        return results
+
+    def calibrate(self, recall_target: float, k: int = 10, sample: int = 200, seed: int = 0) -> float:
+        """
+        Sets `nprobe` to the smallest value whose recall@k on a sample of the indexed
+        vectors reaches `recall_target`, and returns the recall reached.
+        """
+        rng = np.random.default_rng(seed)
+        vectors = self.vectors
+        queries = vectors[rng.choice(len(vectors), min(sample, len(vectors)), replace=False)]
+        k = min(k, len(vectors))
+        scores = queries @ vectors.T
+        exact = [set(self.ids[np.argpartition(-row, k - 1)[:k]]) for row in scores]
+
+        recall = 0.0
+        for nprobe in range(1, len(self.centroids) + 1):
+            found = self.search(queries, k, nprobe)
+            recall = float(np.mean([len(exact_ids.intersection(ids)) / k for exact_ids, ids in zip(exact, found)]))
+            if recall >= recall_target:
+                break
+        self.nprobe = nprobe
+        self.recall = recall
+        return recall
+
+    def save(self, directory: str) -> None:
+        os.makedirs(directory, exist_ok=True)
+        for name in _ARRAYS:
+            np.save(os.path.join(directory, f"{name}.npy"), getattr(self, name))
+        with open(os.path.join(directory, "meta.json"), "w", encoding="utf-8") as f:
+            json.dump({"nprobe": self.nprobe, "recall": self.recall}, f)
+
+    @classmethod
+    def load(cls, directory: str, mmap_mode: str | None = "r") -> "IVFIndex":
+        arrays = {name: np.load(os.path.join(directory, f"{name}.npy"), mmap_mode=mmap_mode) for name in _ARRAYS}
+        with open(os.path.join(directory, "meta.json"), encoding="utf-8") as f:
+            meta = json.load(f)
+        return cls(**arrays, nprobe=meta["nprobe"], recall=meta["recall"])
@@ -0,0 +1,16 @@
+import os
+from dotenv import load_dotenv
+
+load_dotenv()
+
+# Verb vectors built by `python -m app.service.quiz_generator.distractors`. Unset disables embedding distractors.
+EMBEDDINGS_PATH = os.getenv("EMBEDDINGS_PATH", "")
+# Cosine similarity band for distractors: close enough to be plausible, far enough not to be a synonym.
+DISTRACTOR_MIN_SIMILARITY = float(os.getenv("DISTRACTOR_MIN_SIMILARITY", "0.35"))
+DISTRACTOR_MAX_SIMILARITY = float(os.getenv("DISTRACTOR_MAX_SIMILARITY", "0.75"))
+# IVF index built with `--index`: recall@10 that nprobe is calibrated to, and an optional fixed nprobe (0 keeps the calibrated one).
+ANN_RECALL_TARGET = float(os.getenv("ANN_RECALL_TARGET", "0.95"))
+ANN_NPROBE = int(os.getenv("ANN_NPROBE", "0"))
+# HybridQuizStrategy: rule-based quizzes scoring below this go to the LLM, and the time budget for a whole request.
+HYBRID_MIN_SCORE = float(os.getenv("HYBRID_MIN_SCORE", "0.6"))
+HYBRID_LATENCY_BUDGET_MS = float(os.getenv("HYBRID_LATENCY_BUDGET_MS", "3000"))
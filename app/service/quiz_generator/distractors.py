@@ -0,0 +1,224 @@
+"""
+Distractors from word embeddings: verbs and verb phrases with the same POS tag that
+are close to the correct one in meaning, but not so close that they are synonyms.
+
+The vectors are built offline into a small, verbs-only, unit-normalized KeyedVectors
+file, then loaded with `mmap='r'`, so every worker shares the same pages. With
+`--index`, an IVF index per tag is built next to it (`<out>.ivf/<tag>/`) and lookups
+only score the closest clusters instead of every verb with that tag.
+
+Usage:
+    python -m app.service.quiz_generator.distractors --vectors GoogleNews-vectors-negative300.bin --out data/verbs.kv --index
+"""
+import argparse
+import functools
+import logging
+import os
+from typing import Callable, Iterable
+
+import numpy as np
+
+from app.service.quiz_generator import config
+from app.service.quiz_generator.ann import IVFIndex
+from app.utils.profiling import span
+
+logger = logging.getLogger(__name__)
+
+# Only plain tags: negated forms ("did not go") are built from two words and have no vector.
+DISTRACTOR_TAGS = ("VB", "VBD", "VBG", "VBN", "VBP", "VBZ")
+
+# Longest phrase kept from the source vocabulary, which joins phrase words with "_" ("look_up").
+MAX_PHRASE_WORDS = 3
+
+
+def _nltk_tag(word: str) -> str:
+    import nltk
+    return nltk.pos_tag([word])[0][1]
+
+
+def _is_vocabulary_entry(key: str) -> bool:
+    words = key.split("_")
+    return len(words) <= MAX_PHRASE_WORDS and all(w.isalpha() and w.islower() for w in words)
+
+
+def build_verb_vectors(
+    source,
+    out_path: str,
+    max_words: int = 50000,
+    tag_word: Callable[[str], str] = _nltk_tag,
+):
+    """
+    Keeps the verbs and verb phrases (tagged by their first word) among the `max_words`
+    most frequent lowercase entries of `source`, a gensim KeyedVectors, normalizes
+    them and saves them with their POS tag.
+    """
+    from gensim.models import KeyedVectors
+
+    tagged = []
+    for key in source.index_to_key[:max_words]:
+        if not _is_vocabulary_entry(key):
+            continue
+        tag = tag_word(key.split("_", 1)[0])
+        if tag in DISTRACTOR_TAGS:
+            tagged.append((tag, key))
+    if not tagged:
+        raise ValueError("No verbs found in the source vectors")
+
+    # Grouped by tag, so each tag's candidates are one contiguous block of rows.
+    tagged.sort(key=lambda item: DISTRACTOR_TAGS.index(item[0]))
+    tags = [tag for tag, _ in tagged]
+    keys = [key for _, key in tagged]
+
+    vectors = np.asarray([source[k] for k in keys], dtype=np.float32)
+    vectors /= np.maximum(np.linalg.norm(vectors, axis=1, keepdims=True), 1e-12)
+
+    verbs = KeyedVectors(vector_size=source.vector_size, dtype=np.float32)
+    verbs.add_vectors(keys, vectors)
+    verbs.expandos["tag"] = np.asarray(tags)
+    # sep_limit=0 stores the arrays as separate .npy files, which `load(mmap='r')` maps instead of reading.
+    verbs.save(out_path, sep_limit=0)
+    logger.info("Saved verb vectors", extra={"path": out_path, "verbs": len(keys)})
+    return verbs
+
+
+def _tag_rows(vectors) -> dict[str, tuple[int, int]]:
+    """(start, end) rows of each tag's block."""
+    tags = np.asarray(vectors.expandos["tag"])
+    rows_by_tag = {}
+    for tag in DISTRACTOR_TAGS:
+        rows = np.flatnonzero(tags == tag)
+        if rows.size:
+            rows_by_tag[tag] = (int(rows[0]), int(rows[-1]) + 1)
+    return rows_by_tag
+
+
+def build_indexes(vectors, out_path: str, recall_target: float) -> dict[str, IVFIndex]:
+    """Builds and saves an IVF index over each tag's block of `vectors`, calibrated to `recall_target`."""
+    indexes = {}
+    for tag, (start, end) in _tag_rows(vectors).items():
+        index = IVFIndex.build(np.asarray(vectors.vectors[start:end]))
+        recall = index.calibrate(recall_target)
+        index.save(os.path.join(f"{out_path}.ivf", tag))
+        logger.info("Saved IVF index", extra={
+            "tag": tag, "vectors": len(index), "lists": len(index.centroids), "nprobe": index.nprobe, "recall": recall,
+        })
+        indexes[tag] = index
+    return indexes
+
+
+class EmbeddingDistractorEngine:
+
+    def __init__(self, vectors, min_similarity: float = 0.35, max_similarity: float = 0.75,
+                 indexes: dict[str, IVFIndex] | None = None, nprobe: int | None = None):
+        self.vectors = vectors
+        self.min_similarity = min_similarity
+        self.max_similarity = max_similarity
+        # Tags without an index are searched exhaustively.
+        self.indexes = indexes or {}
+        # None uses the nprobe each index was calibrated with.
+        self.nprobe = nprobe
+        # Rows are unit-normalized at build time, so a dot product is the cosine similarity.
+        self._matrix = vectors.vectors
+        self._tag_rows = _tag_rows(vectors)
+
+    @classmethod
+    def load(cls, path: str, **kwargs) -> "EmbeddingDistractorEngine":
+        from gensim.models import KeyedVectors
+
+        index_dir = f"{path}.ivf"
+        if "indexes" not in kwargs and os.path.isdir(index_dir):
+            kwargs["indexes"] = {
+                tag: IVFIndex.load(os.path.join(index_dir, tag))
+                for tag in DISTRACTOR_TAGS
+                if os.path.isdir(os.path.join(index_dir, tag))
+            }
+        return cls(KeyedVectors.load(path, mmap="r"), **kwargs)
+
+    def distractors(self, word: str, tag: str, n: int) -> list[str]:
+        return self.distractors_many([(word, tag)], n)[0]
+
+    def distractors_many(self, targets: Iterable[tuple[str, str]], n: int) -> list[list[str]]:
+        """
+        Returns up to `n` distractors for each (word, tag), most similar first. Words
+        without a vector or with an unsupported tag get an empty list.
+        """
+        targets = list(targets)
+        results: list[list[str]] = [[] for _ in targets]
+        if n <= 0:
+            return results
+
+        # Target positions and vector rows, per tag.
+        by_tag: dict[str, list[tuple[int, int]]] = {}
+        for i, (word, tag) in enumerate(targets):
+            row = self.vectors.key_to_index.get(word.lower())
+            if row is not None and tag in self._tag_rows:
+                by_tag.setdefault(tag, []).append((i, row))
+
+        with span("distractors"):
+            for tag, found in by_tag.items():
+                start, end = self._tag_rows[tag]
+                queries = self._matrix[[row for _, row in found]]
+
+                # (rows within the tag's block, their similarity) per query.
+                index = self.indexes.get(tag)
+                if index is not None:
+                    scored = index.candidates(queries, self.nprobe)
+                else:
+                    block_rows = np.arange(end - start)
+                    scored = [(block_rows, s) for s in queries @ self._matrix[start:end].T]
+
+                for (i, _), (rows, similarities) in zip(found, scored):
+                    in_band = (similarities >= self.min_similarity) & (similarities <= self.max_similarity)
+                    rows, similarities = rows[in_band], similarities[in_band]
+                    if rows.size > n:
+                        top = np.argpartition(-similarities, n - 1)[:n]
+                        rows, similarities = rows[top], similarities[top]
+                    rows = rows[np.argsort(-similarities)]
+
+                    words = [self.vectors.index_to_key[start + r].replace("_", " ") for r in rows]
+                    results[i] = [w.capitalize() for w in words] if targets[i][0][:1].isupper() else words
+
+        return results
+
+
+@functools.cache
+def get_distractor_engine() -> EmbeddingDistractorEngine | None:
+    """The shared engine, or None when `EMBEDDINGS_PATH` is unset or can't be loaded."""
+    if not config.EMBEDDINGS_PATH:
+        return None
+    try:
+        engine = EmbeddingDistractorEngine.load(
+            config.EMBEDDINGS_PATH,
+            min_similarity=config.DISTRACTOR_MIN_SIMILARITY,
+            max_similarity=config.DISTRACTOR_MAX_SIMILARITY,
+            nprobe=config.ANN_NPROBE or None,
+        )
+    except (ImportError, OSError) as e:
+        logger.warning(f"Embedding distractors disabled, could not load {config.EMBEDDINGS_PATH}: {e}")
+        return None
+    logger.info("Loaded distractor vectors", extra={
+        "path": config.EMBEDDINGS_PATH, "verbs": len(engine.vectors), "indexed_tags": sorted(engine.indexes),
+    })
+    return engine
+
+
+if __name__ == "__main__":
+    from gensim.models import KeyedVectors
+
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--vectors", required=True, help="word2vec .bin/.txt file or a saved KeyedVectors")
+    parser.add_argument("--out", required=True)
+    parser.add_argument("--max-words", type=int, default=50000)
+    parser.add_argument("--index", action="store_true", help="Also build IVF indexes for approximate lookups")
+    parser.add_argument("--recall-target", type=float, default=config.ANN_RECALL_TARGET,
+                        help="Recall@10 the index nprobe is calibrated to")
+    args = parser.parse_args()
+
+    logging.basicConfig(level=logging.INFO, format="%(asctime)-15s %(levelname)-8s %(message)s")
+    if args.vectors.endswith((".bin", ".bin.gz", ".txt", ".txt.gz")):
+        source = KeyedVectors.load_word2vec_format(args.vectors, binary=".bin" in args.vectors, limit=args.max_words)
+    else:
+        source = KeyedVectors.load(args.vectors, mmap="r")
+    verbs = build_verb_vectors(source, args.out, max_words=args.max_words)
+    if args.index:
+        build_indexes(verbs, args.out, args.recall_target)
@@ -0,0 +1,136 @@
+import asyncio
+import logging
+import random
+
+from app.domain.quiz import AbstractQuiz
+from app.service.quiz_generator import config
+from app.service.quiz_generator.generator_llm import SimpleQuizStrategyLLM
+from app.service.quiz_generator.generator_strategy import QuizGenerationStrategy, SimpleQuizStrategy
+from app.utils.deadline import remaining
+from app.utils.text_utils import split_into_sentences
+
+logger = logging.getLogger(__name__)
+
+
+def distractor_distinctness(quiz: AbstractQuiz, answer_limit: int) -> float:
+    """Share of the requested wrong answers that are present and differ from every other answer."""
+    if answer_limit < 2:
+        return 1.0
+    texts = [a.text.strip().lower() for a in quiz.answers]
+    correct = {a.text.strip().lower() for a in quiz.answers if a.is_correct}
+    distinct_wrong = {t for t in texts if t and t not in correct and texts.count(t) == 1}
+    return min(1.0, len(distinct_wrong) / (answer_limit - 1))
+
+
+def score_quiz(quiz: AbstractQuiz | None, verb_confidence: float, answer_limit: int) -> float:
+    """Cheap quality estimate in [0, 1] for a rule-based quiz, 0 when there is none."""
+    if quiz is None or not quiz.is_valid():
+        return 0.0
+    return verb_confidence * distractor_distinctness(quiz, answer_limit)
+
+
+class HybridQuizStrategy(QuizGenerationStrategy):
+    """
+    Builds rule-based quizzes first and only sends the sentences whose quiz scores below
+    `min_score` to the LLM. Returns whatever is ready when the latency budget (or the
+    request deadline, if sooner) runs out; low-scoring rule-based quizzes fill the gaps
+    the LLM didn't.
+    """
+
+    def __init__(
+        self,
+        rule_strategy: SimpleQuizStrategy,
+        llm_strategy: SimpleQuizStrategyLLM,
+        min_score: float = config.HYBRID_MIN_SCORE,
+        latency_budget_ms: float = config.HYBRID_LATENCY_BUDGET_MS,
+    ) -> None:
+        self.rule_strategy = rule_strategy
+        self.llm_strategy = llm_strategy
+        self.min_score = min_score
+        self.latency_budget_ms = latency_budget_ms
+
+    async def generate_single(self, source: str, answer_limit: int) -> AbstractQuiz | None:
+        quizzes = await self.generate_many(source, 1, answer_limit)
+        return quizzes[0] if quizzes else None
+
+    async def generate_many(self, source: str, quiz_limit: int, answer_limit: int) -> list[AbstractQuiz]:
+        loop = asyncio.get_running_loop()
+        # The request deadline, when it is sooner, caps the budget.
+        budget = self.latency_budget_ms / 1000
+        deadline = loop.time() + min(budget, remaining(default=budget))
+
+        sentences = list(dict.fromkeys(split_into_sentences(source)))
+        random.shuffle(sentences)
+
+        # Tagging is CPU bound, keep it off the event loop.
+        accepted, low_quality = await asyncio.to_thread(
+            self.__rule_pass, sentences, quiz_limit, answer_limit, deadline, loop.time
+        )
+
+        missing = quiz_limit - len(accepted)
+        to_llm = list(low_quality)[:max(0, missing)]
+        llm_quizzes = await self.__llm_pass(to_llm, answer_limit, deadline - loop.time()) if to_llm else {}
+
+        # LLM quizzes first, then the low-scoring rule-based ones for sentences the LLM didn't cover.
+        quizzes = accepted + list(llm_quizzes.values())
+        for sentence, quiz in low_quality.items():
+            if len(quizzes) >= quiz_limit:
+                break
+            if quiz is not None and sentence not in llm_quizzes:
+                quizzes.append(quiz)
+
+        logger.info("Hybrid quiz generation", extra={
+            "rule_based": len(accepted),
+            "llm_requested": len(to_llm),
+            "llm": len(llm_quizzes),
+            "fallback": len(quizzes[:quiz_limit]) - len(accepted) - len(llm_quizzes),
+            "over_budget": loop.time() > deadline,
+        })
+        return quizzes[:quiz_limit]
+
+    def __rule_pass(self, sentences: list[str], quiz_limit: int, answer_limit: int, deadline: float, clock):
+        """
+        Returns the quizzes scoring at least `min_score`, and {sentence: valid quiz or None}
+        for the others. Blanks are picked until enough of them could score well or time is
+        up, then all their distractors are looked up in one batch.
+        """
+        blanks = {}
+        promising = 0
+        for sentence in sentences:
+            if promising >= quiz_limit or clock() >= deadline:
+                break
+            blank = self.rule_strategy.pick_blank(sentence)
+            blanks[sentence] = blank
+            # A quiz never scores above the tagger's confidence in its blank.
+            if blank is not None and blank[2] >= self.min_score:
+                promising += 1
+
+        accepted: list[AbstractQuiz] = []
+        low_quality: dict[str, AbstractQuiz | None] = {}
+        scored = self.rule_strategy.build_scored(list(blanks.values()), answer_limit)
+        for sentence, (quiz, confidence) in zip(blanks, scored):
+            if len(accepted) < quiz_limit and score_quiz(quiz, confidence, answer_limit) >= self.min_score:
+                accepted.append(quiz)
+            else:
+                low_quality[sentence] = quiz if quiz is not None and quiz.is_valid() else None
+        return accepted, low_quality
+
+    async def __llm_pass(self, sentences: list[str], answer_limit: int, timeout: float) -> dict[str, AbstractQuiz]:
+        """
+        Sends the sentences in batches and returns {sentence: quiz} from the batches that
+        finish within `timeout` seconds. The rest are cancelled.
+        """
+        if timeout <= 0:
+            return {}
+        size = max(1, self.llm_strategy.batch_size)
+        batches = [sentences[i:i + size] for i in range(0, len(sentences), size)]
+        tasks = [asyncio.create_task(self.llm_strategy.generate_for_sentences(b, answer_limit)) for b in batches]
+        done, pending = await asyncio.wait(tasks, timeout=timeout)
+        for task in pending:
+            task.cancel()
+
+        quizzes = {}
+        for batch, task in zip(batches, tasks):
+            if task in done and task.exception() is None:
+                quizzes.update({s: q for s, q in zip(batch, task.result()) if q is not None})
+        return quizzes
@@ -1,30 +1,56 @@
 import asyncio
+import logging
 import random
 from typing import List
 from pydantic import ValidationError
 from app.service.quiz_generator.generator_strategy import QuizGenerationStrategy
-from app.service.llm.config import LLM_MODEL, client
+from app.service.llm.config import LLM_BATCH_SIZE, LLM_MAX_ATTEMPTS, LLM_MODEL, get_client
 from app.service.llm import prompts
-from app.service.llm.models import MultipleSimpleQuizResponse, SimpleAnswerResponse, SingleSimpleQuizResponse
+from app.service.llm.models import (
+    BatchSimpleQuizResponse, MultipleSimpleQuizResponse, SimpleAnswerResponse, SingleSimpleQuizResponse,
+)
 from app.domain.quiz import AbstractQuiz, SingleAnswerQuiz, SimpleAnswer
+from app.utils.deadline import expired, gather_until_deadline, record_dropped, remaining
+from app.utils.profiling import span
+from app.utils.text_utils import split_into_sentences
 
+logger = logging.getLogger(__name__)
 
 
+def _split_evenly(items: list, max_size: int) -> list[list]:
+    """Splits `items` into as few chunks of at most `max_size` as possible, with sizes differing by at most one."""
+    n = -(-len(items) // max_size)
+    return [items[i * len(items) // n:(i + 1) * len(items) // n] for i in range(n)]
 
 
 class SimpleQuizStrategyLLM(QuizGenerationStrategy):
+
+    def __init__(self, client=None, batch_size: int = LLM_BATCH_SIZE,
+                 max_attempts: int = LLM_MAX_ATTEMPTS) -> None:
+        self.client = client if client is not None else get_client()
+        self.batch_size = batch_size
+        self.max_attempts = max_attempts
+
     async def generate_single(self, source: str, answer_limit: int) -> AbstractQuiz | None:
+        if expired():
+            record_dropped()
+            return None
+        # Imported here so importing the strategy doesn't load openai.
+        from openai import NOT_GIVEN
+
         prompt = prompts.generate_single_grammar_prompt(source, answer_limit)
 
         try:
 
-            response = await client.beta.chat.completions.parse(
-                model=LLM_MODEL,
-                messages=[{"role": "user", "content": prompt}],
-                temperature=0.5,
-                response_format=SingleSimpleQuizResponse,
-                max_tokens=4096,
-            )
+            with span("llm"):
+                response = await self.client.beta.chat.completions.parse(
+                    model=LLM_MODEL,
+                    messages=[{"role": "user", "content": prompt}],
+                    temperature=0.5,
+                    response_format=SingleSimpleQuizResponse,
+                    max_tokens=4096,
+                    timeout=remaining(default=NOT_GIVEN),
+                )
             quiz_response = response.choices[0].message.parsed
             
             if not quiz_response:
@@ -32,13 +58,13 @@ class SimpleQuizStrategyLLM(QuizGenerationStrategy):
             
             return SingleAnswerQuiz(text=quiz_response.text, answers=[SimpleAnswer(text=a.text, is_correct=a.is_correct) for a in quiz_response.answers])
             
-            response = await client.responses.parse(
+            response = await self.client.responses.parse(
                 model=LLM_MODEL,
                 input=[{"role": "user", "content": prompt}],
                 temperature=0.5,
                 text_format=SingleSimpleQuizResponse
             )
-            print(response)
+            logger.debug("LLM response", extra={"response": response})
             for output in response.output:
                 if output.type != "message":
                     raise Exception("Unexpected non message")
@@ -51,7 +77,7 @@ class SimpleQuizStrategyLLM(QuizGenerationStrategy):
                         raise Exception("Could not parse response")
 
 
-                    print("parsed: ", item.parsed)
+                    logger.debug("Parsed LLM response", extra={"parsed": item.parsed})
 
                     quiz = item.parsed
 
@@ -59,36 +85,123 @@ class SimpleQuizStrategyLLM(QuizGenerationStrategy):
             
             return None
         except Exception as e:
-            print(f"Quiz generation failed: {e}")
+            logger.error(f"Quiz generation failed: {e}")
             return None
 
 
     async def generate_many(self, source: str, quiz_limit: int, answer_limit: int) -> List[AbstractQuiz]:
-        sentences = [s.strip() for s in source.split('.') if s.strip()]
+        sentences = split_into_sentences(source)
         if not sentences:
             return []
 
         random.shuffle(sentences)
-        candidate_sentences = sentences[:quiz_limit]
+        quizzes = await self.generate_for_sentences(sentences[:quiz_limit], answer_limit)
+        return [quiz for quiz in quizzes if quiz is not None]
+
+    async def generate_for_sentences(self, sentences: list[str], answer_limit: int) -> List[AbstractQuiz | None]:
+        """One entry per sentence: its quiz, or None where the LLM didn't produce a valid one."""
+        if self.batch_size > 1:
+            quizzes_by_sentence = await self.__generate_batched(sentences, answer_limit)
+            return [quizzes_by_sentence.get(i) for i in range(len(sentences))]
 
-        tasks = [asyncio.create_task(self.generate_single(s, answer_limit)) for s in candidate_sentences]
+        tasks = [asyncio.create_task(self.generate_single(s, answer_limit)) for s in sentences]
 
-        results = await asyncio.gather(*tasks, return_exceptions=True)
+        results = await gather_until_deadline(*tasks)
+        record_dropped(sum(isinstance(r, asyncio.CancelledError) for r in results))
 
-        quizzes: List[AbstractQuiz] = []
+        quizzes: List[AbstractQuiz | None] = []
         for quiz in results:
-            if isinstance(quiz, BaseException):
-                continue
-            if quiz and quiz.is_valid():
+            if isinstance(quiz, BaseException) or not quiz or not quiz.is_valid():
+                quizzes.append(None)
+            else:
                 quizzes.append(quiz)
 
         return quizzes
 
+    async def generate_batch(self, sentences: list[str], answer_limit: int) -> dict[int, AbstractQuiz] | None:
+        """
+        Requests one quiz per sentence in a single structured request. Returns the valid
+        quizzes keyed by their position in `sentences`, or None when the request failed.
+        """
+        from openai import NOT_GIVEN
+
+        prompt = prompts.generate_batch_grammar_prompt(sentences, answer_limit)
+        try:
+            with span("llm"):
+                response = await self.client.beta.chat.completions.parse(
+                    model=LLM_MODEL,
+                    messages=[{"role": "user", "content": prompt}],
+                    temperature=0.5,
+                    response_format=BatchSimpleQuizResponse,
+                    max_tokens=4096,
+                    timeout=remaining(default=NOT_GIVEN),
+                )
+        except Exception as e:
+            logger.error(f"Batched quiz generation failed: {e}")
+            return None
+
+        batch_response = response.choices[0].message.parsed
+        if not batch_response:
+            return None
+
+        quizzes = {}
+        for item in batch_response.quizzes:
+            position = item.sentence_index - 1
+            if not 0 <= position < len(sentences) or position in quizzes:
+                continue
+            quiz = SingleAnswerQuiz(
+                text=item.text,
+                answers=[SimpleAnswer(text=a.text, is_correct=a.is_correct) for a in item.answers],
+            )
+            if quiz.is_valid():
+                quizzes[position] = quiz
+        return quizzes
+
+    async def __generate_batched(self, sentences: list[str], answer_limit: int) -> dict[int, AbstractQuiz]:
+        """
+        Sends the sentences in concurrent batches of up to `batch_size`, then re-requests
+        only the sentences whose quiz was missing or invalid. A failed request halves the
+        batch size for the next attempt, since long structured outputs fail more often.
+        No new attempt starts after the deadline; sentences still missing then are dropped.
+        """
+        quizzes: dict[int, AbstractQuiz] = {}
+        pending = list(range(len(sentences)))
+        batch_size = self.batch_size
+        timed_out = False
+
+        for attempt in range(self.max_attempts):
+            if not pending:
+                break
+            if expired():
+                timed_out = True
+                break
+            batches = _split_evenly(pending, batch_size)
+            results = await gather_until_deadline(
+                *(self.generate_batch([sentences[i] for i in batch], answer_limit) for batch in batches)
+            )
+            timed_out = any(isinstance(result, asyncio.CancelledError) for result in results)
+            results = [None if isinstance(result, BaseException) else result for result in results]
+
+            for batch, result in zip(batches, results):
+                for position, quiz in (result or {}).items():
+                    quizzes[batch[position]] = quiz
+            if any(result is None for result in results):
+                batch_size = max(1, batch_size // 2)
+
+            pending = [i for i in pending if i not in quizzes]
+            logger.debug("Batched LLM attempt", extra={
+                "attempt": attempt + 1, "requests": len(batches), "missing": len(pending), "batch_size": batch_size,
+            })
+
+        if timed_out:
+            record_dropped(len(pending))
+        return quizzes
+
     # async def generate_many(self, source: str, quiz_limit: int, answer_limit: int) -> list[AbstractQuiz]:
     #     prompt = prompts.generate_many_grammar_prompt(source, quiz_limit, answer_limit)
 
     #     try:
-    #         response = await client.beta.chat.completions.parse(
+    #         response = await self.client.beta.chat.completions.parse(
     #             model=LLM_MODEL,
     #             messages=[{"role": "user", "content": prompt}],
     #             temperature=0.5,
@@ -107,6 +220,6 @@ class SimpleQuizStrategyLLM(QuizGenerationStrategy):
     #         return quizzes
 
     #     except Exception as e:
-    #         print(f"Quiz generation failed: {e}")
+    #         logger.error(f"Quiz generation failed: {e}")
     #         return []
 
@@ -3,6 +3,7 @@ from app.service.quiz_generator import verbs
 from app.domain.quiz import SequenceQuiz, SingleAnswerQuiz
 from app.domain.answer import SequenceAnswer, SimpleAnswer
 
+import logging
 import random
 import nltk
 
@@ -11,6 +12,7 @@ nltk.download('punkt_tab')
 nltk.download('averaged_perceptron_tagger')
 nltk.download('averaged_perceptron_tagger_eng')
 
+logger = logging.getLogger(__name__)
 
 class QuizGenerator:
 
@@ -18,13 +20,12 @@ class QuizGenerator:
         self.verb_tags = verbs.verb_tags
 
     def generate_single_grammar(self, source: str, number_or_answers=4) -> SingleAnswerQuiz | None:
-        print("=== generate_single_grammar ===")
         tokens = nltk.word_tokenize(source)
         pos_tags = nltk.pos_tag(tokens)
 
         verb_tags = [(idx, value) for idx, value in enumerate(
             pos_tags) if pos_tags[idx][1] in self.verb_tags]
-        print(verb_tags)
+        logger.debug("Candidate verbs", extra={"verbs": verb_tags})
 
         if not verb_tags:
             return None
@@ -48,11 +49,9 @@ class QuizGenerator:
         return SingleAnswerQuiz(text=quiz_text, answers=all_answers)
 
     def generate_sequence(self, source: str, max_sequence_length: int = 5) -> SequenceQuiz:
-        print("=== generate_sequence ===")
-
         # Always split the source into individual words
         fragments = nltk.word_tokenize(source)
-        print(fragments)
+        logger.debug("Sequence fragments", extra={"fragments": fragments})
         if len(fragments) > max_sequence_length:
             # Select a random subsequence to blank out
             max_len = min(max_sequence_length, len(fragments))
@@ -64,8 +63,7 @@ class QuizGenerator:
             question_fragments = fragments[:start_idx] + ['_' for _ in missing_seq] + fragments[end_idx:]
 
             question_text = ' '.join(question_fragments)
-            print(f"Question text: {question_text}")
-            print(f"Correct sequence: {missing_seq}")
+            logger.debug("Sequence quiz", extra={"question_text": question_text, "correct_sequence": missing_seq})
 
             all_answers = []
             for idx, frag in enumerate(missing_seq):
@@ -93,8 +91,6 @@ class QuizGenerator:
         pass
 
     def __generate_answers(self, number_of_answers: int, correct_answer: tuple) -> list[str]:
-        print("=== __generate_answers ===")
-
         correct_verb = correct_answer[0]
         correct_tense_tag = correct_answer[1]
 
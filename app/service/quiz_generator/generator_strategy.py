@@ -1,15 +1,20 @@
 from abc import ABC, abstractmethod
+import logging
 import random
-
-import nltk
-
+from typing import Iterator
 
 from app.domain.answer import SequenceAnswer, SimpleAnswer
 from app.domain.quiz import AbstractQuiz, SequenceQuiz, SingleAnswerQuiz
+from app.service.quiz_generator.distractors import EmbeddingDistractorEngine
+from app.service.quiz_generator.tagging import pos_tag_with_confidence
 from app.service.quiz_generator.tokenizer import Tokenizer
+from app.utils.deadline import expired, record_dropped
+from app.utils.profiling import span
 from app.utils.text_utils import split_into_sentences
 from app.utils.verb_utils import generate_tense_from_tag, verb_tags, check_negative, convert_verb_to_negative
 
+logger = logging.getLogger(__name__)
+
 
 class QuizGenerationStrategy(ABC):
 
@@ -24,28 +29,120 @@ class QuizGenerationStrategy(ABC):
 
 class SimpleQuizStrategy(QuizGenerationStrategy):
 
-    def __init__(self, tokenizer: Tokenizer):
+    def __init__(self, tokenizer: Tokenizer, distractor_engine: EmbeddingDistractorEngine | None = None,
+                 rng: random.Random | None = None):
         self.tokenizer = tokenizer
+        # When set, half of the wrong answers are verbs close in meaning instead of other tenses.
+        self.distractor_engine = distractor_engine
+        # A seeded generator makes the quizzes reproducible, the global one is used otherwise.
+        self.rng = rng or random
 
     def generate_single(self, source: str, answer_limit: int) -> AbstractQuiz | None:
+        return self.generate_scored(source, answer_limit)[0]
+
+    def generate_scored(self, source: str, answer_limit: int) -> tuple[AbstractQuiz | None, float]:
+        """Like `generate_single`, also returning the tagger's confidence that the blanked word is a verb."""
+        return self.build_scored([self.pick_blank(source)], answer_limit)[0]
+
+    def pick_blank(self, source: str) -> tuple[list[tuple], tuple, float] | None:
+        """
+        POS tags of `source`, a random (index, (verb, tag)) to blank out and the tagger's
+        confidence in that tag. None without verbs.
+        """
+        return self.__pick_blank(source)
+
+    def build_scored(self, blanks: list[tuple[list[tuple], tuple, float] | None],
+                     answer_limit: int) -> list[tuple[AbstractQuiz | None, float]]:
+        """
+        (quiz, confidence) for each blank from `pick_blank`, (None, 0.0) for None. The
+        distractors of all of them are looked up in one batch.
+        """
+        found = [blank for blank in blanks if blank is not None]
+        semantic = iter(self.__semantic_distractors([extracted[1] for _, extracted, _ in found], answer_limit))
+        scored = []
+        for blank in blanks:
+            if blank is None:
+                scored.append((None, 0.0))
+                continue
+            pos_tags, extracted, confidence = blank
+            scored.append((self.__build_quiz(pos_tags, extracted, answer_limit, next(semantic)), confidence))
+        return scored
+
+
+    def generate_many(self, source: str, quiz_limit: int, answer_limit: int) -> list[AbstractQuiz]:
+        sentences = list(dict.fromkeys(split_into_sentences(source)))
+        logger.debug("Split source into sentences", extra={"sentence_count": len(sentences)})
+        self.rng.shuffle(sentences)
+        return self.__generate_from_blanks((self.__pick_blank(text) for text in sentences), quiz_limit, answer_limit)
+
+    def generate_many_tagged(self, tagged_sentences: list[list[tuple[str, str, float]]], quiz_limit: int,
+                             answer_limit: int) -> list[AbstractQuiz]:
+        """
+        Like `generate_many`, for sentences tagged beforehand with `pos_tag_with_confidence`,
+        e.g. when they were stored. Sentences are tried in the given order.
+        """
+        blanks = (self.__pick_blank_tagged(list(tagged)) for tagged in tagged_sentences)
+        return self.__generate_from_blanks(blanks, quiz_limit, answer_limit)
+
+    def __generate_from_blanks(self, blanks: Iterator, quiz_limit: int, answer_limit: int) -> list[AbstractQuiz]:
+        remaining = iter(blanks)
+        quizzes: list[AbstractQuiz] = []
+
+        while len(quizzes) < quiz_limit and not expired():
+            # Blank out as many sentences as quizzes are missing, then look up all their distractors in one batch.
+            batch = []
+            for blank in remaining:
+                if blank is not None:
+                    batch.append(blank)
+                    if len(batch) == quiz_limit - len(quizzes):
+                        break
+                if expired():
+                    break
+            if not batch:
+                break
+
+            semantic = self.__semantic_distractors([extracted[1] for _, extracted, _ in batch], answer_limit)
+            for (pos_tags, extracted, _), words in zip(batch, semantic):
+                quiz = self.__build_quiz(pos_tags, extracted, answer_limit, words)
+                if quiz.is_valid():
+                    quizzes.append(quiz)
+
+        if expired():
+            record_dropped(quiz_limit - len(quizzes))
+        return quizzes
+
+    def __pick_blank(self, source: str) -> tuple[list[tuple], tuple, float] | None:
+        """
+        POS tags of `source`, a random (index, (verb, tag)) to blank out and the tagger's
+        confidence in that tag. None without verbs.
+        """
         tokens = self.tokenizer.tokenize(source)
-        pos_tags = nltk.pos_tag(tokens)
+        with span("pos_tag"):
+            tagged = pos_tag_with_confidence(tokens)
+        return self.__pick_blank_tagged(tagged)
+
+    def __pick_blank_tagged(self, tagged: list[tuple[str, str, float]]) -> tuple[list[tuple], tuple, float] | None:
+        pos_tags = [(word, tag) for word, tag, _ in tagged]
 
         verbs = [(idx, value) for idx, value in enumerate(
             pos_tags) if pos_tags[idx][1] in verb_tags]
-        print(verbs)
+        logger.debug("Candidate verbs", extra={"verbs": verbs})
 
         if not verbs:
             return None
 
-        extracted = random.choice(verbs)
+        extracted = self.rng.choice(verbs)
+        confidence = tagged[extracted[0]][2]
         if (check_negative(extracted[0], pos_tags)):
             extracted, pos_tags = convert_verb_to_negative(
                 extracted[0], pos_tags)
+        return pos_tags, extracted, confidence
 
+    def __build_quiz(self, pos_tags: list[tuple], extracted: tuple, answer_limit: int,
+                     semantic: list[str]) -> AbstractQuiz:
         pos_tags[extracted[0]] = ("_", extracted[1][1])
 
-        new_answers = self.__generate_answers(answer_limit, extracted[1])
+        new_answers = self.__generate_answers(answer_limit, extracted[1], semantic)
 
         quiz_text = ' '.join([t[0] for t in pos_tags])
         correct_answer = SimpleAnswer(text=extracted[1][0], is_correct=True)
@@ -55,40 +152,31 @@ class SimpleQuizStrategy(QuizGenerationStrategy):
             all_answers.append(SimpleAnswer(text=a, is_correct=False))
 
         return SingleAnswerQuiz(text=quiz_text, answers=all_answers)
-    
-
-    def generate_many(self, source: str, quiz_limit: int, answer_limit: int) -> list[AbstractQuiz]:
-        sentences = split_into_sentences(source)
-        print(sentences)
-        used_sentences = set()
-        quizzes: list[AbstractQuiz] = []
-
-        while len(quizzes) < quiz_limit and len(used_sentences) < len(sentences):
-            text = random.choice([s for s in sentences if s not in used_sentences])
-
-            quiz = self.generate_single(text, answer_limit)
-            if quiz and quiz.is_valid():
-                quizzes.append(quiz)
-                used_sentences.add(text)
-
-        return quizzes
-
-    def __generate_answers(self, number_of_answers: int, correct_answer: tuple) -> list[str]:
-        print("=== __generate_answers ===")
 
+    def __semantic_distractors(self, correct_answers: list[tuple], answer_limit: int) -> list[list[str]]:
+        """Embedding distractors for each (verb, tag), empty lists without an engine."""
+        if self.distractor_engine is None:
+            return [[] for _ in correct_answers]
+        found = self.distractor_engine.distractors_many(correct_answers, answer_limit - 1)
+        return [
+            [w for w in words if w.lower() != verb.lower()]
+            for (verb, _), words in zip(correct_answers, found)
+        ]
+
+    def __generate_answers(self, number_of_answers: int, correct_answer: tuple, semantic: list[str]) -> list[str]:
         correct_verb = correct_answer[0]
         correct_tense_tag = correct_answer[1]
 
         possible_tenses = verb_tags[:]  # fastest way to copy
 
-        print(f"correct_verb: {correct_verb}, correct_tense_tag: {correct_tense_tag}, possible_tenses {possible_tenses}")
+        logger.debug("Generating answers", extra={"correct_verb": correct_verb, "correct_tense_tag": correct_tense_tag})
         possible_tenses.remove(correct_tense_tag)
 
         new_tags = []
-        new_verbs = []
-        i = 1
+        new_verbs = semantic[:(number_of_answers - 1) // 2]
+        i = 1 + len(new_verbs)
         while i < number_of_answers and len(possible_tenses) > 0:
-            tag = random.choice(possible_tenses)
+            tag = self.rng.choice(possible_tenses)
             is_equal, new_verb = generate_tense_from_tag(
                 tag, correct_verb)
 
@@ -99,34 +187,40 @@ class SimpleQuizStrategy(QuizGenerationStrategy):
             possible_tenses.remove(tag)
             i += 1
 
+        # Top up from the embedding distractors when there weren't enough distinct tenses.
+        for word in semantic:
+            if len(new_verbs) >= number_of_answers - 1:
+                break
+            if word not in new_verbs:
+                new_verbs.append(word)
+
         return new_verbs
 
 
 class SequenceQuizStrategy(QuizGenerationStrategy):
 
-    def __init__(self, tokenizer: Tokenizer):
+    def __init__(self, tokenizer: Tokenizer, rng: random.Random | None = None):
         self.tokenizer = tokenizer
+        # A seeded generator makes the quizzes reproducible, the global one is used otherwise.
+        self.rng = rng or random
 
 
     def generate_single(self, source: str, answer_limit: int) -> AbstractQuiz | None:
-        print("=== generate_sequence ===")
-
         # Always split the source into individual words
         fragments = self.tokenizer.tokenize(source)
-        print(fragments)
+        logger.debug("Sequence fragments", extra={"fragments": fragments})
         if len(fragments) > answer_limit:
             # Select a random subsequence to blank out
             max_len = min(answer_limit, len(fragments))
-            seq_len = random.randint(3, max_len)
-            start_idx = random.randint(0, len(fragments) - seq_len)
+            seq_len = self.rng.randint(3, max_len)
+            start_idx = self.rng.randint(0, len(fragments) - seq_len)
             end_idx = start_idx + seq_len
 
             missing_seq = fragments[start_idx:end_idx]
             question_fragments = fragments[:start_idx] + ['_' for _ in missing_seq] + fragments[end_idx:]
 
             question_text = ' '.join(question_fragments)
-            print(f"Question text: {question_text}")
-            print(f"Correct sequence: {missing_seq}")
+            logger.debug("Sequence quiz", extra={"question_text": question_text, "correct_sequence": missing_seq})
 
             all_answers = []
             for idx, frag in enumerate(missing_seq):
@@ -136,7 +230,7 @@ class SequenceQuizStrategy(QuizGenerationStrategy):
             # Default behavior: reorder entire fragment list
             original_fragments = [(i, frag) for i, frag in enumerate(fragments)]
             shuffled = original_fragments[:]
-            random.shuffle(shuffled)
+            self.rng.shuffle(shuffled)
 
             question_text = " ".join(["_" for f in original_fragments])
             all_answers = []
@@ -148,17 +242,23 @@ class SequenceQuizStrategy(QuizGenerationStrategy):
 
 
     def generate_many(self, source: str, quiz_limit: int, answer_limit: int) -> list[AbstractQuiz]:
-        sentences = [s.strip() for s in source.split('.') if s.strip()]
-        used_sentences = set()
+        # Sequence quizzes are built without the final period.
+        sentences = [s.rstrip('.') for s in split_into_sentences(source)]
+        sentences = [s for s in sentences if s]
+        self.rng.shuffle(sentences)
         quizzes: list[AbstractQuiz] = []
 
-        while len(quizzes) < quiz_limit and len(used_sentences) < len(sentences):
-            text = random.choice([s for s in sentences if s not in used_sentences])
+        # Each sentence is tried once, so a sentence that never gives a valid quiz can't stall the loop.
+        for text in sentences:
+            if len(quizzes) == quiz_limit:
+                break
+            if expired():
+                record_dropped(quiz_limit - len(quizzes))
+                break
 
             quiz = self.generate_single(text, answer_limit)
             if quiz and quiz.is_valid():
                 quizzes.append(quiz)
-                used_sentences.add(text)
 
         return quizzes
 
@@ -2,11 +2,13 @@ import asyncio
 import logging
 from typing import List, cast
 from app.service.quiz_generator.generator_strategy import QuizGenerationStrategy
-from app.service.llm.config import LLM_MODEL, client as default_client
+from app.service.llm.config import LLM_MODEL, get_client
 from app.service.llm import prompts
 from app.service.llm.models import MultipleContextQuizResponse, SingleContextQuizResponse
 from app.domain.quiz import AbstractQuiz, ContextQuiz
 from app.domain.answer import ContextAnswer
+from app.utils.deadline import expired, record_dropped, remaining
+from app.utils.profiling import span
 
 logger = logging.getLogger(__name__)
 
@@ -17,8 +19,8 @@ class ContextQuizStrategyLLM(QuizGenerationStrategy):
     This strategy is focusing on grammatical patterns found in user-selected text.
     """
     
-    def __init__(self, target_language: str, native_language: str, client=default_client) -> None:
-        self.client = client
+    def __init__(self, target_language: str, native_language: str, client=None) -> None:
+        self.client = client if client is not None else get_client()
         self.target_language = target_language
         self.native_language = native_language
 
@@ -38,8 +40,15 @@ class ContextQuizStrategyLLM(QuizGenerationStrategy):
             answer_limit: The number of answers per quiz.
 
         Returns:
-            A list of ContextQuiz domain objects.
+            A list of ContextQuiz domain objects. Empty when the request deadline
+            passed before the LLM answered.
         """
+        if expired():
+            record_dropped(quiz_limit)
+            return []
+        # Imported here so importing the strategy doesn't load openai.
+        from openai import NOT_GIVEN, APITimeoutError
+
         prompt = prompts.generate_context_quiz_prompt(
             source_text=source,
             quiz_limit=quiz_limit,
@@ -49,13 +58,16 @@ class ContextQuizStrategyLLM(QuizGenerationStrategy):
         )
 
         try:
-            response = await self.client.beta.chat.completions.parse(
-                model=LLM_MODEL,
-                messages=[{"role": "user", "content": prompt}],
-                temperature=0.6,
-                response_format=MultipleContextQuizResponse,
-                max_tokens=4096,
-            )
+            with span("llm"):
+                # The client timeout bounds each attempt, wait_for also bounds the client's retries.
+                response = await asyncio.wait_for(self.client.beta.chat.completions.parse(
+                    model=LLM_MODEL,
+                    messages=[{"role": "user", "content": prompt}],
+                    temperature=0.6,
+                    response_format=MultipleContextQuizResponse,
+                    max_tokens=4096,
+                    timeout=remaining(default=NOT_GIVEN),
+                ), remaining())
             
             quizzes_response = response.choices[0].message.parsed
             if not quizzes_response or not quizzes_response.quizzes:
@@ -80,7 +92,7 @@ class ContextQuizStrategyLLM(QuizGenerationStrategy):
                     answers=domain_answers
                 )
                 
-                logger.warning([a.__dict__ for a in domain_answers])
+                logger.debug("Context quiz answers", extra={"answers": [str(a) for a in domain_answers]})
                 if domain_quiz.is_valid():
                     domain_quizzes.append(domain_quiz)
                 else:
@@ -88,6 +100,10 @@ class ContextQuizStrategyLLM(QuizGenerationStrategy):
             
             return domain_quizzes
 
+        except (asyncio.TimeoutError, APITimeoutError):
+            logger.warning("Context quiz generation ran past the request deadline")
+            record_dropped(quiz_limit)
+            return []
         except Exception as e:
             logger.error(f"Context quiz generation failed: {e}")
             return []
@@ -100,6 +116,11 @@ class ContextQuizStrategyLLM(QuizGenerationStrategy):
         """
         Generates a single context quiz from a source sentence.
         """
+        if expired():
+            record_dropped()
+            return None
+        from openai import NOT_GIVEN, APITimeoutError
+
         prompt = prompts.generate_single_context_quiz_prompt(
             source_text=source,
             answer_limit=answer_limit,
@@ -108,13 +129,15 @@ class ContextQuizStrategyLLM(QuizGenerationStrategy):
         )
         
         try:
-            response = await self.client.beta.chat.completions.parse(
-                model=LLM_MODEL,
-                messages=[{"role": "user", "content": prompt}],
-                temperature=0.6,
-                response_format=SingleContextQuizResponse,
-                max_tokens=2048
-            )
+            with span("llm"):
+                response = await asyncio.wait_for(self.client.beta.chat.completions.parse(
+                    model=LLM_MODEL,
+                    messages=[{"role": "user", "content": prompt}],
+                    temperature=0.6,
+                    response_format=SingleContextQuizResponse,
+                    max_tokens=2048,
+                    timeout=remaining(default=NOT_GIVEN),
+                ), remaining())
             
             quiz_data = response.choices[0].message.parsed
             if not quiz_data:
@@ -142,6 +165,10 @@ class ContextQuizStrategyLLM(QuizGenerationStrategy):
                 logger.warning(f"Generated single context quiz is not valid: {quiz_data.text}")
                 return None
 
+        except (asyncio.TimeoutError, APITimeoutError):
+            logger.warning("Single context quiz generation ran past the request deadline")
+            record_dropped()
+            return None
         except Exception as e:
             logger.error(f"Single context quiz generation failed: {e}")
             return None
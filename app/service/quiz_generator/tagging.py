@@ -0,0 +1,30 @@
+import functools
+
+from app.service.quiz_generator.tokenizer import Tokenizer
+from app.utils.verb_utils import verb_tags
+
+
+@functools.cache
+def _perceptron_tagger():
+    # The tagger `nltk.pos_tag` builds on every call. Importing nltk also imports
+    # scipy, which takes about a second, so it's left to the first call.
+    from nltk.tag import PerceptronTagger
+
+    return PerceptronTagger()
+
+
+def extract_verb_tags(text: str, tokenizer: Tokenizer) -> list[str]:
+    """
+    Returns the distinct verb tags found in `text`, e.g. ["VBD", "VBZ"].
+    Computed when sentences are stored, so sampling can filter on them without tagging.
+    """
+    pos_tags = _perceptron_tagger().tag(tokenizer.tokenize(text))
+    return sorted({tag for _, tag in pos_tags if tag in verb_tags})
+
+
+def pos_tag_with_confidence(tokens: list[str]) -> list[tuple[str, str, float]]:
+    """
+    Same tags as `nltk.pos_tag`, with the tagger's confidence in each one
+    (1.0 for words it always tags the same way).
+    """
+    return _perceptron_tagger().tag(tokens, return_conf=True)
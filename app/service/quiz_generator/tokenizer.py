@@ -1,6 +1,10 @@
+import functools
+import re
 from abc import abstractmethod
 from typing import Protocol
-import nltk
+
+from app.utils.profiling import span
+from app.utils.text_utils import split_into_sentences
 
 
 class Tokenizer(Protocol):
@@ -12,4 +16,79 @@ class Tokenizer(Protocol):
 
 class EnglishTokenizer:
     def tokenize(self, text: str) -> list[str]:
-        return nltk.word_tokenize(text)
+        import nltk
+
+        with span("tokenize"):
+            return nltk.word_tokenize(text)
+
+
+# One token of a "plain" sentence: ASCII words (optionally hyphenated, optionally with
+# a clitic that the Treebank rules split off when a space follows), double quotes,
+# "--", and punctuation the Treebank rules always split off. A period is only plain
+# as the final one.
+_PLAIN_TOKEN = re.compile(r"""
+    (?P<space>\s+)
+  | (?P<stem>[A-Za-z]+?)(?P<clitic>n't|N'T|'[sSmMdD]|'ll|'LL|'re|'RE|'ve|'VE)(?=[ ,;:?!.()\[\]"]|--|\Z)
+  | (?P<word>[A-Za-z]+(?:-[A-Za-z]+)*)
+  | (?P<quote>"(?!"))
+  | (?P<dash>--)
+  | (?P<punct>[,:](?![,:])|[;?!()\[\]])
+  | (?P<period>\.(?=["\)\]]*\s*$))
+""", re.VERBOSE)
+
+# Words the Treebank rules split even though they contain no punctuation ("can not").
+_SPLIT_WORDS = re.compile(r"(?i)\b(?:cannot|gimme|gonna|gotta|lemme|wanna)\b")
+
+# Characters after which a double quote opens a quotation (`` rather than '').
+_QUOTE_OPENERS = " ([{<"
+
+@functools.cache
+def _treebank():
+    # nltk is only imported for the first sentence that isn't plain.
+    from nltk.tokenize import NLTKWordTokenizer
+
+    return NLTKWordTokenizer()
+
+
+def _tokenize_plain(sentence: str) -> list[str] | None:
+    """
+    Tokenizes a sentence made only of plain tokens in one regex pass, exactly as
+    `NLTKWordTokenizer` would. Returns None for anything else.
+    """
+    if _SPLIT_WORDS.search(sentence):
+        return None
+
+    tokens = []
+    pos = 0
+    length = len(sentence)
+    while pos < length:
+        match = _PLAIN_TOKEN.match(sentence, pos)
+        if match is None:
+            return None
+        kind = match.lastgroup
+        if kind == "clitic":
+            tokens.append(match.group("stem"))
+            tokens.append(match.group("clitic"))
+        elif kind == "quote":
+            tokens.append("``" if pos == 0 or sentence[pos - 1] in _QUOTE_OPENERS else "''")
+        elif kind != "space":
+            tokens.append(match.group(kind))
+        pos = match.end()
+    return tokens
+
+
+class FastEnglishTokenizer:
+    """
+    Same output as `EnglishTokenizer` without running punkt again on text that is
+    usually a single sentence already. Sentences come from `split_into_sentences`;
+    plain ones are tokenized with one precompiled regex and the rest go through
+    nltk's Treebank rules, which is what `word_tokenize` runs per sentence.
+    """
+
+    def tokenize(self, text: str) -> list[str]:
+        with span("tokenize"):
+            tokens = []
+            for sentence in split_into_sentences(text):
+                plain = _tokenize_plain(sentence)
+                tokens.extend(plain if plain is not None else _treebank().tokenize(sentence))
+            return tokens
@@ -0,0 +1,48 @@
+"""
+Loads the models quiz generation uses, so they are in memory before the first request.
+
+Under gunicorn with `preload_app` (see gunicorn.conf.py) this runs once in the master
+before it forks, so every worker shares the loaded models' pages copy-on-write
+instead of loading its own copy.
+"""
+import logging
+import time
+
+logger = logging.getLogger(__name__)
+
+SAMPLE_TEXT = "Alice was beginning to get very tired of sitting by her sister on the bank. She didn't go."
+
+
+def warm_up() -> dict[str, float]:
+    """
+    Loads the POS tagger, the pattern lexicon and the distractor vectors, and runs
+    each once. A step that fails is logged and skipped. Returns the seconds per step.
+    """
+    from app.service.quiz_generator.distractors import get_distractor_engine
+    from app.service.quiz_generator.generator_strategy import SequenceQuizStrategy, SimpleQuizStrategy
+    from app.service.quiz_generator.tagging import pos_tag_with_confidence
+    from app.service.quiz_generator.tokenizer import FastEnglishTokenizer
+    from app.utils.verb_utils import generate_tense_from_tag
+
+    tokenizer = FastEnglishTokenizer()
+    steps = {
+        "tagger": lambda: pos_tag_with_confidence(tokenizer.tokenize(SAMPLE_TEXT)),
+        # Conjugates through the same path the strategies use, which loads pattern's verb lexicon.
+        "pattern": lambda: generate_tense_from_tag("VBD", "go"),
+        "distractors": get_distractor_engine,
+        "simple": lambda: SimpleQuizStrategy(tokenizer=tokenizer, distractor_engine=get_distractor_engine())
+            .generate_many(SAMPLE_TEXT, 1, 4),
+        "sequence": lambda: SequenceQuizStrategy(tokenizer=tokenizer).generate_many(SAMPLE_TEXT, 1, 4),
+    }
+
+    timings = {}
+    for name, step in steps.items():
+        started = time.perf_counter()
+        try:
+            step()
+        except Exception as e:
+            logger.warning(f"Warm-up step {name} failed: {e}")
+            continue
+        timings[name] = time.perf_counter() - started
+    logger.info("Warmed up quiz generation", extra={"seconds": timings})
+    return timings
@@ -0,0 +1,22 @@
+import os
+from dotenv import load_dotenv
+
+load_dotenv()
+
+RATE_LIMIT_ENABLED = os.getenv("RATE_LIMIT_ENABLED", "true") == "true"
+# "postgres" shares the buckets between processes through the rate_limit_buckets table,
+# "memory" keeps them in each process, e.g. for a single worker in development.
+RATE_LIMIT_BACKEND = os.getenv("RATE_LIMIT_BACKEND", "postgres")
+# Seconds between syncs of a process's buckets with the shared ones. Between syncs each
+# process decides alone, so a client can exceed a limit by what it spends in that time.
+RATE_LIMIT_SYNC_INTERVAL_S = float(os.getenv("RATE_LIMIT_SYNC_INTERVAL_S", "1.0"))
+
+# Route classes: "nlp" for the rule-based generators, "llm" for endpoints that call the LLM.
+# Each is a bucket of CAPACITY requests, refilled at PER_MINUTE requests a minute.
+RATE_LIMIT_NLP_CAPACITY = float(os.getenv("RATE_LIMIT_NLP_CAPACITY", "30"))
+RATE_LIMIT_NLP_PER_MINUTE = float(os.getenv("RATE_LIMIT_NLP_PER_MINUTE", "60"))
+RATE_LIMIT_LLM_CAPACITY = float(os.getenv("RATE_LIMIT_LLM_CAPACITY", "5"))
+RATE_LIMIT_LLM_PER_MINUTE = float(os.getenv("RATE_LIMIT_LLM_PER_MINUTE", "10"))
+
+# API keys a user can hold; /api/auth/key refuses to create more.
+MAX_API_KEYS_PER_USER = int(os.getenv("MAX_API_KEYS_PER_USER", "5"))
@@ -0,0 +1,27 @@
+import math
+
+from fastapi import Depends, HTTPException, status
+
+from app.models.auth import User as UserModel
+from app.service.auth.dependencies import get_current_user_or_api_key
+from app.service.rate_limit import config
+from app.service.rate_limit.limiter import get_rate_limiter
+
+
+def rate_limit(route_class: str):
+    """
+    A route dependency that takes a token from the current user's `route_class` bucket,
+    and responds 429 with a Retry-After header when it is empty.
+    """
+    def check_rate_limit(current_user: UserModel = Depends(get_current_user_or_api_key)) -> None:
+        if not config.RATE_LIMIT_ENABLED:
+            return
+        retry_after = get_rate_limiter().acquire(f"user:{current_user.id}", route_class)
+        if retry_after > 0:
+            raise HTTPException(
+                status_code=status.HTTP_429_TOO_MANY_REQUESTS,
+                detail=f"Rate limit exceeded for {route_class} requests",
+                headers={"Retry-After": str(math.ceil(retry_after))},
+            )
+
+    return check_rate_limit
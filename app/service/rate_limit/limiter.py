@@ -0,0 +1,174 @@
+"""
+Token bucket rate limiting per principal (a user, whichever JWT or API key they
+authenticate with) and route class.
+
+Every process answers from its own buckets, without a round trip per request, and
+every `sync_interval` a background thread folds what it consumed into the shared
+buckets in `rate_limit_buckets`, taking back the tokens left there. That way all processes
+share one budget per client, exceeded at most by what the client spends between syncs.
+"""
+import functools
+import logging
+import os
+import threading
+import time
+from dataclasses import dataclass
+from typing import Callable
+
+from sqlalchemy.orm import Session
+
+from app.db import rate_limit_crud
+from app.service.rate_limit import config
+
+logger = logging.getLogger(__name__)
+
+
+@dataclass(frozen=True)
+class Limit:
+    capacity: float
+    # Tokens added per second.
+    rate: float
+
+    @classmethod
+    def per_minute(cls, capacity: float, per_minute: float) -> "Limit":
+        return cls(capacity=capacity, rate=per_minute / 60)
+
+
+class TokenBucket:
+
+    def __init__(self, limit: Limit, now: float) -> None:
+        self.limit = limit
+        self.tokens = limit.capacity
+        self.updated_at = now
+        # Tokens taken since the last sync with the shared bucket.
+        self.consumed = 0.0
+
+    def refill(self, now: float) -> None:
+        self.tokens = min(self.limit.capacity, self.tokens + max(0.0, now - self.updated_at) * self.limit.rate)
+        self.updated_at = max(now, self.updated_at)
+
+    def acquire(self, now: float) -> float:
+        """Takes a token and returns 0, or returns the seconds until one is available."""
+        self.refill(now)
+        if self.tokens >= 1:
+            self.tokens -= 1
+            self.consumed += 1
+            return 0.0
+        return (1 - self.tokens) / self.limit.rate
+
+
+class RateLimiter:
+
+    def __init__(
+        self,
+        limits: dict[str, Limit],
+        session_factory: Callable[[], Session] | None = None,
+        sync_interval: float = config.RATE_LIMIT_SYNC_INTERVAL_S,
+        clock: Callable[[], float] = time.time,
+    ) -> None:
+        """Without a `session_factory` the buckets stay local to this process."""
+        self.limits = limits
+        self.session_factory = session_factory
+        self.sync_interval = sync_interval
+        self.clock = clock
+        self._buckets: dict[tuple[str, str], TokenBucket] = {}
+        self._lock = threading.Lock()
+        self._sync_lock = threading.Lock()
+        self._stopped = threading.Event()
+        # The process the sync thread was started in: threads don't survive a fork.
+        self._syncer_pid: int | None = None
+
+    def acquire(self, principal: str, route_class: str) -> float:
+        """
+        Takes a token from the principal's bucket for `route_class`. Returns 0 when the
+        request may go ahead, or the seconds to wait before retrying.
+        """
+        now = self.clock()
+        with self._lock:
+            key = (principal, route_class)
+            bucket = self._buckets.get(key)
+            if bucket is None:
+                bucket = self._buckets[key] = TokenBucket(self.limits[route_class], now)
+            retry_after = bucket.acquire(now)
+
+        self._start_syncer()
+        return retry_after
+
+    def stop(self) -> None:
+        """Stops the background sync."""
+        self._stopped.set()
+
+    def sync(self) -> None:
+        """Exchanges the local consumption for the shared state. Skipped while another thread syncs."""
+        if not self._sync_lock.acquire(blocking=False):
+            return
+        try:
+            now = self.clock()
+            with self._lock:
+                pending = {key: bucket.consumed for key, bucket in self._buckets.items()}
+                for bucket in self._buckets.values():
+                    bucket.consumed = 0.0
+
+            shared = {}
+            try:
+                with self.session_factory() as db:
+                    for (principal, route_class), consumed in pending.items():
+                        limit = self.limits[route_class]
+                        shared[(principal, route_class)] = rate_limit_crud.sync_bucket(
+                            db, principal, route_class, limit.capacity, limit.rate, consumed, now
+                        )
+            except Exception as e:
+                # Keep limiting locally and hand the consumption to the next sync.
+                logger.warning(f"Rate limit sync failed: {e}")
+                with self._lock:
+                    for key, consumed in pending.items():
+                        if key not in shared and key in self._buckets:
+                            self._buckets[key].consumed += consumed
+
+            with self._lock:
+                for key, tokens in shared.items():
+                    bucket = self._buckets.get(key)
+                    if bucket is None:
+                        continue
+                    if pending[key] == 0 and bucket.consumed == 0 and tokens >= bucket.limit.capacity:
+                        # Full and unused since the last sync: a new bucket would start the same.
+                        del self._buckets[key]
+                        continue
+                    # Requests served here while the exchange ran still count.
+                    bucket.tokens = max(0.0, tokens - bucket.consumed)
+                    bucket.updated_at = now
+        finally:
+            self._sync_lock.release()
+
+    def _start_syncer(self) -> None:
+        pid = os.getpid()
+        if self.session_factory is None or self._syncer_pid == pid or self._stopped.is_set():
+            return
+        with self._lock:
+            if self._syncer_pid == pid:
+                return
+            self._syncer_pid = pid
+        threading.Thread(target=self._run_syncer, name="rate-limit-sync", daemon=True).start()
+
+    def _run_syncer(self) -> None:
+        while not self._stopped.wait(self.sync_interval):
+            try:
+                self.sync()
+            except Exception:
+                logger.exception("Rate limit sync failed")
+
+
+def default_limits() -> dict[str, Limit]:
+    return {
+        "nlp": Limit.per_minute(config.RATE_LIMIT_NLP_CAPACITY, config.RATE_LIMIT_NLP_PER_MINUTE),
+        "llm": Limit.per_minute(config.RATE_LIMIT_LLM_CAPACITY, config.RATE_LIMIT_LLM_PER_MINUTE),
+    }
+
+
+@functools.cache
+def get_rate_limiter() -> RateLimiter:
+    session_factory = None
+    if config.RATE_LIMIT_BACKEND == "postgres":
+        from app.db.database import SessionLocal
+        session_factory = SessionLocal
+    return RateLimiter(default_limits(), session_factory=session_factory)
@@ -0,0 +1,35 @@
+"""
+SM-2 spaced repetition: each answer is graded 0-5, and a quiz answered well comes back
+after a growing interval (1 day, 6 days, then the previous interval times its ease).
+A grade below 3 starts the quiz over at one day.
+"""
+from dataclasses import dataclass
+
+MIN_EASE = 1.3
+PASSING_QUALITY = 3
+
+
+@dataclass(frozen=True, slots=True)
+class ReviewState:
+    repetitions: int = 0
+    interval_days: float = 0.0
+    ease: float = 2.5
+
+
+def review(state: ReviewState, quality: int) -> ReviewState:
+    """The state after answering with `quality`, 0 (blackout) to 5 (perfect recall)."""
+    if not 0 <= quality <= 5:
+        raise ValueError(f"quality must be between 0 and 5, got {quality}")
+
+    ease = max(MIN_EASE, state.ease + 0.1 - (5 - quality) * (0.08 + (5 - quality) * 0.02))
+    if quality < PASSING_QUALITY:
+        return ReviewState(repetitions=0, interval_days=1.0, ease=ease)
+
+    repetitions = state.repetitions + 1
+    if repetitions == 1:
+        interval = 1.0
+    elif repetitions == 2:
+        interval = 6.0
+    else:
+        interval = round(state.interval_days * state.ease)
+    return ReviewState(repetitions=repetitions, interval_days=float(interval), ease=ease)
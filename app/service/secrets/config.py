@@ -0,0 +1,13 @@
+import os
+from dotenv import load_dotenv
+
+load_dotenv()
+
+# Where the database credentials come from: "aws" (Secrets Manager, the secret named by
+# DB_SECRET_NAME in AWS_REGION), "file" (a JSON file shaped like that secret) or "env"
+# (the DB_* variables). Defaults to "aws" with USE_AWS_SECRETS=true, "env" otherwise.
+SECRETS_PROVIDER = os.getenv("SECRETS_PROVIDER") or ("aws" if os.getenv("USE_AWS_SECRETS") == "true" else "env")
+SECRETS_FILE = os.getenv("SECRETS_FILE", "secrets/db.json")
+# Seconds between background refreshes, so rotated credentials are picked up without a
+# restart. 0 fetches them once.
+SECRETS_REFRESH_S = float(os.getenv("SECRETS_REFRESH_S", "300"))
@@ -0,0 +1,67 @@
+"""
+Sources of the database credentials. Every provider returns them in the shape of an
+RDS secret in Secrets Manager: {"username", "password", "host", "port", "dbname"}.
+"""
+import json
+import os
+from abc import abstractmethod
+from typing import Protocol
+
+from app.service.secrets import config
+
+
+class SecretsProvider(Protocol):
+
+    @abstractmethod
+    def fetch(self) -> dict:
+        """Reads the current value. Called again on every refresh."""
+        pass
+
+
+class AwsSecretsProvider:
+
+    def __init__(self, secret_name_env_var: str = "DB_SECRET_NAME", region_name_env_var: str = "AWS_REGION") -> None:
+        self.secret_name_env_var = secret_name_env_var
+        self.region_name_env_var = region_name_env_var
+
+    def fetch(self) -> dict:
+        from app.utils.aws_secrets import get_aws_secret
+
+        return get_aws_secret(self.secret_name_env_var, self.region_name_env_var)
+
+
+class FileSecretsProvider:
+    """A JSON file, re-read on every refresh: edit it to rotate credentials locally."""
+
+    def __init__(self, path: str) -> None:
+        self.path = path
+
+    def fetch(self) -> dict:
+        with open(self.path, encoding="utf-8") as f:
+            return json.load(f)
+
+
+class EnvSecretsProvider:
+    """The DB_USER, DB_PASS, DB_HOST, DB_PORT and DB_NAME variables, e.g. from .env."""
+
+    def fetch(self) -> dict:
+        secret = {
+            "username": os.environ.get("DB_USER"),
+            "password": os.environ.get("DB_PASS"),
+            "host": os.environ.get("DB_HOST"),
+            "port": os.environ.get("DB_PORT", 5432),
+            "dbname": os.environ.get("DB_NAME"),
+        }
+        if not all(secret.values()):
+            raise ValueError("Missing local database environment variables. Did you create .env?")
+        return secret
+
+
+def get_db_secrets_provider() -> SecretsProvider:
+    if config.SECRETS_PROVIDER == "aws":
+        return AwsSecretsProvider()
+    if config.SECRETS_PROVIDER == "file":
+        return FileSecretsProvider(config.SECRETS_FILE)
+    if config.SECRETS_PROVIDER == "env":
+        return EnvSecretsProvider()
+    raise ValueError(f"Unknown SECRETS_PROVIDER {config.SECRETS_PROVIDER!r}, expected aws, file or env")
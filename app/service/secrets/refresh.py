@@ -0,0 +1,85 @@
+"""
+A secret kept in memory and refreshed in the background.
+
+Readers get the last fetched value without waiting; only the very first read fetches
+it, unless `prefetch` already did. A daemon thread fetches it again every `ttl` seconds and notifies the listeners
+when it changed, e.g. to replace pooled database connections opened with rotated
+credentials. A failed refresh keeps the current value. Each process (also each forked
+gunicorn worker) runs its own refresh thread, started on its first read.
+"""
+import logging
+import os
+import threading
+from typing import Callable
+
+from app.service.secrets.providers import SecretsProvider
+
+logger = logging.getLogger(__name__)
+
+
+class RefreshingSecret:
+
+    def __init__(self, provider: SecretsProvider, ttl: float) -> None:
+        """A `ttl` of 0 or less never refreshes in the background."""
+        self.provider = provider
+        self.ttl = ttl
+        self._value: dict | None = None
+        self._listeners: list[Callable[[dict], None]] = []
+        self._lock = threading.Lock()
+        self._stopped = threading.Event()
+        # The process the refresh thread was started in: threads don't survive a fork.
+        self._refresher_pid: int | None = None
+
+    def on_change(self, listener: Callable[[dict], None]) -> Callable[[dict], None]:
+        """Calls `listener` with the new value whenever a refresh finds a different one. Usable as a decorator."""
+        self._listeners.append(listener)
+        return listener
+
+    def get(self) -> dict:
+        value = self._value
+        if value is None:
+            with self._lock:
+                if self._value is None:
+                    self._value = self.provider.fetch()
+                value = self._value
+        self._start_refresher()
+        return value
+
+    def prefetch(self) -> None:
+        """Fetches the secret ahead of the first read, e.g. in a new worker. A failure is logged and the first read retries."""
+        try:
+            self.get()
+        except Exception as e:
+            logger.warning(f"Secret prefetch failed, fetching it on first use: {e}")
+
+    def refresh(self) -> bool:
+        """Fetches the secret now. Returns whether it changed, after notifying the listeners."""
+        value = self.provider.fetch()
+        with self._lock:
+            changed = self._value is not None and value != self._value
+            self._value = value
+        if changed:
+            for listener in self._listeners:
+                listener(value)
+        return changed
+
+    def stop(self) -> None:
+        self._stopped.set()
+
+    def _start_refresher(self) -> None:
+        pid = os.getpid()
+        if self.ttl <= 0 or self._refresher_pid == pid or self._stopped.is_set():
+            return
+        with self._lock:
+            if self._refresher_pid == pid:
+                return
+            self._refresher_pid = pid
+        threading.Thread(target=self._run, name="secret-refresh", daemon=True).start()
+
+    def _run(self) -> None:
+        while not self._stopped.wait(self.ttl):
+            try:
+                if self.refresh():
+                    logger.info("Secret changed", extra={"provider": type(self.provider).__name__})
+            except Exception as e:
+                logger.warning(f"Secret refresh failed, keeping the current value: {e}")
@@ -0,0 +1,62 @@
+import logging
+from os import listdir
+from os.path import isdir, isfile, join
+
+from sqlalchemy.orm import Session
+
+from app.db import schemas, text_crud
+from app.service.quiz_generator.tagging import extract_verb_tags
+from app.service.quiz_generator.tokenizer import FastEnglishTokenizer
+from app.service.text_parser.config import CHAPTER_TAG
+from app.utils.text_utils import split_into_sentences
+
+logger = logging.getLogger(__name__)
+
+# Sentences outside (MIN_SENTENCE_LENGTH, MAX_SENTENCE_LENGTH] characters are not stored.
+MIN_SENTENCE_LENGTH = 50
+MAX_SENTENCE_LENGTH = 150
+
+
+def ingest_parsed_texts(db: Session, source_dir: str = "./source/parsed") -> dict:
+    """
+    Stores the sentences of every parsed text in `source_dir` as entries of a dataset
+    named after the file, creating the dataset if needed.
+
+    Safe to run again, e.g. when a job is retried: sentences already in the dataset
+    are skipped, and each file's new sentences are stored in one transaction.
+    """
+    if not isdir(source_dir):
+        raise NotADirectoryError(source_dir)
+
+    files = sorted(f for f in listdir(source_dir) if isfile(join(source_dir, f)))
+    tokenizer = FastEnglishTokenizer()
+    datasets = {}
+
+    for file in files:
+        with open(join(source_dir, file), "r", encoding="utf-8") as f:
+            contents = f.read()
+
+        sentences = []
+        for chapter in contents.split(CHAPTER_TAG):
+            sentences.extend(split_into_sentences(chapter))
+
+        db_dataset = text_crud.get_dataset_by_title(db=db, title=file)
+        if not db_dataset:
+            db_dataset = text_crud.create_dataset(
+                db=db, dataset=schemas.DatasetCreate(title=file, source=join(source_dir, file)))
+
+        seen = text_crud.get_dataset_texts(db, db_dataset.id)
+        new_texts = []
+        for s in sentences:
+            if MIN_SENTENCE_LENGTH < len(s) <= MAX_SENTENCE_LENGTH and s not in seen:
+                seen.add(s)
+                new_texts.append(s)
+        added = text_crud.create_text_features(
+            db, db_dataset.id, [(text, extract_verb_tags(text, tokenizer)) for text in new_texts])
+
+        logger.info("Ingested parsed text", extra={
+            "file": file, "sentences": len(sentences), "new_features": added, "dataset_id": db_dataset.id,
+        })
+        datasets[file] = {"dataset": db_dataset.id, "new features": added}
+
+    return {"processed files": files, "datasets": datasets}
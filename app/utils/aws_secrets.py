@@ -1,20 +1,17 @@
 import os
 import json
 import logging
-import boto3
-from functools import lru_cache
-from botocore.exceptions import ClientError
 
 logger = logging.getLogger(__name__)
 
 
-@lru_cache(maxsize=4)
 def get_aws_secret(secret_name_env_var: str, region_name_env_var: str = "AWS_REGION") -> dict:
     """
     Fetches a secret from AWS Secrets Manager and parses it as JSON.
 
     The secret name and AWS region are read from environment variables.
-    The result is cached to avoid repeated API calls.
+    Every call asks AWS: cache the result, e.g. in a `RefreshingSecret`, so rotated
+    secrets are picked up.
 
     Args:
         secret_name_env_var: The environment variable that holds the name of the secret.
@@ -42,6 +39,10 @@ def get_aws_secret(secret_name_env_var: str, region_name_env_var: str = "AWS_REG
         logger.critical(error_msg)
         raise ValueError(error_msg)
 
+    # boto3 takes a while to import and is only needed with SECRETS_PROVIDER=aws.
+    import boto3
+    from botocore.exceptions import ClientError
+
     session = boto3.Session()
     client = session.client(
         service_name='secretsmanager',
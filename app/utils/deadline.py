@@ -0,0 +1,99 @@
+"""
+Per-request deadlines.
+
+`deadline_scope(seconds)` sets a deadline for the current context, which asyncio tasks
+and thread pool calls started from it inherit. Code deep in the generation pipeline
+asks how much time is left (`remaining`), stops loops once it has `expired`, and
+reports work it gave up on with `record_dropped`, without the deadline being passed
+through every signature. Outside a scope there is no deadline and nothing expires.
+"""
+import asyncio
+import time
+from contextlib import contextmanager
+from contextvars import ContextVar
+from dataclasses import dataclass
+from typing import Any, Awaitable, Iterator
+
+
+@dataclass
+class Deadline:
+    expires_at: float  # time.monotonic()
+    dropped: int = 0
+
+    def remaining(self) -> float:
+        return max(0.0, self.expires_at - time.monotonic())
+
+    def expired(self) -> bool:
+        return time.monotonic() >= self.expires_at
+
+
+_current_deadline: ContextVar[Deadline | None] = ContextVar("current_deadline", default=None)
+
+
+@contextmanager
+def deadline_scope(seconds: float) -> Iterator[Deadline]:
+    """
+    Sets a deadline `seconds` from now for this context. A nested scope can only
+    shorten the enclosing deadline, and shares its dropped-item count.
+    """
+    outer = _current_deadline.get()
+    expires_at = time.monotonic() + seconds
+    if outer is not None:
+        expires_at = min(expires_at, outer.expires_at)
+    deadline = Deadline(expires_at)
+    token = _current_deadline.set(deadline)
+    try:
+        yield deadline
+    finally:
+        _current_deadline.reset(token)
+        if outer is not None:
+            outer.dropped += deadline.dropped
+
+
+def current_deadline() -> Deadline | None:
+    return _current_deadline.get()
+
+
+def remaining(default: Any = None) -> float | Any:
+    """Seconds left before the deadline, or `default` when there is none."""
+    deadline = _current_deadline.get()
+    return default if deadline is None else deadline.remaining()
+
+
+def expired() -> bool:
+    deadline = _current_deadline.get()
+    return deadline is not None and deadline.expired()
+
+
+def record_dropped(count: int = 1) -> None:
+    """Counts items left out of the response because the deadline passed."""
+    deadline = _current_deadline.get()
+    if deadline is not None and count > 0:
+        deadline.dropped += count
+
+
+async def gather_until_deadline(*aws: Awaitable) -> list[Any]:
+    """
+    Like `asyncio.gather(..., return_exceptions=True)`, but the tasks still running
+    when the deadline passes are cancelled, and their result is a `CancelledError`.
+    Without a deadline it waits for every task.
+    """
+    tasks = [asyncio.ensure_future(aw) for aw in aws]
+    if not tasks:
+        return []
+
+    _, pending = await asyncio.wait(tasks, timeout=remaining())
+    for task in pending:
+        task.cancel()
+    if pending:
+        await asyncio.wait(pending)
+
+    results = []
+    for task in tasks:
+        if task.cancelled():
+            results.append(asyncio.CancelledError())
+        elif task.exception() is not None:
+            results.append(task.exception())
+        else:
+            results.append(task.result())
+    return results
@@ -0,0 +1,149 @@
+"""
+Application logging setup.
+
+Records are written as JSON lines by a `QueueListener` on a background thread, so
+request handlers only pay for building the record and putting it on a queue. A forked
+child (e.g. a gunicorn worker of a preloaded app) gets its own queue and writer thread.
+
+Configured through environment variables:
+    LOG_LEVEL               Root level, defaults to INFO.
+    LOG_LEVELS              Per-module levels, e.g. "app.service.quiz_generator=DEBUG,openai=WARNING".
+    LOG_DEBUG_SAMPLE_RATE   Fraction of DEBUG records to keep, defaults to 1.0.
+    LOG_FORMAT              "json" (default) or "text".
+"""
+import atexit
+import copy
+import json
+import logging
+import os
+import queue
+import random
+import sys
+from datetime import datetime, timezone
+from logging.handlers import QueueHandler, QueueListener
+
+# Attributes every LogRecord has; anything else was passed through `extra=`.
+_RECORD_ATTRS = frozenset(logging.LogRecord("", 0, "", 0, "", (), None).__dict__) | {"message", "asctime"}
+
+_listener: QueueListener | None = None
+
+
+class JsonFormatter(logging.Formatter):
+
+    def format(self, record: logging.LogRecord) -> str:
+        entry = {
+            "ts": datetime.fromtimestamp(record.created, tz=timezone.utc).isoformat(),
+            "level": record.levelname,
+            "logger": record.name,
+            "message": record.getMessage(),
+        }
+        for key, value in record.__dict__.items():
+            if key not in _RECORD_ATTRS:
+                entry[key] = value
+        if record.exc_info and not record.exc_text:
+            record.exc_text = self.formatException(record.exc_info)
+        if record.exc_text:
+            entry["exc_info"] = record.exc_text
+        return json.dumps(entry, default=str, ensure_ascii=False)
+
+
+class SamplingFilter(logging.Filter):
+    """Keeps a `rate` fraction of records below `max_level`, and every record above it."""
+
+    def __init__(self, rate: float, max_level: int = logging.DEBUG) -> None:
+        super().__init__()
+        self.rate = rate
+        self.max_level = max_level
+
+    def filter(self, record: logging.LogRecord) -> bool:
+        return record.levelno > self.max_level or self.rate >= 1.0 or random.random() < self.rate
+
+
+class StructuredQueueHandler(QueueHandler):
+    """
+    `QueueHandler.prepare` formats the whole record on the calling thread. This only
+    resolves the message arguments and the traceback, so `extra` fields reach the
+    listener untouched and the JSON encoding happens on the listener thread.
+    """
+
+    def prepare(self, record: logging.LogRecord) -> logging.LogRecord:
+        record = copy.copy(record)
+        record.msg = record.getMessage()
+        record.args = None
+        if record.exc_info:
+            record.exc_text = logging.Formatter().formatException(record.exc_info)
+            record.exc_info = None
+        return record
+
+
+def parse_module_levels(value: str) -> dict[str, str]:
+    """Parses "a.b=DEBUG,c=WARNING" into {"a.b": "DEBUG", "c": "WARNING"}."""
+    levels = {}
+    for item in value.split(","):
+        if "=" not in item:
+            continue
+        name, level = item.split("=", 1)
+        levels[name.strip()] = level.strip().upper()
+    return levels
+
+
+def configure_logging() -> None:
+    """
+    Routes all logging through a queue to a background writer. Safe to call more than once.
+    """
+    global _listener
+    if _listener is not None:
+        return
+
+    if os.getenv("LOG_FORMAT", "json") == "text":
+        formatter = logging.Formatter("%(asctime)-15s %(levelname)-8s %(name)s %(message)s")
+    else:
+        formatter = JsonFormatter()
+
+    stream_handler = logging.StreamHandler(sys.stdout)
+    stream_handler.setFormatter(formatter)
+
+    log_queue: queue.SimpleQueue = queue.SimpleQueue()
+    queue_handler = StructuredQueueHandler(log_queue)
+    queue_handler.addFilter(SamplingFilter(float(os.getenv("LOG_DEBUG_SAMPLE_RATE", "1.0"))))
+
+    root = logging.getLogger()
+    for handler in root.handlers[:]:
+        root.removeHandler(handler)
+    root.addHandler(queue_handler)
+    root.setLevel(os.getenv("LOG_LEVEL", "INFO").upper())
+
+    for name, level in parse_module_levels(os.getenv("LOG_LEVELS", "")).items():
+        logging.getLogger(name).setLevel(level)
+
+    _listener = QueueListener(log_queue, stream_handler, respect_handler_level=True)
+    _listener.start()
+    atexit.register(shutdown_logging)
+
+
+def restart_after_fork() -> None:
+    """
+    Gives a forked child its own queue and writer thread. The child inherits the queue
+    handler, but not the listener thread that drained its queue.
+    """
+    global _listener
+    if _listener is None:
+        return
+    log_queue: queue.SimpleQueue = queue.SimpleQueue()
+    for handler in logging.getLogger().handlers:
+        if isinstance(handler, StructuredQueueHandler):
+            handler.queue = log_queue
+    _listener = QueueListener(log_queue, *_listener.handlers, respect_handler_level=True)
+    _listener.start()
+
+
+def shutdown_logging() -> None:
+    """Flushes queued records and stops the writer thread."""
+    global _listener
+    if _listener is not None:
+        _listener.stop()
+        _listener = None
+
+
+if hasattr(os, "register_at_fork"):
+    os.register_at_fork(after_in_child=restart_after_fork)
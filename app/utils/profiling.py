@@ -0,0 +1,137 @@
+"""
+Per-request span recording.
+
+`span("name")` records how long a block took when the current request is being
+profiled (see `app.api.middleware.ProfilingMiddleware`), and costs a single
+context variable lookup otherwise. Spans started in worker threads are recorded
+too, because Starlette copies the context into its thread pool.
+"""
+import asyncio
+import functools
+import inspect
+import json
+import threading
+import time
+from contextlib import contextmanager
+from contextvars import ContextVar
+from dataclasses import dataclass, field
+from typing import Iterator
+
+from sqlalchemy import event
+from sqlalchemy.engine import Engine
+
+
+@dataclass
+class Span:
+    name: str
+    start_ns: int
+    end_ns: int
+    track: int
+
+
+@dataclass
+class RequestTrace:
+    name: str
+    start_ns: int = field(default_factory=time.perf_counter_ns)
+    end_ns: int = 0
+    spans: list[Span] = field(default_factory=list)
+
+    def totals_ms(self) -> dict[str, float]:
+        """Total time per span name, in milliseconds."""
+        totals: dict[str, float] = {}
+        for s in self.spans:
+            totals[s.name] = totals.get(s.name, 0.0) + (s.end_ns - s.start_ns) / 1e6
+        return totals
+
+    def to_chrome_trace(self) -> dict:
+        """Chrome trace event format, viewable in chrome://tracing or Perfetto."""
+        events = [{
+            "name": self.name, "ph": "X", "pid": 1, "tid": 0,
+            "ts": 0, "dur": (self.end_ns - self.start_ns) / 1000,
+        }]
+        for s in self.spans:
+            events.append({
+                "name": s.name, "ph": "X", "pid": 1, "tid": s.track,
+                "ts": (s.start_ns - self.start_ns) / 1000, "dur": (s.end_ns - s.start_ns) / 1000,
+            })
+        return {"traceEvents": events, "otherData": {"totals_ms": self.totals_ms()}}
+
+    def write_chrome_trace(self, path: str) -> None:
+        with open(path, "w", encoding="utf-8") as f:
+            json.dump(self.to_chrome_trace(), f)
+
+
+_current_trace: ContextVar[RequestTrace | None] = ContextVar("current_trace", default=None)
+
+
+@contextmanager
+def record_trace(name: str) -> Iterator[RequestTrace]:
+    """Makes spans in this context (and tasks or threads started from it) record into a new trace."""
+    trace = RequestTrace(name=name)
+    token = _current_trace.set(trace)
+    try:
+        yield trace
+    finally:
+        trace.end_ns = time.perf_counter_ns()
+        _current_trace.reset(token)
+
+
+def _track() -> int:
+    # Concurrent tasks on the event loop get their own track so their spans don't overlap.
+    try:
+        task = asyncio.current_task()
+    except RuntimeError:
+        task = None
+    return id(task) if task is not None else threading.get_ident()
+
+
+@contextmanager
+def span(name: str) -> Iterator[None]:
+    trace = _current_trace.get()
+    if trace is None:
+        yield
+        return
+    start = time.perf_counter_ns()
+    try:
+        yield
+    finally:
+        trace.spans.append(Span(name, start, time.perf_counter_ns(), _track()))
+
+
+def traced(name: str):
+    """Decorator recording every call of a sync or async function as a span."""
+    def decorator(func):
+        if inspect.iscoroutinefunction(func):
+            @functools.wraps(func)
+            async def async_wrapper(*args, **kwargs):
+                with span(name):
+                    return await func(*args, **kwargs)
+            return async_wrapper
+
+        @functools.wraps(func)
+        def wrapper(*args, **kwargs):
+            with span(name):
+                return func(*args, **kwargs)
+        return wrapper
+    return decorator
+
+
+def _before_cursor_execute(conn, cursor, statement, parameters, context, executemany):
+    conn.info.setdefault("profiling_query_start", []).append(time.perf_counter_ns())
+
+
+def _after_cursor_execute(conn, cursor, statement, parameters, context, executemany):
+    starts = conn.info.get("profiling_query_start")
+    if not starts:
+        return
+    start = starts.pop()
+    trace = _current_trace.get()
+    if trace is not None:
+        trace.spans.append(Span("db", start, time.perf_counter_ns(), _track()))
+
+
+def instrument_sqlalchemy() -> None:
+    """Records every SQL statement executed by any engine as a "db" span."""
+    if not event.contains(Engine, "before_cursor_execute", _before_cursor_execute):
+        event.listen(Engine, "before_cursor_execute", _before_cursor_execute)
+        event.listen(Engine, "after_cursor_execute", _after_cursor_execute)
@@ -1,8 +1,113 @@
 import re
 
 
+# Lowercased, without the trailing period. A period after one of these does not end a sentence.
+# Only words that are never a sentence's last word: titles before a name, and Latin abbreviations.
+ABBREVIATIONS = frozenset({
+    "mr", "mrs", "ms", "dr", "prof", "sr", "jr", "st", "mt", "rev",
+    "capt", "lt", "sgt", "cpl", "maj", "adm", "gov",
+    "messrs", "mme", "mlle",
+    "vs", "etc", "cf", "viz", "e.g", "i.e",
+})
+
+# Abbreviations that are also ordinary words ("no", "mar") or often end a sentence. Their
+# period only doesn't end the sentence before a number: "No. 5", "Mar. 3", "pp. 12".
+NUMBERED_ABBREVIATIONS = frozenset({
+    "no", "nos", "fig", "figs", "vol", "vols", "ch", "pp", "est", "approx",
+    "jan", "feb", "mar", "apr", "jun", "jul", "aug", "sep", "sept", "oct", "nov", "dec",
+})
+
+# Terminal punctuation, optional closing quotes/brackets, then whitespace or the end of the text.
+_BOUNDARY = re.compile(r"""[.!?]+["'”’)\]]*(?=\s|$)""")
+_OPENING = "\"'“‘(["
+
+
+def _is_initial(word: str) -> bool:
+    return len(word) == 1 and word.isupper() and word != "I"
+
+
+def _capitalized(word: str) -> bool:
+    return word[:1].isupper()
+
+
+def _word_before(text: str, pos: int) -> str:
+    """The word ending before the whitespace before `pos`, without its trailing period."""
+    end = pos
+    while end > 0 and text[end - 1].isspace():
+        end -= 1
+    start = end
+    while start > 0 and not text[start - 1].isspace():
+        start -= 1
+    return text[start:end].lstrip(_OPENING).rstrip(".")
+
+
+def _word_after(text: str, pos: int) -> str:
+    """The word starting at `pos`, without its trailing period."""
+    end = pos
+    while end < len(text) and not text[end].isspace():
+        end += 1
+    return text[pos:end].lstrip(_OPENING).rstrip(".")
+
+
+def sentence_spans(text: str) -> list[tuple[int, int]]:
+    """
+    Splits text into sentences in a single pass and returns (start, end) offsets
+    into `text`, so callers can slice only what they need.
+
+    A period does not end a sentence after an abbreviation from `ABBREVIATIONS`,
+    after one from `NUMBERED_ABBREVIATIONS` followed by a digit, after an initial
+    (an uppercase letter other than "I", next to another initial or after a
+    capitalized word: "J. R. R. Tolkien", "John F. Kennedy", but not "plan B."),
+    or when the next word starts with a lowercase letter. Closing quotes and
+    brackets stay with their sentence.
+    """
+    spans = []
+    start = 0
+    length = len(text)
+
+    for match in _BOUNDARY.finditer(text):
+        end = match.end()
+        punct_end = match.start() + len(match.group(0).rstrip("\"'”’)]"))
+
+        next_start = end
+        while next_start < length and text[next_start].isspace():
+            next_start += 1
+        if next_start < length and text[next_start].islower():
+            continue
+
+        if text[match.start()] == "." and punct_end - match.start() == 1:
+            # Word before the period, without opening quotes/brackets.
+            word_start = match.start()
+            while word_start > start and not text[word_start - 1].isspace():
+                word_start -= 1
+            word = text[word_start:match.start()].lstrip(_OPENING)
+            if word.lower() in ABBREVIATIONS:
+                continue
+            if word.lower() in NUMBERED_ABBREVIATIONS and next_start < length and text[next_start].isdigit():
+                continue
+            if _is_initial(word) and (
+                _is_initial(_word_after(text, next_start)) or _capitalized(_word_before(text, word_start))
+            ):
+                continue
+
+        while start < end and text[start].isspace():
+            start += 1
+        if start < end:
+            spans.append((start, end))
+        start = next_start
+
+    while start < length and text[start].isspace():
+        start += 1
+    if start < length:
+        end = length
+        while text[end - 1].isspace():
+            end -= 1
+        spans.append((start, end))
+
+    return spans
+
+
 def split_into_sentences(text: str) -> list[str]:
     if not text:
         return []
-    sentences = re.split(r'(?<=[.!?";]) +', text)
-    return sentences
+    return [text[start:end] for start, end in sentence_spans(text)]
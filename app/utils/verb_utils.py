@@ -1,31 +1,36 @@
-from pattern.text import (
-    INFINITIVE, PRESENT, PAST, FUTURE,  # tense
-    FIRST, SECOND, THIRD,  # person
-    SINGULAR, PLURAL, SG, PL,  # number
-    PROGRESSIVE, PERFECTIVE, PARTICIPLE, GERUND,  # aspect
-    INDICATIVE,  # mood
-)
-from pattern.text.en import conjugate, lemma, lexeme
-
-
-tag_to_verb_map = {
-    "VB": {"tense": INFINITIVE},  # verb, base form
-    "VBD": {"tense": PAST},  # verb, past tense
-    "VBG": {"aspect": GERUND},  # verb, present participle or gerund
-    "VBN": {"tense": PAST, "aspect": PARTICIPLE},  # verb, past participle
-    # verb, present tense, not 3rd person singular
-    "VBP": {"tense": PRESENT, "number": SG, "person": 1},
-    # verb, present tense, 3rd person singular
-    "VBZ": {"tense": PRESENT, "number": SG, "person": 3},
-
-    "VBDN": {"tense": PAST, "negated": True},  # verb, past tense
-    # verb, present tense, not 3rd person singular
-    "VBPN": {"tense": PRESENT, "number": SG, "person": 1, "negated": True},
-    # verb, present tense, 3rd person singular
-    "VBZN": {"tense": PRESENT, "number": SG, "person": 3, "negated": True},
-    "VBNN": {"tense": PAST, "aspect": PARTICIPLE, "negated": True}
-
-}
+import functools
+
+from app.utils.profiling import span
+
+
+@functools.cache
+def _tag_to_verb_map() -> dict[str, dict]:
+    # pattern is imported on first use rather than when the app starts.
+    from pattern.text import (
+        INFINITIVE, PRESENT, PAST,  # tense
+        SG,  # number
+        PARTICIPLE, GERUND,  # aspect
+    )
+
+    return {
+        "VB": {"tense": INFINITIVE},  # verb, base form
+        "VBD": {"tense": PAST},  # verb, past tense
+        "VBG": {"aspect": GERUND},  # verb, present participle or gerund
+        "VBN": {"tense": PAST, "aspect": PARTICIPLE},  # verb, past participle
+        # verb, present tense, not 3rd person singular
+        "VBP": {"tense": PRESENT, "number": SG, "person": 1},
+        # verb, present tense, 3rd person singular
+        "VBZ": {"tense": PRESENT, "number": SG, "person": 3},
+
+        "VBDN": {"tense": PAST, "negated": True},  # verb, past tense
+        # verb, present tense, not 3rd person singular
+        "VBPN": {"tense": PRESENT, "number": SG, "person": 1, "negated": True},
+        # verb, present tense, 3rd person singular
+        "VBZN": {"tense": PRESENT, "number": SG, "person": 3, "negated": True},
+        "VBNN": {"tense": PAST, "aspect": PARTICIPLE, "negated": True}
+
+    }
+
 
 negative_tags = [("not", "RB"), ("n't", "RB")]
 
@@ -78,15 +83,18 @@ def generate_tenses_from_tags(tags: list[str], verb: str) -> list[str]:
 def generate_tense_from_tag(tag: str, verb: str) -> tuple[bool, str | None]:
     __pattern_stopiteration_workaround()
 
-    new_verb = __map_to_tense(verb, tag)
+    with span("conjugate"):
+        new_verb = __map_to_tense(verb, tag)
     is_equal = verb == new_verb
 
     return (is_equal, new_verb)
 
 
 def __map_to_tense(verb: str, tag: str) -> str | None:
+    from pattern.text.en import conjugate, lemma
+
     lem = lemma(verb)
-    complete_verb = conjugate(lem, **tag_to_verb_map[tag])
+    complete_verb = conjugate(lem, **_tag_to_verb_map()[tag])
 
     if complete_verb: 
         return complete_verb
@@ -95,6 +103,8 @@ def __map_to_tense(verb: str, tag: str) -> str | None:
 
 
 def __pattern_stopiteration_workaround():
+    from pattern.text.en import lexeme
+
     try:
         lexeme('gave')
     except:
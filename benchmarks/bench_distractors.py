@@ -0,0 +1,72 @@
+"""
+Compares exhaustive and IVF distractor lookups on synthetic clustered vectors shaped
+like a verbs-only word2vec vocabulary, or on a real file built with
+`python -m app.service.quiz_generator.distractors --index`.
+
+Usage:
+    python -m benchmarks.bench_distractors                         # synthetic vectors
+    python -m benchmarks.bench_distractors --vectors data/verbs.kv  # real vectors and indexes
+"""
+import argparse
+import tempfile
+from pathlib import Path
+
+import numpy as np
+from gensim.models import KeyedVectors
+
+from app.service.quiz_generator.distractors import (
+    DISTRACTOR_TAGS, EmbeddingDistractorEngine, build_indexes, build_verb_vectors,
+)
+from benchmarks.harness import print_results, run_benchmark
+
+
+def build_synthetic(path: str, words: int, dim: int, clusters: int, recall_target: float) -> None:
+    rng = np.random.default_rng(0)
+    centers = rng.normal(size=(clusters, dim))
+    points = centers[rng.integers(0, clusters, words)] + rng.normal(scale=1.0, size=(words, dim))
+    # Letters only, so every key passes the vocabulary filter.
+    keys = ["".join(chr(97 + int(d)) for d in f"{i:06d}") for i in range(words)]
+    source = KeyedVectors(vector_size=dim)
+    source.add_vectors(keys, points.astype(np.float32))
+
+    verbs = build_verb_vectors(source, path, max_words=words, tag_word=lambda w: DISTRACTOR_TAGS[ord(w[-1]) % 6])
+    build_indexes(verbs, path, recall_target)
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--vectors", help="Verb vectors built with --index, synthetic ones by default")
+    parser.add_argument("--words", type=int, default=30000)
+    parser.add_argument("--dim", type=int, default=300)
+    parser.add_argument("--recall-target", type=float, default=0.95)
+    parser.add_argument("--batch", type=int, default=10, help="Blanks per batched lookup, like one session")
+    args = parser.parse_args()
+
+    with tempfile.TemporaryDirectory() as tmp:
+        path = args.vectors
+        if path is None:
+            path = str(Path(tmp) / "verbs.kv")
+            build_synthetic(path, args.words, args.dim, clusters=args.words // 50, recall_target=args.recall_target)
+
+        indexed = EmbeddingDistractorEngine.load(path)
+        exhaustive = EmbeddingDistractorEngine.load(path, indexes={})
+        for tag, index in sorted(indexed.indexes.items()):
+            print(f"{tag:>4}: {len(index)} vectors, {len(index.centroids)} lists, nprobe={index.nprobe}, recall={index.recall:.3f}")
+
+        rng = np.random.default_rng(1)
+        tags = np.asarray(indexed.vectors.expandos["tag"])
+        rows = rng.choice(len(tags), 200, replace=False)
+        targets = [(indexed.vectors.index_to_key[r], str(tags[r])) for r in rows]
+        batches = [targets[i:i + args.batch] for i in range(0, len(targets), args.batch)]
+
+        results = [
+            run_benchmark("exhaustive single", lambda t: exhaustive.distractors(*t, 3), targets),
+            run_benchmark("ivf single", lambda t: indexed.distractors(*t, 3), targets),
+            run_benchmark(f"exhaustive batch of {args.batch}", lambda b: exhaustive.distractors_many(b, 3), batches),
+            run_benchmark(f"ivf batch of {args.batch}", lambda b: indexed.distractors_many(b, 3), batches),
+        ]
+        print_results(results)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,45 @@
+"""
+Compares app.utils.text_utils.split_into_sentences with nltk's punkt sent_tokenize
+on the benchmark corpus: throughput, and how many sentences both agree on.
+
+Usage:
+    python -m benchmarks.bench_sentence_splitter [--copies 50]
+"""
+import argparse
+import timeit
+
+from nltk.tokenize import sent_tokenize
+
+from app.utils.text_utils import sentence_spans, split_into_sentences
+from benchmarks.harness import load_corpus
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--copies", type=int, default=50, help="Times the corpus is repeated into one text")
+    parser.add_argument("--repeat", type=int, default=5)
+    args = parser.parse_args()
+
+    paragraphs = load_corpus()
+    text = "\n\n".join(paragraphs * args.copies)
+
+    ours = set(s for p in paragraphs for s in split_into_sentences(p))
+    punkt = set(s for p in paragraphs for s in sent_tokenize(p))
+    print(f"sentences: ours={len(ours)} punkt={len(punkt)} identical={len(ours & punkt)}")
+    for s in sorted(ours ^ punkt):
+        print(f"  {'ours ' if s in ours else 'punkt'} | {s}")
+
+    timings = {}
+    for name, func in (
+        ("sentence_spans", sentence_spans),
+        ("split_into_sentences", split_into_sentences),
+        ("punkt sent_tokenize", sent_tokenize),
+    ):
+        timings[name] = min(timeit.repeat(lambda: func(text), number=1, repeat=args.repeat))
+        print(f"{name:>22}: {len(text) / timings[name] / 1e6:8.2f} MB/s")
+
+    print(f"speedup over punkt: {timings['punkt sent_tokenize'] / timings['split_into_sentences']:.1f}x")
+
+
+if __name__ == "__main__":
+    main()
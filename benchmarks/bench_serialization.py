@@ -0,0 +1,90 @@
+"""
+Microbenchmark of quiz response serialization.
+
+Compares the DTO path the quiz routes used to take (quiz_to_dto -> GenerateFromTextResponse
+-> response_model validation -> JSON) with QuizListResponse, which encodes the domain
+quizzes straight to JSON bytes.
+
+Usage:
+    python -m benchmarks.bench_serialization [--quizzes 20] [--number 2000]
+"""
+import argparse
+import json
+import timeit
+
+from pydantic import TypeAdapter
+
+from app.api.responses import QuizListResponse
+from app.api.routers.quizzes import GenerateFromTextResponse
+from app.domain.answer import ContextAnswer, SequenceAnswer, SimpleAnswer
+from app.domain.quiz import ContextQuiz, SequenceQuiz, SingleAnswerQuiz
+from app.models.mappings import quiz_to_dto
+
+
+def make_quizzes(n: int) -> list:
+    quizzes = []
+    for i in range(n):
+        if i % 3 == 0:
+            quizzes.append(SingleAnswerQuiz(
+                text=f"Alice _ beginning to get very tired of sitting by her sister {i} .",
+                answers=[SimpleAnswer(text=t, is_correct=t == "was") for t in ("was", "is", "be", "been")],
+            ))
+        elif i % 3 == 1:
+            quizzes.append(SequenceQuiz(
+                text=f"Once or twice she _ _ _ into the book {i} .",
+                answers=[SequenceAnswer(text=t, correct_position=p) for p, t in enumerate(("had", "peeped", "into"))],
+            ))
+        else:
+            quizzes.append(ContextQuiz(
+                text=f"She _ into the book her sister was reading {i}.",
+                explanation="Past perfect describes an action before another past action.",
+                identified_grammar="Past perfect",
+                answers=[
+                    ContextAnswer(text=t, is_correct=t == "had peeped", reasoning=f"Reasoning for {t}.")
+                    for t in ("had peeped", "has peeped", "peeps", "was peeping")
+                ],
+            ))
+    return quizzes
+
+
+response_adapter = TypeAdapter(GenerateFromTextResponse)
+
+
+def dto_path(quizzes: list) -> bytes:
+    # What the routes did: build DTOs and the response model, then FastAPI validates
+    # the returned object against response_model again and JSON encodes its dump.
+    response = GenerateFromTextResponse(quizzes=[quiz_to_dto(q) for q in quizzes])
+    validated = response_adapter.validate_python(response, from_attributes=True)
+    return json.dumps(
+        validated.model_dump(mode="json"),
+        ensure_ascii=False,
+        allow_nan=False,
+        separators=(",", ":"),
+    ).encode("utf-8")
+
+
+def fast_path(quizzes: list) -> bytes:
+    return QuizListResponse(quizzes).body
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--quizzes", type=int, default=20, help="Quizzes per response")
+    parser.add_argument("--number", type=int, default=2000, help="Responses per timing run")
+    parser.add_argument("--repeat", type=int, default=5, help="Timing runs, the best one is reported")
+    args = parser.parse_args()
+
+    quizzes = make_quizzes(args.quizzes)
+    assert json.loads(dto_path(quizzes)) == json.loads(fast_path(quizzes)), "Serialization paths disagree"
+
+    results = {}
+    for name, func in (("dto", dto_path), ("fast", fast_path)):
+        best = min(timeit.repeat(lambda: func(quizzes), number=args.number, repeat=args.repeat))
+        results[name] = best / args.number * 1e6
+        print(f"{name:>5}: {results[name]:9.1f} us/response ({args.quizzes} quizzes)")
+
+    print(f"speedup: {results['dto'] / results['fast']:.1f}x")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,93 @@
+"""
+Cold start: what `import app.main` costs, and how long a fresh server takes to answer.
+
+    import      `python -X importtime -c "import app.main"`: total time, the slowest
+                top-level imports, and which heavy libraries were loaded at import
+    first 200   time from starting uvicorn until GET / returns 200, median of --runs
+
+Heavy libraries (nltk, openai, pattern, boto3, gensim, bs4) are meant to load on first
+use, not at import; tests/test_startup.py checks that. No request touches the database.
+
+Usage:
+    python -m benchmarks.bench_startup
+    python -m benchmarks.bench_startup --runs 5 --max-first-200-ms 1500
+"""
+import argparse
+import statistics
+import subprocess
+import sys
+import time
+import urllib.request
+from pathlib import Path
+
+ROOT = Path(__file__).parent.parent
+
+HEAVY_MODULES = ("nltk", "scipy", "openai", "pattern", "boto3", "botocore", "gensim", "bs4")
+
+
+def import_profile() -> tuple[float, dict[str, float], list[str]]:
+    """Seconds to import app.main, cumulative seconds per module, heavy modules loaded."""
+    script = (
+        "import sys, app.main\n"
+        f"print(','.join(m for m in {HEAVY_MODULES!r} if m in sys.modules))"
+    )
+    result = subprocess.run(
+        [sys.executable, "-X", "importtime", "-c", script],
+        cwd=ROOT, capture_output=True, text=True, check=True,
+    )
+    cumulative = {}
+    for line in result.stderr.splitlines():
+        if not line.startswith("import time:") or "|" not in line:
+            continue
+        _, cumulative_us, name = line[len("import time:"):].split("|")
+        if cumulative_us.strip().isdigit():
+            cumulative[name.strip()] = int(cumulative_us) / 1e6
+    loaded = [m for m in result.stdout.strip().split(",") if m]
+    return cumulative.get("app.main", 0.0), cumulative, loaded
+
+
+def time_to_first_200(port: int, timeout: float) -> float:
+    started = time.perf_counter()
+    server = subprocess.Popen(
+        [sys.executable, "-m", "uvicorn", "app.main:app", "--port", str(port), "--log-level", "warning"],
+        cwd=ROOT, stdout=subprocess.DEVNULL, stderr=subprocess.DEVNULL,
+    )
+    try:
+        while time.perf_counter() - started < timeout:
+            try:
+                with urllib.request.urlopen(f"http://127.0.0.1:{port}/", timeout=1) as response:
+                    if response.status == 200:
+                        return time.perf_counter() - started
+            except OSError:
+                time.sleep(0.01)
+        raise TimeoutError(f"No 200 from the server after {timeout:.0f}s")
+    finally:
+        server.terminate()
+        server.wait(timeout=10)
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--runs", type=int, default=3)
+    parser.add_argument("--port", type=int, default=8020)
+    parser.add_argument("--top", type=int, default=15, help="Slowest imports to list")
+    parser.add_argument("--timeout", type=float, default=60)
+    parser.add_argument("--max-first-200-ms", type=float, default=None,
+                        help="Exit with an error when the median time to the first 200 is above this")
+    args = parser.parse_args()
+
+    total, cumulative, loaded = import_profile()
+    print(f"import app.main: {total * 1000:.0f} ms")
+    for name, seconds in sorted(cumulative.items(), key=lambda item: -item[1])[1:args.top + 1]:
+        print(f"  {seconds * 1000:8.1f} ms  {name}")
+    print(f"heavy modules loaded at import: {', '.join(loaded) or 'none'}")
+
+    first_200 = statistics.median(time_to_first_200(args.port, args.timeout) for _ in range(args.runs))
+    print(f"first 200: {first_200 * 1000:.0f} ms (median of {args.runs})")
+
+    if args.max_first_200_ms is not None and first_200 * 1000 > args.max_first_200_ms:
+        sys.exit(f"First 200 took {first_200 * 1000:.0f} ms, budget is {args.max_first_200_ms:.0f} ms")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,106 @@
+"""
+Benchmarks the quiz generation strategies over a fixed public-domain corpus
+(the opening of "Alice's Adventures in Wonderland").
+
+Reports throughput, p50/p99 latency and peak traced memory per benchmark and
+compares them with a stored baseline. Exits with status 1 when throughput drops, or
+latency or memory grows, by more than --tolerance against the baseline, so it can
+gate CI. With --ci a missing baseline is an error too.
+
+Usage:
+    python -m benchmarks.bench_strategies                   # compare with baseline
+    python -m benchmarks.bench_strategies --save-baseline   # record a new baseline
+    python -m benchmarks.bench_strategies --only simple     # run matching benchmarks
+    python -m benchmarks.bench_strategies --ci              # fail if the baseline is missing
+
+Baselines are machine specific: record one on the machine that runs the comparison,
+and run CI with --ci so a missing baseline fails instead of passing silently.
+"""
+import argparse
+import sys
+from pathlib import Path
+
+from app.models.mappings import quiz_to_dto
+from app.service.quiz_generator.generator_llm import SimpleQuizStrategyLLM
+from app.service.quiz_generator.generator_strategy import SequenceQuizStrategy, SimpleQuizStrategy
+from app.service.quiz_generator.strategies import ContextQuizStrategyLLM
+from app.service.quiz_generator.tokenizer import EnglishTokenizer, FastEnglishTokenizer
+from app.utils.text_utils import split_into_sentences
+from benchmarks.harness import find_regressions, load_baseline, load_corpus, print_results, run_benchmark, save_baseline
+from benchmarks.stubs import StubLLMClient
+
+DEFAULT_BASELINE = Path(__file__).parent / "baseline.json"
+
+QUIZ_LIMIT = 5
+ANSWER_LIMIT = 4
+
+
+def build_benchmarks(paragraphs: list[str]) -> dict:
+    """Returns {name: (func, inputs)}. Each func takes one paragraph (or batch) of the corpus."""
+    nltk_tokenizer = EnglishTokenizer()
+    tokenizer = FastEnglishTokenizer()
+    simple = SimpleQuizStrategy(tokenizer=tokenizer)
+    sequence = SequenceQuizStrategy(tokenizer=tokenizer)
+    # What /sequence/from-text ran before FastEnglishTokenizer, for comparison.
+    sequence_nltk = SequenceQuizStrategy(tokenizer=nltk_tokenizer)
+    simple_llm = SimpleQuizStrategyLLM(client=StubLLMClient())
+    simple_llm_unbatched = SimpleQuizStrategyLLM(client=StubLLMClient(), batch_size=1)
+    context_llm = ContextQuizStrategyLLM(target_language="en", native_language="uk", client=StubLLMClient())
+
+    generated = [q for p in paragraphs for q in simple.generate_many(p, QUIZ_LIMIT, ANSWER_LIMIT)]
+    generated += [q for p in paragraphs for q in sequence.generate_many(p, QUIZ_LIMIT, ANSWER_LIMIT)]
+
+    return {
+        "split_into_sentences": (split_into_sentences, paragraphs),
+        "tokenize[nltk]": (nltk_tokenizer.tokenize, paragraphs),
+        "tokenize[fast]": (tokenizer.tokenize, paragraphs),
+        "simple.generate_many": (lambda p: simple.generate_many(p, QUIZ_LIMIT, ANSWER_LIMIT), paragraphs),
+        "sequence.generate_many": (lambda p: sequence.generate_many(p, QUIZ_LIMIT, ANSWER_LIMIT), paragraphs),
+        "sequence.generate_many[nltk tokenizer]": (
+            lambda p: sequence_nltk.generate_many(p, QUIZ_LIMIT, ANSWER_LIMIT), paragraphs
+        ),
+        "simple_llm.generate_many[stub]": (lambda p: simple_llm.generate_many(p, QUIZ_LIMIT, ANSWER_LIMIT), paragraphs),
+        "simple_llm.generate_many[stub, unbatched]": (
+            lambda p: simple_llm_unbatched.generate_many(p, QUIZ_LIMIT, ANSWER_LIMIT), paragraphs
+        ),
+        "context_llm.generate_many[stub]": (lambda p: context_llm.generate_many(p, 2, ANSWER_LIMIT), paragraphs),
+        "quiz_to_dto": (lambda quizzes: [quiz_to_dto(q) for q in quizzes], [generated]),
+    }
+
+
+def main() -> int:
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--baseline", type=Path, default=DEFAULT_BASELINE)
+    parser.add_argument("--save-baseline", action="store_true", help="Write the results as the new baseline")
+    parser.add_argument("--tolerance", type=float, default=0.25, help="Allowed slowdown as a fraction, default 0.25")
+    parser.add_argument("--rounds", type=int, default=5, help="Passes over the corpus per benchmark")
+    parser.add_argument("--only", default="", help="Only run benchmarks whose name contains this string")
+    parser.add_argument("--ci", action="store_true", help="Exit with status 1 when there is no baseline to compare with")
+    args = parser.parse_args()
+
+    benchmarks = build_benchmarks(load_corpus())
+    results = [
+        run_benchmark(name, func, inputs, rounds=args.rounds)
+        for name, (func, inputs) in benchmarks.items()
+        if args.only in name
+    ]
+    print_results(results)
+
+    if args.save_baseline:
+        save_baseline(args.baseline, results)
+        print(f"Baseline written to {args.baseline}")
+        return 0
+
+    baseline = load_baseline(args.baseline)
+    if not baseline:
+        print(f"No baseline at {args.baseline}, run with --save-baseline to record one.", file=sys.stderr)
+        return 1 if args.ci else 0
+
+    regressions = find_regressions(results, baseline, args.tolerance)
+    for line in regressions:
+        print(f"REGRESSION {line}", file=sys.stderr)
+    return 1 if regressions else 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,109 @@
+"""
+Memory per gunicorn worker, with and without preloading (see gunicorn.conf.py).
+
+Starts gunicorn with `--workers N` in each mode, waits until every worker has warmed
+up and its memory has settled, then reads /proc/<pid>/smaps_rollup (Linux only):
+
+    pss      the process's share of its pages, shared pages split between the processes
+    private  pages only this process uses, what one more worker costs
+
+No request is sent that touches the database.
+
+Usage:
+    python -m benchmarks.bench_worker_memory --workers 8
+    python -m benchmarks.bench_worker_memory --workers 8 --modes preload
+"""
+import argparse
+import os
+import signal
+import subprocess
+import sys
+import time
+import urllib.request
+from pathlib import Path
+
+ROOT = Path(__file__).parent.parent
+
+
+def memory_kb(pid: int) -> dict[str, int]:
+    fields = {}
+    with open(f"/proc/{pid}/smaps_rollup", encoding="ascii") as f:
+        for line in f:
+            parts = line.split()
+            if len(parts) == 3 and parts[2] == "kB":
+                fields[parts[0].rstrip(":")] = int(parts[1])
+    return {
+        "rss": fields.get("Rss", 0),
+        "pss": fields.get("Pss", 0),
+        "private": fields.get("Private_Clean", 0) + fields.get("Private_Dirty", 0),
+    }
+
+
+def children(pid: int) -> list[int]:
+    with open(f"/proc/{pid}/task/{pid}/children", encoding="ascii") as f:
+        return [int(child) for child in f.read().split()]
+
+
+def wait_until_ready(url: str, master: int, workers: int, timeout: float, settle: float) -> list[int]:
+    """Waits for the server to answer and for the workers' total PSS to stop changing."""
+    deadline = time.monotonic() + timeout
+    previous = None
+    while time.monotonic() < deadline:
+        time.sleep(settle)
+        try:
+            urllib.request.urlopen(url, timeout=5).read()
+        except OSError:
+            continue
+        pids = children(master)
+        if len(pids) < workers:
+            continue
+        total = sum(memory_kb(pid)["pss"] for pid in pids)
+        if previous is not None and abs(total - previous) <= 0.01 * previous:
+            return pids
+        previous = total
+    raise TimeoutError(f"Workers not ready after {timeout:.0f}s")
+
+
+def measure(preload: bool, workers: int, port: int, timeout: float, settle: float) -> dict:
+    env = {**os.environ, "GUNICORN_PRELOAD": "true" if preload else "false", "WEB_CONCURRENCY": str(workers)}
+    server = subprocess.Popen(
+        [sys.executable, "-m", "gunicorn", "-c", "gunicorn.conf.py", "app.main:app", "--bind", f"127.0.0.1:{port}"],
+        cwd=ROOT, env=env, stdout=subprocess.DEVNULL, stderr=subprocess.DEVNULL,
+    )
+    try:
+        pids = wait_until_ready(f"http://127.0.0.1:{port}/", server.pid, workers, timeout, settle)
+        master = memory_kb(server.pid)
+        per_worker = [memory_kb(pid) for pid in pids]
+    finally:
+        server.send_signal(signal.SIGTERM)
+        server.wait(timeout=30)
+
+    return {
+        "mode": "preload" if preload else "no preload",
+        "master_pss": master["pss"],
+        "worker_pss": sum(w["pss"] for w in per_worker) / len(per_worker),
+        "worker_private": sum(w["private"] for w in per_worker) / len(per_worker),
+        "worker_rss": sum(w["rss"] for w in per_worker) / len(per_worker),
+        "total_pss": master["pss"] + sum(w["pss"] for w in per_worker),
+    }
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--workers", type=int, default=8)
+    parser.add_argument("--port", type=int, default=8010)
+    parser.add_argument("--modes", nargs="+", choices=["preload", "no-preload"], default=["no-preload", "preload"])
+    parser.add_argument("--timeout", type=float, default=180, help="Seconds to wait for the workers to warm up")
+    parser.add_argument("--settle", type=float, default=2, help="Seconds between memory readings while waiting")
+    args = parser.parse_args()
+
+    print(f"{'mode':<12} {'workers':>7} {'master PSS':>11} {'worker PSS':>11} {'worker private':>15} "
+          f"{'worker RSS':>11} {'total PSS':>10}  (MiB)")
+    for mode in args.modes:
+        r = measure(mode == "preload", args.workers, args.port, args.timeout, args.settle)
+        print(f"{r['mode']:<12} {args.workers:>7} {r['master_pss'] / 1024:>11.1f} {r['worker_pss'] / 1024:>11.1f} "
+              f"{r['worker_private'] / 1024:>15.1f} {r['worker_rss'] / 1024:>11.1f} {r['total_pss'] / 1024:>10.1f}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,48 @@
+"""
+Minimal OpenAI-compatible chat completions server returning canned structured quizzes.
+
+Point the API at it with OPENAI_BASE_URL (read by the openai client):
+    FAKE_LLM_LATENCY_MS=800 uvicorn benchmarks.fake_llm_server:app --port 8001
+    OPENAI_BASE_URL=http://localhost:8001/v1 gunicorn ... app.main:app
+"""
+import asyncio
+import os
+import time
+import uuid
+
+from fastapi import FastAPI, HTTPException, Request
+
+from app.service.llm import models
+from benchmarks.stubs import build_parsed_response, count_prompt_sentences
+
+LATENCY_SECONDS = float(os.getenv("FAKE_LLM_LATENCY_MS", "0")) / 1000
+
+app = FastAPI()
+
+
+@app.post("/v1/chat/completions")
+async def chat_completions(request: Request):
+    body = await request.json()
+    # The client sends the pydantic model name as the json_schema name when using .parse().
+    schema_name = body.get("response_format", {}).get("json_schema", {}).get("name")
+    response_format = getattr(models, schema_name or "", None)
+    if response_format is None:
+        raise HTTPException(status_code=400, detail=f"Unsupported response_format: {schema_name}")
+
+    if LATENCY_SECONDS:
+        await asyncio.sleep(LATENCY_SECONDS)
+
+    prompt = body["messages"][-1]["content"]
+    content = build_parsed_response(response_format, count_prompt_sentences(prompt)).model_dump_json()
+    return {
+        "id": f"chatcmpl-{uuid.uuid4().hex}",
+        "object": "chat.completion",
+        "created": int(time.time()),
+        "model": body.get("model", "fake"),
+        "choices": [{
+            "index": 0,
+            "finish_reason": "stop",
+            "message": {"role": "assistant", "content": content},
+        }],
+        "usage": {"prompt_tokens": 0, "completion_tokens": 0, "total_tokens": 0},
+    }
@@ -0,0 +1,139 @@
+"""
+Timing, memory and baseline helpers shared by the benchmark scripts.
+"""
+import asyncio
+import gc
+import inspect
+import json
+import random
+import time
+import tracemalloc
+from dataclasses import asdict, dataclass
+from pathlib import Path
+from typing import Any, Callable, Iterable
+
+CORPUS_DIR = Path(__file__).parent / "corpus"
+
+
+def load_corpus(name: str = "alice.txt") -> list[str]:
+    """Returns the paragraphs of a corpus file."""
+    text = (CORPUS_DIR / name).read_text(encoding="utf-8")
+    return [p.strip() for p in text.split("\n\n") if p.strip()]
+
+
+@dataclass
+class BenchmarkResult:
+    name: str
+    ops: int
+    throughput: float  # ops per second
+    p50_ms: float
+    p99_ms: float
+    peak_memory_kb: float
+
+
+def percentile(sorted_values: list[float], q: float) -> float:
+    if not sorted_values:
+        return 0.0
+    idx = min(len(sorted_values) - 1, round(q * (len(sorted_values) - 1)))
+    return sorted_values[idx]
+
+
+def run_benchmark(
+    name: str,
+    func: Callable[[Any], Any],
+    inputs: Iterable[Any],
+    rounds: int = 5,
+    warmup: int = 1,
+    seed: int = 0,
+) -> BenchmarkResult:
+    """
+    Calls `func` once per input, `rounds` times over `inputs`. Coroutine functions
+    are awaited on one event loop. Timing and memory are measured in separate passes
+    because tracemalloc slows down allocation-heavy code several times over.
+    """
+    inputs = list(inputs)
+    loop = asyncio.new_event_loop()
+
+    def call(arg):
+        result = func(arg)
+        if inspect.isawaitable(result):
+            result = loop.run_until_complete(result)
+        return result
+
+    try:
+        random.seed(seed)
+        for _ in range(warmup):
+            for arg in inputs:
+                call(arg)
+
+        random.seed(seed)
+        latencies = []
+        gc.collect()
+        started = time.perf_counter()
+        for _ in range(rounds):
+            for arg in inputs:
+                t0 = time.perf_counter()
+                call(arg)
+                latencies.append(time.perf_counter() - t0)
+        elapsed = time.perf_counter() - started
+
+        random.seed(seed)
+        gc.collect()
+        tracemalloc.start()
+        for arg in inputs:
+            call(arg)
+        _, peak = tracemalloc.get_traced_memory()
+        tracemalloc.stop()
+    finally:
+        loop.close()
+
+    latencies.sort()
+    return BenchmarkResult(
+        name=name,
+        ops=len(latencies),
+        throughput=len(latencies) / elapsed if elapsed else 0.0,
+        p50_ms=percentile(latencies, 0.50) * 1000,
+        p99_ms=percentile(latencies, 0.99) * 1000,
+        peak_memory_kb=peak / 1024,
+    )
+
+
+def print_results(results: list[BenchmarkResult]) -> None:
+    print(f"{'benchmark':<32} {'ops':>6} {'ops/s':>10} {'p50 ms':>9} {'p99 ms':>9} {'peak KiB':>10}")
+    for r in results:
+        print(f"{r.name:<32} {r.ops:>6} {r.throughput:>10.1f} {r.p50_ms:>9.3f} {r.p99_ms:>9.3f} {r.peak_memory_kb:>10.1f}")
+
+
+def load_baseline(path: Path) -> dict[str, dict]:
+    if not path.exists():
+        return {}
+    return json.loads(path.read_text(encoding="utf-8"))
+
+
+def save_baseline(path: Path, results: list[BenchmarkResult]) -> None:
+    path.write_text(json.dumps({r.name: asdict(r) for r in results}, indent=2) + "\n", encoding="utf-8")
+
+
+def find_regressions(results: list[BenchmarkResult], baseline: dict[str, dict], tolerance: float) -> list[str]:
+    """
+    Compares throughput, p50, p99 and peak memory against the baseline. Throughput
+    regresses when it is more than `tolerance` (a fraction) below its baseline value,
+    the other metrics when they are more than `tolerance` above it.
+    """
+    regressions = []
+    for r in results:
+        base = baseline.get(r.name)
+        if base is None:
+            continue
+        current, previous = r.throughput, base["throughput"]
+        if previous > 0 and current < previous * (1 - tolerance):
+            regressions.append(
+                f"{r.name}: throughput {current:.1f} vs baseline {previous:.1f} ({(current / previous - 1) * 100:.0f}%)"
+            )
+        for metric in ("p50_ms", "p99_ms", "peak_memory_kb"):
+            current, previous = getattr(r, metric), base[metric]
+            if previous > 0 and current > previous * (1 + tolerance):
+                regressions.append(
+                    f"{r.name}: {metric} {current:.3f} vs baseline {previous:.3f} (+{(current / previous - 1) * 100:.0f}%)"
+                )
+    return regressions
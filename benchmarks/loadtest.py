@@ -0,0 +1,210 @@
+"""
+HTTP load test for the whole API.
+
+Runs against a deployed instance, e.g. the compose stack with a local PostgreSQL and
+the fake LLM server (see benchmarks/fake_llm_server.py). Reports requests per second,
+latency percentiles, a latency histogram and the error rate per route.
+
+Scenario mode registers a user, fetches a token and saves settings, then keeps
+`--concurrency` workers sending a weighted mix of quiz requests for `--duration` seconds:
+    python -m benchmarks.loadtest --base-url http://localhost:8000 --concurrency 32 --duration 60
+
+Replay mode sends recorded requests from a JSON lines file instead, one object per line
+with "method", "path" and optionally "json" and "headers":
+    python -m benchmarks.loadtest --replay traffic.jsonl --concurrency 32
+
+Run it once per gunicorn worker count (WEB_CONCURRENCY) to size workers.
+"""
+import argparse
+import asyncio
+import bisect
+import json
+import random
+import time
+import uuid
+from collections import defaultdict
+from dataclasses import dataclass, field
+from pathlib import Path
+
+import httpx
+
+from benchmarks.harness import load_corpus, percentile
+
+# Upper bounds of the histogram buckets, in milliseconds.
+BUCKETS_MS = [5, 10, 25, 50, 100, 250, 500, 1000, 2500, 5000, 10000, float("inf")]
+
+
+@dataclass
+class RouteStats:
+    latencies: list[float] = field(default_factory=list)
+    errors: int = 0
+    histogram: list[int] = field(default_factory=lambda: [0] * len(BUCKETS_MS))
+
+    def record(self, seconds: float, ok: bool) -> None:
+        self.latencies.append(seconds)
+        self.histogram[bisect.bisect_left(BUCKETS_MS, seconds * 1000)] += 1
+        if not ok:
+            self.errors += 1
+
+
+@dataclass
+class Request:
+    route: str
+    method: str
+    path: str
+    json: dict | None = None
+    headers: dict | None = None
+
+
+def build_scenario(paragraphs: list[str]) -> list[tuple[int, callable]]:
+    """(weight, factory) pairs; each factory returns a fresh Request."""
+    sentences = [s.strip() + "." for p in paragraphs for s in p.split(".") if len(s.strip()) > 20]
+
+    def from_text(route: str, path: str, quiz_type: str):
+        return lambda: Request(route, "POST", path, {
+            "input": random.choice(paragraphs),
+            "limit": 3,
+            "number_of_answers": 4,
+            "type": quiz_type,
+            "language": "en",
+        })
+
+    return [
+        (3, lambda: Request("session", "POST", "/api/quizzes/session/from-text", {
+            "input_sentences": random.sample(sentences, 8),
+            "limit": 6,
+            "number_of_answers": 4,
+        })),
+        (3, from_text("simple", "/api/quizzes/simple/from-text", "simple")),
+        (2, from_text("sequence", "/api/quizzes/sequence/from-text", "sequence")),
+        (1, lambda: Request("context", "POST", "/api/quizzes/context/from-text", {
+            "input": random.choice(sentences),
+            "native_language": "uk",
+            "language": "en",
+            "limit": 1,
+            "number_of_answers": 4,
+        })),
+        (1, lambda: Request("settings", "GET", "/api/settings/")),
+    ]
+
+
+async def authenticate(client: httpx.AsyncClient, stats: dict[str, RouteStats]) -> dict:
+    email = f"loadtest-{uuid.uuid4().hex[:12]}@example.com"
+    password = uuid.uuid4().hex
+
+    started = time.perf_counter()
+    response = await client.post("/api/auth/register", json={
+        "email": email, "password": password, "first_name": "Load", "last_name": "Test",
+    })
+    stats["register"].record(time.perf_counter() - started, response.is_success)
+    response.raise_for_status()
+
+    started = time.perf_counter()
+    response = await client.post("/api/auth/token", data={"username": email, "password": password})
+    stats["token"].record(time.perf_counter() - started, response.is_success)
+    response.raise_for_status()
+    headers = {"Authorization": f"Bearer {response.json()['access_token']}"}
+
+    started = time.perf_counter()
+    response = await client.post("/api/settings/", headers=headers, json={
+        "native_language_code": "uk", "target_language_code": "en",
+    })
+    stats["settings"].record(time.perf_counter() - started, response.is_success)
+    return headers
+
+
+async def send(client: httpx.AsyncClient, request: Request, headers: dict, stats: dict[str, RouteStats]) -> None:
+    started = time.perf_counter()
+    try:
+        response = await client.request(
+            request.method, request.path, json=request.json, headers={**headers, **(request.headers or {})}
+        )
+        ok = response.is_success
+    except httpx.HTTPError:
+        ok = False
+    stats[request.route].record(time.perf_counter() - started, ok)
+
+
+async def run_scenario(client: httpx.AsyncClient, concurrency: int, duration: float, stats: dict[str, RouteStats]) -> None:
+    headers = await authenticate(client, stats)
+    weights, factories = zip(*build_scenario(load_corpus()))
+    deadline = time.perf_counter() + duration
+
+    async def worker():
+        while time.perf_counter() < deadline:
+            factory = random.choices(factories, weights=weights)[0]
+            await send(client, factory(), headers, stats)
+
+    await asyncio.gather(*(worker() for _ in range(concurrency)))
+
+
+def load_replay(path: Path) -> list[Request]:
+    requests = []
+    with path.open(encoding="utf-8") as f:
+        for line in f:
+            if not line.strip():
+                continue
+            entry = json.loads(line)
+            route = entry.get("route") or entry["path"].split("?")[0]
+            requests.append(Request(route, entry.get("method", "GET"), entry["path"], entry.get("json"), entry.get("headers")))
+    return requests
+
+
+async def run_replay(client: httpx.AsyncClient, requests: list[Request], concurrency: int, stats: dict[str, RouteStats]) -> None:
+    # Replays without authenticating first: recorded requests carry their own headers.
+    pending = iter(requests)
+
+    async def worker():
+        for request in pending:
+            await send(client, request, {}, stats)
+
+    await asyncio.gather(*(worker() for _ in range(concurrency)))
+
+
+def print_report(stats: dict[str, RouteStats], elapsed: float) -> None:
+    print(f"{'route':<12} {'count':>7} {'rps':>8} {'err %':>7} {'p50 ms':>9} {'p95 ms':>9} {'p99 ms':>9}")
+    for route, s in sorted(stats.items()):
+        latencies = sorted(s.latencies)
+        print(
+            f"{route:<12} {len(latencies):>7} {len(latencies) / elapsed:>8.1f} "
+            f"{s.errors / max(len(latencies), 1) * 100:>7.2f} "
+            f"{percentile(latencies, 0.50) * 1000:>9.1f} {percentile(latencies, 0.95) * 1000:>9.1f} "
+            f"{percentile(latencies, 0.99) * 1000:>9.1f}"
+        )
+
+    print("\nLatency histogram (count per bucket, upper bound in ms)")
+    labels = [f"<={int(b)}" if b != float("inf") else ">10000" for b in BUCKETS_MS]
+    print(f"{'route':<12} " + " ".join(f"{label:>7}" for label in labels))
+    for route, s in sorted(stats.items()):
+        print(f"{route:<12} " + " ".join(f"{count:>7}" for count in s.histogram))
+
+
+async def main_async(args) -> None:
+    stats: dict[str, RouteStats] = defaultdict(RouteStats)
+    limits = httpx.Limits(max_connections=args.concurrency, max_keepalive_connections=args.concurrency)
+    async with httpx.AsyncClient(base_url=args.base_url, timeout=args.timeout, limits=limits) as client:
+        started = time.perf_counter()
+        if args.replay:
+            await run_replay(client, load_replay(args.replay), args.concurrency, stats)
+        else:
+            await run_scenario(client, args.concurrency, args.duration, stats)
+        elapsed = time.perf_counter() - started
+    print_report(stats, elapsed)
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--base-url", default="http://localhost:8000")
+    parser.add_argument("--concurrency", type=int, default=16)
+    parser.add_argument("--duration", type=float, default=30.0, help="Seconds to run the scenario")
+    parser.add_argument("--timeout", type=float, default=30.0, help="Per-request timeout in seconds")
+    parser.add_argument("--replay", type=Path, help="JSON lines file of recorded requests to replay")
+    parser.add_argument("--seed", type=int, default=0)
+    args = parser.parse_args()
+
+    random.seed(args.seed)
+    asyncio.run(main_async(args))
+
+
+if __name__ == "__main__":
+    main()
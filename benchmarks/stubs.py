@@ -0,0 +1,82 @@
+"""
+Offline stand-ins for the OpenAI client, returning canned structured responses.
+"""
+import asyncio
+import re
+from types import SimpleNamespace
+
+from app.service.llm.models import (
+    BatchSimpleQuizResponse,
+    ContextAnswerResponse,
+    IndexedSimpleQuizResponse,
+    MultipleContextQuizResponse,
+    SimpleAnswerResponse,
+    SingleContextQuizResponse,
+    SingleSimpleQuizResponse,
+)
+
+
+def _simple_quiz() -> SingleSimpleQuizResponse:
+    return SingleSimpleQuizResponse(
+        text="Alice _ beginning to get very tired of sitting by her sister on the bank.",
+        explanation="Past continuous for an action in progress in the past.",
+        answers=[
+            SimpleAnswerResponse(text=text, is_correct=text == "was", reasoning=f"Reasoning for {text}.")
+            for text in ("was", "is", "were", "be")
+        ],
+    )
+
+
+def _context_quiz() -> SingleContextQuizResponse:
+    return SingleContextQuizResponse(
+        identified_grammar="Past perfect",
+        text="Once or twice she _ into the book her sister was reading.",
+        explanation="Past perfect describes an action before another past action.",
+        answers=[
+            ContextAnswerResponse(text=text, is_correct=text == "had peeped", reasoning=f"Reasoning for {text}.")
+            for text in ("had peeped", "has peeped", "peeps", "was peeping")
+        ],
+    )
+
+
+def count_prompt_sentences(prompt: str) -> int:
+    """Number of "[n] sentence" lines in a batched prompt."""
+    return len(re.findall(r"^\[\d+\] ", prompt, flags=re.MULTILINE))
+
+
+def build_parsed_response(response_format: type, sentence_count: int = 1):
+    """
+    Returns a canned instance of one of the structured response models in app.service.llm.models.
+    Batched responses get one quiz per sentence.
+    """
+    if response_format is SingleSimpleQuizResponse:
+        return _simple_quiz()
+    if response_format is BatchSimpleQuizResponse:
+        return BatchSimpleQuizResponse(quizzes=[
+            IndexedSimpleQuizResponse(sentence_index=i, **_simple_quiz().model_dump())
+            for i in range(1, sentence_count + 1)
+        ])
+    if response_format is SingleContextQuizResponse:
+        return _context_quiz()
+    if response_format is MultipleContextQuizResponse:
+        return MultipleContextQuizResponse(quizzes=[_context_quiz(), _context_quiz()])
+    raise ValueError(f"No canned response for {response_format}")
+
+
+class StubLLMClient:
+    """
+    Mimics `client.beta.chat.completions.parse` of `AsyncOpenAI` with a fixed
+    latency, so LLM strategies can be measured without the network.
+    """
+
+    def __init__(self, latency: float = 0.0) -> None:
+        self.latency = latency
+        self.calls = 0
+        self.beta = SimpleNamespace(chat=SimpleNamespace(completions=SimpleNamespace(parse=self.parse)))
+
+    async def parse(self, model: str, messages: list, response_format: type, **kwargs):
+        self.calls += 1
+        if self.latency:
+            await asyncio.sleep(self.latency)
+        parsed = build_parsed_response(response_format, count_prompt_sentences(messages[-1]["content"]))
+        return SimpleNamespace(choices=[SimpleNamespace(message=SimpleNamespace(parsed=parsed))])
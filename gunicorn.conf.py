@@ -0,0 +1,58 @@
+"""
+Production gunicorn profile: `gunicorn -c gunicorn.conf.py app.main:app`.
+
+With `preload_app` the master imports the app and warms up the quiz generation models
+(`app.service.quiz_generator.warmup`) before forking, then moves everything it loaded
+into the permanent GC generation with `gc.freeze()`. Workers share those pages
+copy-on-write: without the freeze, the first garbage collection in each worker would
+write to every object's header and copy the pages anyway.
+
+Measure the effect with `python -m benchmarks.bench_worker_memory`.
+"""
+import gc
+import os
+
+bind = os.getenv("GUNICORN_BIND", "0.0.0.0:80")
+# Also read by gunicorn itself when no config sets it.
+workers = int(os.getenv("WEB_CONCURRENCY", "1"))
+worker_class = "uvicorn.workers.UvicornWorker"
+preload_app = os.getenv("GUNICORN_PRELOAD", "true") == "true"
+timeout = int(os.getenv("GUNICORN_TIMEOUT", "60"))
+# Workers copy shared pages as they write to them; recycling them after this many
+# requests gives the memory back. 0 never recycles.
+max_requests = int(os.getenv("GUNICORN_MAX_REQUESTS", "0"))
+max_requests_jitter = max_requests // 10
+
+
+def when_ready(server):
+    # Runs in the master after the app was preloaded and before any worker is forked.
+    if not preload_app:
+        return
+    from app.service.quiz_generator.warmup import warm_up
+
+    warm_up()
+    gc.collect()
+    gc.freeze()
+    server.log.info(f"Preloaded and froze {gc.get_freeze_count()} objects before forking")
+
+
+def post_worker_init(worker):
+    # Without preloading every worker loads its own models, before its first request.
+    if preload_app:
+        return
+    from app.service.quiz_generator.warmup import warm_up
+
+    warm_up()
+
+
+def post_fork(server, worker):
+    # The log writer thread is restarted in the worker by `logging_config.restart_after_fork`,
+    # registered with os.register_at_fork.
+    from app.db.database import db_secret, engine
+
+    if preload_app:
+        # Pooled connections opened in the master must not be shared by the workers.
+        engine.dispose(close=False)
+    # Fetch the database credentials and start their refresh thread before the worker
+    # takes requests, so the first request doesn't wait for Secrets Manager.
+    db_secret.prefetch()
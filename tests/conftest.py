@@ -8,6 +8,8 @@ from app.main import app
 from app.db.dependencies import get_db
 from app.db.database import Base
 from app.db.models import User as UserModel
+from app.service.rate_limit import config as rate_limit_config
+from app.service.rate_limit.limiter import get_rate_limiter
 
 # 1. In-memory SQLite for fast, isolated tests
 SQLALCHEMY_DATABASE_URL = "sqlite:///:memory:"
@@ -19,6 +21,14 @@ engine = create_engine(
 )
 TestingSessionLocal = sessionmaker(autocommit=False, autoflush=False, bind=engine)
 
+# Fresh in-process rate limits for every test, so tests don't share buckets or need Postgres.
+@pytest.fixture(autouse=True)
+def rate_limiter(monkeypatch):
+    monkeypatch.setattr(rate_limit_config, "RATE_LIMIT_BACKEND", "memory")
+    get_rate_limiter.cache_clear()
+    yield
+    get_rate_limiter.cache_clear()
+
 # 2. Fixture to create a fresh database for every test
 @pytest.fixture(scope="function")
 def db_session():
@@ -0,0 +1,50 @@
+import pytest
+from app.domain.answer import ContextAnswer, SequenceAnswer, SimpleAnswer
+from app.domain.quiz import ContextQuiz, SequenceQuiz, SingleAnswerQuiz
+from app.models.mappings import quiz_to_dict, quiz_to_dto
+
+
+QUIZZES = [
+    SingleAnswerQuiz(
+        text="Alice _ beginning to get very tired .",
+        answers=[
+            SimpleAnswer(text="was", is_correct=True),
+            SimpleAnswer(text="is", is_correct=False),
+            SimpleAnswer(text="be", is_correct=False),
+        ]
+    ),
+    SequenceQuiz(
+        text="Alice _ _ _ to get very tired .",
+        answers=[
+            SequenceAnswer(text="beginning", correct_position=1),
+            SequenceAnswer(text="was", correct_position=0),
+            SequenceAnswer(text="to", correct_position=2),
+        ]
+    ),
+    ContextQuiz(
+        text="She _ into the book.",
+        explanation="Past perfect.",
+        identified_grammar="Past perfect",
+        answers=[
+            ContextAnswer(text="had peeped", is_correct=True, reasoning="Correct"),
+            ContextAnswer(text="has peeped", is_correct=False, reasoning="Distractor"),
+        ]
+    ),
+]
+
+
+@pytest.mark.parametrize("quiz", QUIZZES)
+def test_quiz_to_dict_matches_dto(quiz):
+    assert quiz_to_dict(quiz) == quiz_to_dto(quiz).model_dump()
+    assert list(quiz_to_dict(quiz)) == list(quiz_to_dto(quiz).model_dump())
+
+
+def test_quiz_validity_is_computed_at_construction():
+    quiz = SingleAnswerQuiz(
+        text="Alice _ tired .",
+        answers=[SimpleAnswer(text="was", is_correct=True), SimpleAnswer(text="is", is_correct=True)]
+    )
+
+    assert not quiz.is_valid()
+    assert quiz.get_correct_answers() == []
+    assert isinstance(quiz.answers, tuple)
@@ -0,0 +1,155 @@
+import json
+import random
+import pytest
+from sqlalchemy import event
+from app.db import schemas, text_crud
+from app.db.models import Dataset, TextFeature
+
+
+# --- Fixtures ---
+
+@pytest.fixture
+def dataset_with_texts(db_session):
+    dataset = Dataset(title="alice.txt", source="./source/parsed/alice.txt")
+    db_session.add(dataset)
+    db_session.commit()
+    db_session.refresh(dataset)
+
+    other = Dataset(title="oz.txt", source="./source/parsed/oz.txt")
+    db_session.add(other)
+    db_session.commit()
+    db_session.refresh(other)
+
+    for i in range(5):
+        db_session.add(TextFeature(text=f"Alice sentence number {i}.", dataset_id=dataset.id))
+        db_session.add(TextFeature(text=f"Oz sentence number {i}.", dataset_id=other.id))
+    db_session.commit()
+    return dataset
+
+# --- Tests ---
+
+def test_get_texts_keyset_pagination(client, dataset_with_texts):
+    first_page = client.get("/api/data/text", params={"dataset_id": dataset_with_texts.id, "limit": 2})
+    assert first_page.status_code == 200
+    first = first_page.json()
+    assert [t["text"] for t in first] == ["Alice sentence number 0.", "Alice sentence number 1."]
+
+    next_page = client.get(
+        "/api/data/text",
+        params={"dataset_id": dataset_with_texts.id, "limit": 10, "after_id": first[-1]["id"]}
+    )
+    assert next_page.status_code == 200
+    rest = next_page.json()
+    assert [t["text"] for t in rest] == [f"Alice sentence number {i}." for i in range(2, 5)]
+    assert all(t["dataset_id"] == dataset_with_texts.id for t in rest)
+
+
+def test_get_texts_offset_pagination_still_supported(client, dataset_with_texts):
+    response = client.get("/api/data/text", params={"dataset_id": dataset_with_texts.id, "offset": 3, "limit": 10})
+
+    assert response.status_code == 200
+    assert [t["text"] for t in response.json()] == ["Alice sentence number 3.", "Alice sentence number 4."]
+
+
+def test_get_datasets_keyset_pagination(client, dataset_with_texts):
+    response = client.get("/api/data/dataset", params={"after_id": dataset_with_texts.id})
+
+    assert response.status_code == 200
+    assert [d["title"] for d in response.json()] == ["oz.txt"]
+
+
+def test_get_datasets_returns_entries(client, dataset_with_texts):
+    response = client.get("/api/data/dataset")
+
+    assert response.status_code == 200
+    data = response.json()
+    assert [d["title"] for d in data] == ["alice.txt", "oz.txt"]
+    assert [t["text"] for t in data[0]["entries"]] == [f"Alice sentence number {i}." for i in range(5)]
+
+
+def test_get_datasets_loads_entries_in_one_query(db_session, dataset_with_texts):
+    statements = []
+    engine = db_session.get_bind()
+    listener = lambda conn, cursor, statement, *args: statements.append(statement)
+    db_session.expire_all()
+    event.listen(engine, "before_cursor_execute", listener)
+    try:
+        datasets = list(text_crud.get_datasets(db=db_session, offset=0, limit=10))
+        assert [len(d.entries) for d in datasets] == [5, 5]
+    finally:
+        event.remove(engine, "before_cursor_execute", listener)
+
+    assert len(statements) == 2
+
+
+def test_get_dataset_summaries_returns_entry_counts(client, dataset_with_texts):
+    response = client.get("/api/data/dataset/summaries")
+
+    assert response.status_code == 200
+    data = response.json()
+    assert [(d["title"], d["entry_count"]) for d in data] == [("alice.txt", 5), ("oz.txt", 5)]
+    assert all("entries" not in d for d in data)
+
+
+def test_stream_dataset_entries_as_ndjson(client, dataset_with_texts):
+    response = client.get(f"/api/data/dataset/{dataset_with_texts.id}/entries")
+
+    assert response.status_code == 200
+    assert response.headers["content-type"].startswith("application/x-ndjson")
+    lines = [json.loads(line) for line in response.text.splitlines()]
+    assert [l["text"] for l in lines] == [f"Alice sentence number {i}." for i in range(5)]
+
+
+def test_stream_dataset_entries_not_found(client, dataset_with_texts):
+    response = client.get("/api/data/dataset/999/entries")
+
+    assert response.status_code == 404
+
+
+def test_get_texts_not_modified_until_dataset_changes(client, db_session, dataset_with_texts):
+    params = {"dataset_id": dataset_with_texts.id, "limit": 2}
+    first = client.get("/api/data/text", params=params)
+    etag = first.headers["etag"]
+
+    unchanged = client.get("/api/data/text", params=params, headers={"If-None-Match": etag})
+    assert unchanged.status_code == 304
+    assert unchanged.content == b""
+
+    text_crud.create_text_feature(
+        db_session, schemas.TextFeatureCreate(text="Alice sentence number 5.", dataset_id=dataset_with_texts.id))
+    changed = client.get("/api/data/text", params=params, headers={"If-None-Match": etag})
+    assert changed.status_code == 200
+    assert changed.headers["etag"] != etag
+
+
+def test_dataset_etag_depends_on_page(client, dataset_with_texts):
+    dataset_id = dataset_with_texts.id
+    first = client.get("/api/data/dataset", params={"limit": 1})
+    second = client.get("/api/data/dataset", params={"limit": 1, "after_id": dataset_id})
+
+    assert first.headers["etag"] != second.headers["etag"]
+    assert client.get(
+        "/api/data/dataset", params={"limit": 1}, headers={"If-None-Match": first.headers["etag"]}
+    ).status_code == 304
+
+
+def test_sample_text_features_takes_several_windows(db_session):
+    dataset = Dataset(title="many.txt", source="many.txt")
+    db_session.add(dataset)
+    db_session.flush()
+    db_session.add_all(TextFeature(text=f"Sentence {i}.", dataset_id=dataset.id, random_key=i / 100) for i in range(100))
+    db_session.commit()
+
+    sample = text_crud.sample_text_features(db_session, dataset.id, 12, rng=random.Random(1))
+    keys = sorted(round(f.random_key * 100) for f in sample)
+
+    assert len({f.id for f in sample}) == 12
+    # Not one run of consecutive keys after a single starting point.
+    assert keys[-1] - keys[0] > 12
+
+
+def test_sample_text_features_returns_small_datasets_whole(db_session, dataset_with_texts):
+    sample = text_crud.sample_text_features(db_session, dataset_with_texts.id, 10, rng=random.Random(1))
+
+    assert len(sample) == 5
+    assert {f.dataset_id for f in sample} == {dataset_with_texts.id}
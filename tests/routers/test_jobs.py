@@ -0,0 +1,119 @@
+import pytest
+from app.main import app
+from app.models.auth import User
+from app.service.auth.dependencies import get_current_user_or_api_key
+from app.db.models import Job, User as UserModel
+
+
+@pytest.fixture
+def mock_auth(client, test_user):
+    # A detached copy: the ORM user expires when a request commits.
+    user = User.model_validate(test_user)
+
+    def override():
+        return user
+    app.dependency_overrides[get_current_user_or_api_key] = override
+    yield
+    app.dependency_overrides = {}
+
+
+GENERATE = {"kind": "generate_quizzes", "payload": {"type": "simple_llm", "input": "Alice was tired.", "limit": 50}}
+
+
+def test_create_job_queues_it(client, mock_auth, db_session):
+    response = client.post("/api/jobs/", json=GENERATE)
+
+    assert response.status_code == 202
+    data = response.json()
+    assert data["status"] == "queued"
+    assert data["kind"] == "generate_quizzes"
+    assert data["attempts"] == 0
+    assert db_session.get(Job, data["id"]).payload == GENERATE["payload"]
+
+
+def test_create_job_with_same_idempotency_key_returns_existing(client, mock_auth, db_session):
+    first = client.post("/api/jobs/", json=GENERATE, headers={"Idempotency-Key": "backfill-1"})
+    again = client.post("/api/jobs/", json=GENERATE, headers={"Idempotency-Key": "backfill-1"})
+
+    assert first.status_code == 202
+    assert again.status_code == 200
+    assert again.json()["id"] == first.json()["id"]
+    assert db_session.query(Job).count() == 1
+
+
+def test_create_job_idempotency_key_conflict(client, mock_auth):
+    client.post("/api/jobs/", json=GENERATE, headers={"Idempotency-Key": "backfill-1"})
+    other = {**GENERATE, "payload": {**GENERATE["payload"], "limit": 10}}
+
+    response = client.post("/api/jobs/", json=other, headers={"Idempotency-Key": "backfill-1"})
+
+    assert response.status_code == 409
+
+
+@pytest.mark.parametrize("job", [
+    {"kind": "unknown", "payload": {}},
+    {"kind": "generate_quizzes", "payload": {"limit": 5}},
+    {"kind": "generate_quizzes", "payload": {"type": "voice", "input": "Text.", "limit": 5}},
+])
+def test_create_job_rejects_invalid_jobs(client, mock_auth, job):
+    response = client.post("/api/jobs/", json=job)
+
+    assert response.status_code == 422
+
+
+def test_get_job(client, mock_auth):
+    job_id = client.post("/api/jobs/", json=GENERATE).json()["id"]
+
+    response = client.get(f"/api/jobs/{job_id}")
+
+    assert response.status_code == 200
+    assert response.json()["id"] == job_id
+    assert client.get("/api/jobs/999").status_code == 404
+
+
+def test_list_jobs_by_status(client, mock_auth):
+    client.post("/api/jobs/", json=GENERATE)
+
+    assert len(client.get("/api/jobs/", params={"status": "queued"}).json()) == 1
+    assert client.get("/api/jobs/", params={"status": "failed"}).json() == []
+
+
+def test_data_create_enqueues_ingestion(client, mock_auth):
+    response = client.post("/api/data/create", headers={"Idempotency-Key": "ingest-1"})
+
+    assert response.status_code == 202
+    assert response.json()["kind"] == "ingest_parsed_texts"
+    assert client.post("/api/data/create", headers={"Idempotency-Key": "ingest-1"}).status_code == 200
+
+
+@pytest.fixture
+def switch_user(client, db_session, test_user):
+    """Authenticates as the test user, or as another user after `switch_user()`."""
+    other = UserModel(email="other@example.com", hashed_password="fake_hashed_password", first_name="Other", last_name="User")
+    db_session.add(other)
+    db_session.commit()
+    users = [User.model_validate(test_user), User.model_validate(other)]
+    app.dependency_overrides[get_current_user_or_api_key] = lambda: users[0]
+    yield lambda: users.reverse()
+    app.dependency_overrides = {}
+
+
+def test_jobs_are_only_visible_to_their_user(client, switch_user):
+    job_id = client.post("/api/jobs/", json=GENERATE).json()["id"]
+
+    switch_user()
+
+    assert client.get(f"/api/jobs/{job_id}").status_code == 404
+    assert client.get("/api/jobs/").json() == []
+
+
+def test_idempotency_keys_are_per_user(client, switch_user, db_session):
+    first = client.post("/api/jobs/", json=GENERATE, headers={"Idempotency-Key": "backfill-1"})
+    switch_user()
+    other = {**GENERATE, "payload": {**GENERATE["payload"], "limit": 10}}
+    second = client.post("/api/jobs/", json=other, headers={"Idempotency-Key": "backfill-1"})
+
+    assert first.status_code == 202
+    assert second.status_code == 202
+    assert second.json()["id"] != first.json()["id"]
+    assert db_session.query(Job).count() == 2
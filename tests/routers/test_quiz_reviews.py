@@ -0,0 +1,88 @@
+from datetime import datetime, timedelta, timezone
+
+import pytest
+from app.main import app
+from app.db import review_crud, sentence_bank_crud
+from app.db.models import ReviewItem
+from app.models.auth import User
+from app.service.auth.dependencies import get_current_user_or_api_key
+
+
+@pytest.fixture
+def mock_auth(client, test_user):
+    # Like the real dependency, a pydantic user, which stays usable across requests.
+    user = User.model_validate(test_user)
+
+    def override():
+        return user
+    app.dependency_overrides[get_current_user_or_api_key] = override
+    yield
+    app.dependency_overrides = {}
+
+
+@pytest.fixture
+def bank(db_session, test_user):
+    tagged = [
+        ("She walked to the park.", [["She", "PRP", 1.0], ["walked", "VBD", 0.99], ["to", "TO", 1.0],
+                                     ["the", "DT", 1.0], ["park", "NN", 0.98], [".", ".", 1.0]]),
+        ("They played in the garden.", [["They", "PRP", 1.0], ["played", "VBD", 0.99], ["in", "IN", 1.0],
+                                        ["the", "DT", 1.0], ["garden", "NN", 0.98], [".", ".", 1.0]]),
+    ]
+    sentence_bank_crud.append_user_sentences(
+        db_session, test_user.id,
+        [(text, sentence_bank_crud.sentence_hash(text), pos_tags) for text, pos_tags in tagged],
+        capacity=10,
+    )
+
+
+def quiz(text):
+    return {"type": "simple", "text": text, "answers": [
+        {"text": "went", "is_correct": True}, {"text": "goes", "is_correct": False}, {"text": "gone", "is_correct": False},
+    ]}
+
+
+def test_batch_serves_due_reviews_before_generating(client, mock_auth, db_session, test_user, monkeypatch):
+    now = datetime.now(timezone.utc)
+    review_crud.add_review_items(db_session, test_user.id, [quiz("She ___ home.")], limit=1, now=now - timedelta(days=1))
+    review_crud.add_review_items(db_session, test_user.id, [quiz("He ___ away.")], limit=1, now=now + timedelta(days=1))
+
+    def fail(*args, **kwargs):
+        raise AssertionError("nothing should be generated")
+    monkeypatch.setattr("app.api.routers.quizzes.generate_from_bank", fail)
+
+    response = client.get("/api/quizzes/", params={"simple": 1})
+
+    assert response.status_code == 200
+    quizzes = response.json()["quizzes"]
+    assert [(q["is_new"], q["quiz"]["text"]) for q in quizzes] == [(False, "She ___ home.")]
+
+
+def test_batch_generates_shortfall_from_bank(client, mock_auth, bank, db_session):
+    response = client.get("/api/quizzes/", params={"simple": 2})
+
+    assert response.status_code == 200
+    quizzes = response.json()["quizzes"]
+    assert quizzes and all(q["is_new"] for q in quizzes)
+    assert db_session.query(ReviewItem).count() == len(quizzes)
+
+    # Not answered yet, so the same quizzes are due and nothing new is generated.
+    again = client.get("/api/quizzes/", params={"simple": len(quizzes)}).json()["quizzes"]
+    assert sorted(q["review_id"] for q in again) == sorted(q["review_id"] for q in quizzes)
+    assert not any(q["is_new"] for q in again)
+
+
+def test_answer_schedules_next_review(client, mock_auth, db_session, test_user):
+    item, = review_crud.add_review_items(db_session, test_user.id, [quiz("She ___ home.")], limit=1)
+
+    response = client.post(f"/api/quizzes/reviews/{item.id}", json={"quality": 5})
+
+    assert response.status_code == 200
+    assert response.json()["repetitions"] == 1
+    assert response.json()["interval_days"] == 1.0
+    assert client.get("/api/quizzes/", params={"simple": 1}).json()["quizzes"] == []
+
+
+def test_answer_unknown_review(client, mock_auth):
+    response = client.post("/api/quizzes/reviews/999", json={"quality": 3})
+
+    assert response.status_code == 404
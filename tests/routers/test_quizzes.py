@@ -4,6 +4,7 @@ from app.main import app
 from app.service.auth.dependencies import get_current_user_or_api_key
 from app.domain.quiz import ContextQuiz
 from app.domain.answer import ContextAnswer
+from app.db.models import Dataset, TextFeature
 
 # --- Setup Mock Auth ---
 @pytest.fixture
@@ -60,6 +61,40 @@ def test_local_strategies_contract(client, mock_auth, endpoint, payload_type):
         assert first_quiz["type"] == payload_type
         assert len(first_quiz["answers"]) > 0
 
+def test_seeded_requests_are_reproducible_and_cached(client, mock_auth):
+    from app.api.routers.quizzes import response_cache
+    response_cache.clear()
+    payload = {
+        "input": SAMPLE_TEXT,
+        "limit": 3,
+        "number_of_answers": 4,
+        "type": "sequence",
+        "language": "en",
+        "seed": 7,
+    }
+
+    first = client.post("/api/quizzes/sequence/from-text", json=payload)
+    again = client.post("/api/quizzes/sequence/from-text", json=payload)
+    response_cache.clear()
+    regenerated = client.post("/api/quizzes/sequence/from-text", json=payload)
+
+    assert first.status_code == 200, f"Error: {first.text}"
+    assert (first.headers["x-cache"], again.headers["x-cache"]) == ("miss", "hit")
+    assert again.json() == first.json()
+    assert regenerated.json() == first.json()
+
+
+def test_unseeded_requests_are_not_cached(client, mock_auth):
+    from app.api.routers.quizzes import response_cache
+    response_cache.clear()
+    payload = {"input": SAMPLE_TEXT, "limit": 3, "number_of_answers": 4, "type": "sequence", "language": "en"}
+
+    response = client.post("/api/quizzes/sequence/from-text", json=payload)
+
+    assert response.status_code == 200
+    assert "x-cache" not in response.headers
+    assert len(response_cache) == 0
+
 def test_session_quiz_generation(client, mock_auth):
     """
     Tests the session endpoint which combines simple and sequence quizzes.
@@ -77,6 +112,34 @@ def test_session_quiz_generation(client, mock_auth):
     data = response.json()
     assert 0 <= len(data["quizzes"]) <= LIMIT
 
+def test_session_quiz_generation_from_dataset(client, mock_auth, db_session):
+    """
+    Tests the session endpoint sampling its sentences from a stored dataset.
+    """
+    dataset = Dataset(title="alice.txt", source="./source/parsed/alice.txt")
+    db_session.add(dataset)
+    db_session.commit()
+    for sentence in SAMPLE_SENTENCES:
+        db_session.add(TextFeature(text=sentence, dataset_id=dataset.id, length=len(sentence)))
+    db_session.commit()
+
+    payload = {
+        "dataset_id": dataset.id,
+        "limit": 3,
+        "number_of_answers": 4
+    }
+
+    response = client.post("/api/quizzes/session/from-text", json=payload)
+
+    assert response.status_code == 200
+    assert 0 < len(response.json()["quizzes"]) <= 3
+
+
+def test_session_quiz_requires_one_source(client, mock_auth):
+    response = client.post("/api/quizzes/session/from-text", json={"limit": 3})
+
+    assert response.status_code == 422
+
 # --- Tests for LLM Strategies (Mocked) ---
 
 @patch("app.api.routers.quizzes.ContextQuizStrategyLLM")
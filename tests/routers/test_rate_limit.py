@@ -0,0 +1,46 @@
+import pytest
+from app.main import app
+from app.models.auth import User
+from app.service.auth.dependencies import get_current_user_or_api_key
+from app.service.rate_limit import config
+
+
+@pytest.fixture
+def mock_auth(client, test_user):
+    user = User.model_validate(test_user)
+
+    def override():
+        return user
+    app.dependency_overrides[get_current_user_or_api_key] = override
+    yield
+    app.dependency_overrides = {}
+
+
+def test_rate_limited_with_retry_after(client, mock_auth, monkeypatch):
+    monkeypatch.setattr(config, "RATE_LIMIT_NLP_CAPACITY", 2)
+    monkeypatch.setattr(config, "RATE_LIMIT_NLP_PER_MINUTE", 1)
+    body = {"input": "Alice was tired.", "limit": 1, "number_of_answers": 3, "type": "sequence", "language": "en"}
+
+    statuses = [client.post("/api/quizzes/sequence/from-text", json=body).status_code for _ in range(3)]
+
+    assert statuses == [200, 200, 429]
+    response = client.post("/api/quizzes/sequence/from-text", json=body)
+    assert response.status_code == 429
+    assert 0 < int(response.headers["retry-after"]) <= 60
+
+
+def test_llm_and_nlp_buckets_are_separate(client, mock_auth, monkeypatch):
+    monkeypatch.setattr(config, "RATE_LIMIT_LLM_CAPACITY", 0)
+    body = {"input": "Alice was tired.", "limit": 1, "number_of_answers": 3, "type": "sequence", "language": "en"}
+    context = {"input": "Alice was tired of sitting.", "native_language": "uk", "language": "en"}
+
+    assert client.post("/api/quizzes/context/from-text", json=context).status_code == 429
+    assert client.post("/api/quizzes/sequence/from-text", json=body).status_code == 200
+
+
+def test_api_keys_per_user_are_capped(client, mock_auth, monkeypatch):
+    monkeypatch.setattr("app.api.routers.auth.MAX_API_KEYS_PER_USER", 2)
+
+    statuses = [client.post("/api/auth/key").status_code for _ in range(3)]
+
+    assert statuses == [200, 200, 409]
@@ -0,0 +1,82 @@
+import pytest
+from app.main import app
+from app.api.routers import sentence_bank
+from app.db import sentence_bank_crud
+from app.db.models import UserSentence
+from app.service.auth.dependencies import get_current_user_or_api_key
+
+
+@pytest.fixture
+def mock_auth(client, test_user):
+    def override():
+        return test_user
+    app.dependency_overrides[get_current_user_or_api_key] = override
+    yield
+    app.dependency_overrides = {}
+
+
+@pytest.fixture
+def fake_tagger(monkeypatch):
+    monkeypatch.setattr(sentence_bank, "pos_tag_with_confidence", lambda tokens: [(t, "NN", 1.0) for t in tokens])
+
+
+def test_append_sentences_skips_duplicates(client, mock_auth, fake_tagger, db_session):
+    first = client.post("/api/sentences/", json={"sentences": ["Alice was tired.", "Alice  was tired. ", "She sat down."]})
+    again = client.post("/api/sentences/", json={"sentences": ["She sat down.", "The rabbit ran."]})
+
+    assert first.json() == {"added": 2, "duplicates": 1, "size": 2}
+    assert again.json() == {"added": 1, "duplicates": 1, "size": 3}
+    stored = db_session.query(UserSentence).order_by(UserSentence.id).first()
+    assert stored.text == "Alice was tired."
+    assert stored.pos_tags[0] == ["Alice", "NN", 1.0]
+
+
+def test_append_sentences_does_not_count_blank_entries_as_duplicates(client, mock_auth, fake_tagger):
+    response = client.post("/api/sentences/", json={"sentences": ["", "   ", "Alice was tired.", "Alice was tired."]})
+
+    assert response.json() == {"added": 1, "duplicates": 1, "size": 1}
+
+
+def test_append_sentences_keeps_newest_up_to_bank_size(client, mock_auth, fake_tagger, monkeypatch):
+    monkeypatch.setattr(sentence_bank.config, "USER_SENTENCE_BANK_SIZE", 3)
+
+    client.post("/api/sentences/", json={"sentences": [f"Sentence number {i}." for i in range(5)]})
+    response = client.post("/api/sentences/", json={"sentences": ["The last one."]})
+
+    assert response.json()["size"] == 3
+    texts = [s["text"] for s in client.get("/api/sentences/").json()]
+    assert texts == ["Sentence number 3.", "Sentence number 4.", "The last one."]
+
+
+def test_get_sentences_pages_by_id(client, mock_auth, fake_tagger):
+    client.post("/api/sentences/", json={"sentences": ["One.", "Two.", "Three."]})
+
+    first = client.get("/api/sentences/", params={"limit": 2}).json()
+    rest = client.get("/api/sentences/", params={"limit": 2, "after_id": first[-1]["id"]}).json()
+
+    assert [s["text"] for s in first + rest] == ["One.", "Two.", "Three."]
+
+
+def test_session_from_bank(client, mock_auth, db_session, test_user):
+    tagged = [
+        ("She walked to the park.", [["She", "PRP", 1.0], ["walked", "VBD", 0.99], ["to", "TO", 1.0],
+                                     ["the", "DT", 1.0], ["park", "NN", 0.98], [".", ".", 1.0]]),
+        ("They played in the garden.", [["They", "PRP", 1.0], ["played", "VBD", 0.99], ["in", "IN", 1.0],
+                                        ["the", "DT", 1.0], ["garden", "NN", 0.98], [".", ".", 1.0]]),
+    ]
+    sentence_bank_crud.append_user_sentences(
+        db_session, test_user.id,
+        [(text, sentence_bank_crud.sentence_hash(text), pos_tags) for text, pos_tags in tagged],
+        capacity=10,
+    )
+
+    response = client.post("/api/quizzes/session/from-bank", json={"limit": 2, "seed": 1})
+
+    assert response.status_code == 200
+    assert 0 < len(response.json()["quizzes"]) <= 2
+
+
+def test_session_from_empty_bank(client, mock_auth):
+    response = client.post("/api/quizzes/session/from-bank", json={"limit": 2})
+
+    assert response.status_code == 400
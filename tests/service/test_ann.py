@@ -0,0 +1,51 @@
+import numpy as np
+import pytest
+from app.service.quiz_generator.ann import IVFIndex
+
+
+@pytest.fixture
+def vectors():
+    rng = np.random.default_rng(0)
+    centers = rng.normal(size=(20, 16))
+    points = centers[rng.integers(0, 20, 2000)] + rng.normal(scale=0.3, size=(2000, 16))
+    return (points / np.linalg.norm(points, axis=1, keepdims=True)).astype(np.float32)
+
+
+def test_lists_cover_every_vector_once(vectors):
+    index = IVFIndex.build(vectors, n_lists=30)
+
+    assert index.offsets[-1] == len(vectors)
+    assert sorted(index.ids) == list(range(len(vectors)))
+    assert np.allclose(index.vectors, vectors[index.ids])
+
+
+def test_probing_every_list_is_exact(vectors):
+    index = IVFIndex.build(vectors, n_lists=30)
+    queries = vectors[:5]
+
+    found = index.search(queries, 10, nprobe=30)
+
+    for query, ids in zip(queries, found):
+        assert list(ids) == list(np.argsort(-(vectors @ query))[:10])
+
+
+def test_calibrate_reaches_recall_target(vectors):
+    index = IVFIndex.build(vectors, n_lists=30)
+
+    recall = index.calibrate(0.9)
+
+    assert recall >= 0.9
+    assert 1 <= index.nprobe <= 30
+    assert index.recall == recall
+
+
+def test_save_and_load_memory_mapped(vectors, tmp_path):
+    index = IVFIndex.build(vectors, n_lists=30)
+    index.calibrate(0.9)
+    index.save(str(tmp_path / "VBD"))
+
+    loaded = IVFIndex.load(str(tmp_path / "VBD"))
+
+    assert isinstance(loaded.vectors, np.memmap)
+    assert loaded.nprobe == index.nprobe
+    assert [list(ids) for ids in loaded.search(vectors[:3], 5)] == [list(ids) for ids in index.search(vectors[:3], 5)]
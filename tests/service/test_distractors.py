@@ -0,0 +1,106 @@
+import numpy as np
+import pytest
+from gensim.models import KeyedVectors
+from app.service.quiz_generator.distractors import EmbeddingDistractorEngine, build_indexes, build_verb_vectors
+from app.service.quiz_generator.generator_strategy import SimpleQuizStrategy
+from app.service.quiz_generator.tokenizer import FastEnglishTokenizer
+
+TAGS = {"walked": "VBD", "ran": "VBD", "strolled": "VBD", "went": "VBD", "jumped": "VBN", "apple": "NN"}
+
+
+@pytest.fixture
+def vectors_path(tmp_path):
+    source = KeyedVectors(vector_size=3)
+    source.add_vectors(
+        ["walked", "ran", "strolled", "apple", "Walked", "went", "jumped"],
+        np.array([
+            [1.0, 0.1, 0.0],
+            [0.8, 0.6, 0.0],
+            [1.0, 0.05, 0.0],
+            [0.0, 0.0, 1.0],
+            [1.0, 0.0, 0.0],
+            [0.6, 0.8, 0.1],
+            [0.9, 0.2, 0.0],
+        ], dtype=np.float32),
+    )
+    path = str(tmp_path / "verbs.kv")
+    build_verb_vectors(source, path, tag_word=TAGS.get)
+    return path
+
+
+def test_build_keeps_lowercase_verbs_grouped_by_tag(vectors_path):
+    vectors = KeyedVectors.load(vectors_path, mmap="r")
+
+    assert vectors.index_to_key == ["walked", "ran", "strolled", "went", "jumped"]
+    assert list(vectors.expandos["tag"]) == ["VBD", "VBD", "VBD", "VBD", "VBN"]
+    assert np.allclose(np.linalg.norm(vectors.vectors, axis=1), 1.0)
+    assert isinstance(vectors.vectors, np.memmap)
+
+
+def test_distractors_same_tag_in_similarity_band(vectors_path):
+    engine = EmbeddingDistractorEngine.load(vectors_path, min_similarity=0.3, max_similarity=0.99)
+
+    # "strolled" is too close to count as wrong, "jumped" has another tag.
+    assert engine.distractors("walked", "VBD", 5) == ["ran", "went"]
+    assert engine.distractors("walked", "VBD", 1) == ["ran"]
+
+
+def test_distractors_many_keeps_order_and_capitalization(vectors_path):
+    engine = EmbeddingDistractorEngine.load(vectors_path, min_similarity=0.3, max_similarity=0.99)
+
+    result = engine.distractors_many([("Walked", "VBD"), ("apple", "NN"), ("unknown", "VBD"), ("ran", "VBDN")], 2)
+
+    assert result == [["Ran", "Went"], [], [], []]
+
+
+def test_distractors_with_ivf_index_match_exhaustive_search(vectors_path):
+    vectors = KeyedVectors.load(vectors_path, mmap="r")
+    build_indexes(vectors, vectors_path, recall_target=1.0)
+
+    indexed = EmbeddingDistractorEngine.load(vectors_path, min_similarity=0.3, max_similarity=0.99)
+    exhaustive = EmbeddingDistractorEngine.load(vectors_path, min_similarity=0.3, max_similarity=0.99, indexes={})
+
+    assert sorted(indexed.indexes) == ["VBD", "VBN"]
+    assert indexed.distractors("walked", "VBD", 5) == exhaustive.distractors("walked", "VBD", 5) == ["ran", "went"]
+
+
+def test_build_keeps_verb_phrases(tmp_path):
+    source = KeyedVectors(vector_size=2)
+    source.add_vectors(["looked_up", "looked", "New_York"], np.array([[1, 0], [1, 1], [0, 1]], dtype=np.float32))
+    path = str(tmp_path / "verbs.kv")
+    build_verb_vectors(source, path, tag_word={"looked": "VBD"}.get)
+
+    engine = EmbeddingDistractorEngine.load(path, min_similarity=0.5, max_similarity=0.99)
+
+    assert engine.distractors("looked", "VBD", 2) == ["looked up"]
+
+
+class StubEngine:
+    def __init__(self):
+        self.batches = []
+
+    def distractors_many(self, targets, n):
+        self.batches.append(list(targets))
+        return [["strolled", "wandered", "marched"][:n] for _ in self.batches[-1]]
+
+
+def test_simple_strategy_mixes_in_engine_distractors():
+    strategy = SimpleQuizStrategy(tokenizer=FastEnglishTokenizer(), distractor_engine=StubEngine())
+
+    quiz = strategy.generate_single("Alice walked to the river.", 5)
+
+    wrong = [a.text for a in quiz.answers if not a.is_correct]
+    assert wrong[:2] == ["strolled", "wandered"]
+    assert len(wrong) <= 4
+    assert quiz.is_valid()
+
+
+def test_simple_strategy_looks_up_distractors_for_all_blanks_in_one_batch():
+    engine = StubEngine()
+    strategy = SimpleQuizStrategy(tokenizer=FastEnglishTokenizer(), distractor_engine=engine)
+
+    quizzes = strategy.generate_many("Alice walked to the river. The Rabbit ran past. It was late.", 3, 4)
+
+    assert len(quizzes) == 3
+    assert len(engine.batches) == 1
+    assert len(engine.batches[0]) == 3
@@ -0,0 +1,101 @@
+import asyncio
+from app.domain.answer import SimpleAnswer
+from app.domain.quiz import SingleAnswerQuiz
+from app.service.quiz_generator.generator_hybrid import HybridQuizStrategy, distractor_distinctness, score_quiz
+
+SOURCE = "Good one is here. Weak one is here. Empty one is here."
+
+
+def make_quiz(text: str, answers=("was", "is", "were", "be")) -> SingleAnswerQuiz:
+    return SingleAnswerQuiz(text=text, answers=[SimpleAnswer(text=a, is_correct=i == 0) for i, a in enumerate(answers)])
+
+
+class FakeRuleStrategy:
+    """Confident quiz for "Good" sentences, a low-confidence one for "Weak", none otherwise."""
+
+    def __init__(self):
+        self.batches = []
+
+    def pick_blank(self, source):
+        if source.startswith("Good"):
+            return [], ("rule", source), 0.99
+        if source.startswith("Weak"):
+            return [], ("weak", source), 0.3
+        return None
+
+    def build_scored(self, blanks, answer_limit):
+        self.batches.append(len(blanks))
+        scored = []
+        for blank in blanks:
+            if blank is None:
+                scored.append((None, 0.0))
+            else:
+                _, (kind, source), confidence = blank
+                scored.append((make_quiz(f"{kind}: {source}"), confidence))
+        return scored
+
+
+class FakeLLMStrategy:
+    def __init__(self, delay: float = 0.0, batch_size: int = 5):
+        self.delay = delay
+        self.batch_size = batch_size
+        self.requested = []
+
+    async def generate_for_sentences(self, sentences, answer_limit):
+        self.requested.append(list(sentences))
+        await asyncio.sleep(self.delay)
+        return [make_quiz(f"llm: {s}") for s in sentences]
+
+
+def texts(quizzes):
+    return sorted(q.text.split(":")[0] for q in quizzes)
+
+
+def test_distractor_distinctness():
+    assert distractor_distinctness(make_quiz("_"), 4) == 1.0
+    assert distractor_distinctness(make_quiz("_", ("was", "was", "were")), 4) == 1 / 3
+    assert distractor_distinctness(make_quiz("_", ("was", "Is", "is")), 3) == 0.0
+
+
+def test_score_is_zero_without_a_valid_quiz():
+    assert score_quiz(None, 1.0, 4) == 0.0
+    assert score_quiz(make_quiz("_"), 0.5, 4) == 0.5
+
+
+def test_only_low_quality_sentences_go_to_the_llm():
+    llm = FakeLLMStrategy()
+    strategy = HybridQuizStrategy(FakeRuleStrategy(), llm, min_score=0.6, latency_budget_ms=1000)
+
+    quizzes = asyncio.run(strategy.generate_many(SOURCE, 3, 4))
+
+    assert texts(quizzes) == ["llm", "llm", "rule"]
+    assert sorted(llm.requested[0]) == ["Empty one is here.", "Weak one is here."]
+
+
+def test_no_llm_request_when_rule_based_quizzes_suffice():
+    llm = FakeLLMStrategy()
+    strategy = HybridQuizStrategy(FakeRuleStrategy(), llm, min_score=0.6, latency_budget_ms=1000)
+
+    quizzes = asyncio.run(strategy.generate_many("Good one. Good two. Weak three.", 2, 4))
+
+    assert texts(quizzes) == ["rule", "rule"]
+    assert llm.requested == []
+
+
+def test_rule_based_quizzes_are_built_in_one_batch():
+    rule = FakeRuleStrategy()
+    strategy = HybridQuizStrategy(rule, FakeLLMStrategy(), min_score=0.6, latency_budget_ms=1000)
+
+    asyncio.run(strategy.generate_many(SOURCE + " Good two is here.", 2, 4))
+
+    assert len(rule.batches) == 1
+
+
+def test_returns_what_is_ready_at_the_deadline():
+    llm = FakeLLMStrategy(delay=5)
+    strategy = HybridQuizStrategy(FakeRuleStrategy(), llm, min_score=0.6, latency_budget_ms=50)
+
+    quizzes = asyncio.run(strategy.generate_many(SOURCE, 3, 4))
+
+    # The LLM didn't answer in time, so the weak rule-based quiz fills in.
+    assert texts(quizzes) == ["rule", "weak"]
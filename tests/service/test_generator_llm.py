@@ -0,0 +1,107 @@
+import asyncio
+import re
+from types import SimpleNamespace
+from app.service.llm.models import BatchSimpleQuizResponse, IndexedSimpleQuizResponse, SimpleAnswerResponse
+from app.service.quiz_generator.generator_llm import SimpleQuizStrategyLLM, _split_evenly
+from app.utils.deadline import deadline_scope
+
+
+def quiz_item(index: int, correct: int = 1) -> IndexedSimpleQuizResponse:
+    return IndexedSimpleQuizResponse(
+        sentence_index=index,
+        text=f"Sentence {index} _ here.",
+        explanation="Because.",
+        answers=[
+            SimpleAnswerResponse(text=text, is_correct=i < correct, reasoning="Reasoning.")
+            for i, text in enumerate(["was", "is", "were"])
+        ],
+    )
+
+
+class ScriptedClient:
+    """Answers each request with the next scripted function of the prompt's sentences, or raises it."""
+
+    def __init__(self, *script):
+        self.script = list(script)
+        self.prompts = []
+        self.beta = SimpleNamespace(chat=SimpleNamespace(completions=SimpleNamespace(parse=self.parse)))
+
+    async def parse(self, model, messages, response_format, **kwargs):
+        prompt = messages[-1]["content"]
+        self.prompts.append(re.findall(r"^\[\d+\] (.*)$", prompt, flags=re.MULTILINE))
+        step = self.script.pop(0)
+        if isinstance(step, Exception):
+            raise step
+        parsed = BatchSimpleQuizResponse(quizzes=step(self.prompts[-1]))
+        return SimpleNamespace(choices=[SimpleNamespace(message=SimpleNamespace(parsed=parsed))])
+
+
+SOURCE = "One is here. Two is here. Three is here. Four is here."
+
+
+def all_valid(sentences):
+    return [quiz_item(i) for i in range(1, len(sentences) + 1)]
+
+
+def test_split_evenly():
+    assert _split_evenly(list(range(7)), 3) == [[0, 1], [2, 3], [4, 5, 6]]
+    assert _split_evenly(list(range(4)), 5) == [[0, 1, 2, 3]]
+
+
+def test_packs_sentences_into_one_request():
+    client = ScriptedClient(all_valid)
+    strategy = SimpleQuizStrategyLLM(client=client, batch_size=5)
+
+    quizzes = asyncio.run(strategy.generate_many(SOURCE, 4, 3))
+
+    assert len(client.prompts) == 1
+    assert sorted(client.prompts[0]) == ["Four is here.", "One is here.", "Three is here.", "Two is here."]
+    assert len(quizzes) == 4
+
+
+def test_rerequests_only_missing_and_invalid_items():
+    # Sentence 2 comes back with two correct answers, sentence 4 is missing.
+    first = lambda sentences: [quiz_item(1), quiz_item(2, correct=2), quiz_item(3)]
+    client = ScriptedClient(first, all_valid)
+    strategy = SimpleQuizStrategyLLM(client=client, batch_size=5)
+
+    quizzes = asyncio.run(strategy.generate_many(SOURCE, 4, 3))
+
+    assert len(client.prompts) == 2
+    assert client.prompts[1] == [client.prompts[0][1], client.prompts[0][3]]
+    assert len(quizzes) == 4
+    assert all(q.is_valid() for q in quizzes)
+
+
+def test_failed_request_halves_batch_size():
+    client = ScriptedClient(RuntimeError("timeout"), all_valid, all_valid)
+    strategy = SimpleQuizStrategyLLM(client=client, batch_size=4)
+
+    quizzes = asyncio.run(strategy.generate_many(SOURCE, 4, 3))
+
+    assert [len(p) for p in client.prompts] == [4, 2, 2]
+    assert len(quizzes) == 4
+
+
+def test_deadline_cancels_slow_requests_and_counts_dropped():
+    class SlowClient(ScriptedClient):
+        async def parse(self, model, messages, response_format, **kwargs):
+            self.timeouts.append(kwargs.get("timeout"))
+            if len(self.timeouts) > 1:
+                await asyncio.sleep(5)
+            return await super().parse(model, messages, response_format, **kwargs)
+
+    client = SlowClient(all_valid, all_valid)
+    client.timeouts = []
+    strategy = SimpleQuizStrategyLLM(client=client, batch_size=2)
+
+    async def run():
+        with deadline_scope(0.2) as deadline:
+            quizzes = await strategy.generate_many(SOURCE, 4, 3)
+            return quizzes, deadline.dropped
+
+    quizzes, dropped = asyncio.run(run())
+
+    assert len(quizzes) == 2
+    assert dropped == 2
+    assert all(0 < t <= 0.2 for t in client.timeouts)
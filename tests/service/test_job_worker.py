@@ -0,0 +1,182 @@
+import asyncio
+from datetime import datetime, timedelta, timezone
+
+import pytest
+from sqlalchemy import create_engine
+from sqlalchemy.orm import sessionmaker
+from sqlalchemy.pool import StaticPool
+
+from app.db import job_crud
+from app.db.database import Base
+from app.db.models import Dataset, Job, TextFeature
+from app.service.jobs import handlers
+from app.service.jobs.worker import Worker
+from app.service.text_parser import ingestion
+
+
+@pytest.fixture
+def session_factory():
+    engine = create_engine("sqlite:///:memory:", connect_args={"check_same_thread": False}, poolclass=StaticPool)
+    Base.metadata.create_all(bind=engine)
+    yield sessionmaker(autocommit=False, autoflush=False, expire_on_commit=False, bind=engine)
+    engine.dispose()
+
+
+def echo(db, payload):
+    return {"echo": payload["value"]}
+
+
+async def async_echo(db, payload):
+    await asyncio.sleep(0)
+    return {"echo": payload["value"]}
+
+
+def broken(db, payload):
+    raise RuntimeError("boom")
+
+
+def make_worker(session_factory, **handlers):
+    return Worker(session_factory, handlers=handlers, retry_delay=0, worker_id="test")
+
+
+def test_runs_sync_and_async_handlers(session_factory):
+    with session_factory() as db:
+        job_crud.enqueue_job(db, "echo", {"value": 1})
+        job_crud.enqueue_job(db, "async_echo", {"value": 2})
+    worker = make_worker(session_factory, echo=echo, async_echo=async_echo)
+
+    assert asyncio.run(worker.run_once(["echo"])).kind == "echo"
+    assert asyncio.run(worker.run_once()).kind == "async_echo"
+    assert asyncio.run(worker.run_once()) is None
+
+    with session_factory() as db:
+        jobs = db.query(Job).order_by(Job.id).all()
+        assert [(j.status, j.result, j.attempts) for j in jobs] == [
+            ("succeeded", {"echo": 1}, 1),
+            ("succeeded", {"echo": 2}, 1),
+        ]
+
+
+def test_failed_job_is_retried_then_marked_failed(session_factory):
+    with session_factory() as db:
+        job, _ = job_crud.enqueue_job(db, "broken", {}, max_attempts=2)
+    worker = make_worker(session_factory, broken=broken)
+
+    asyncio.run(worker.run_once())
+    with session_factory() as db:
+        retried = job_crud.get_job(db, job.id)
+        assert (retried.status, retried.attempts) == ("queued", 1)
+        assert retried.error == "RuntimeError: boom"
+
+    asyncio.run(worker.run_once())
+    with session_factory() as db:
+        assert job_crud.get_job(db, job.id).status == "failed"
+    assert asyncio.run(worker.run_once()) is None
+
+
+def test_claim_skips_jobs_not_due_yet(session_factory):
+    with session_factory() as db:
+        job, _ = job_crud.enqueue_job(db, "echo", {"value": 1})
+        job.run_after = datetime.now(timezone.utc) + timedelta(hours=1)
+        db.commit()
+
+        assert job_crud.claim_job(db, ["echo"], "test") is None
+
+
+def test_requeue_stale_jobs(session_factory):
+    with session_factory() as db:
+        stale, _ = job_crud.enqueue_job(db, "echo", {"value": 1})
+        exhausted, _ = job_crud.enqueue_job(db, "echo", {"value": 2}, max_attempts=1)
+        for job in (stale, exhausted):
+            job_crud.claim_job(db, ["echo"], "dead-worker")
+        db.query(Job).update({Job.locked_at: datetime.now(timezone.utc) - timedelta(hours=2)})
+        db.commit()
+
+        assert job_crud.requeue_stale_jobs(db, timedelta(hours=1)) == 1
+        db.expire_all()
+        assert job_crud.get_job(db, stale.id).status == "queued"
+        assert job_crud.get_job(db, exhausted.id).status == "failed"
+
+
+def test_lease_is_renewed_while_the_job_runs(session_factory):
+    with session_factory() as db:
+        job, _ = job_crud.enqueue_job(db, "slow", {})
+
+    async def slow(db, payload):
+        await asyncio.sleep(0.2)
+        return {}
+
+    worker = Worker(session_factory, handlers={"slow": slow}, lease=0.08, worker_id="test")
+
+    async def run():
+        running = asyncio.create_task(worker.run_once())
+        await asyncio.sleep(0.15)
+        with session_factory() as db:
+            # Claimed more than a lease ago, but renewed since.
+            assert job_crud.requeue_stale_jobs(db, timedelta(seconds=0.08)) == 0
+            assert job_crud.get_job(db, job.id).status == "running"
+        return await running
+
+    asyncio.run(run())
+    with session_factory() as db:
+        assert job_crud.get_job(db, job.id).status == "succeeded"
+
+
+def test_renew_lease_only_for_the_worker_holding_the_job(session_factory):
+    with session_factory() as db:
+        job, _ = job_crud.enqueue_job(db, "echo", {"value": 1})
+        job_crud.claim_job(db, ["echo"], "worker-a")
+
+        assert job_crud.renew_lease(db, job.id, "worker-a") is True
+        assert job_crud.renew_lease(db, job.id, "worker-b") is False
+
+
+def test_worker_that_lost_the_lease_does_not_overwrite_the_job(session_factory):
+    with session_factory() as db:
+        job, _ = job_crud.enqueue_job(db, "echo", {"value": 1})
+        claimed = job_crud.claim_job(db, ["echo"], "worker-a")
+        # worker-a's lease expired: the job was requeued and worker-b runs it now.
+        db.query(Job).update({Job.locked_at: datetime.now(timezone.utc) - timedelta(hours=2)})
+        db.commit()
+        job_crud.requeue_stale_jobs(db, timedelta(hours=1))
+        job_crud.claim_job(db, ["echo"], "worker-b")
+
+        assert job_crud.complete_job(db, claimed, {"stale": True}, "worker-a") is None
+        assert job_crud.fail_job(db, claimed, "boom", timedelta(0), "worker-a") is None
+        db.expire_all()
+        current = job_crud.get_job(db, job.id)
+        assert (current.status, current.locked_by, current.result) == ("running", "worker-b", None)
+
+        assert job_crud.complete_job(db, current, {"echo": 1}, "worker-b").status == "succeeded"
+
+
+def test_ingestion_run_again_adds_nothing(session_factory, tmp_path, monkeypatch):
+    monkeypatch.setattr(ingestion, "extract_verb_tags", lambda text, tokenizer: ["VBD"])
+    sentence = "Alice was beginning to get very tired of sitting by her sister on the bank."
+    (tmp_path / "alice.txt").write_text(f"{sentence} {sentence} Too short.")
+
+    with session_factory() as db:
+        first = ingestion.ingest_parsed_texts(db, str(tmp_path))
+        again = ingestion.ingest_parsed_texts(db, str(tmp_path))
+
+        assert first["datasets"]["alice.txt"]["new features"] == 1
+        assert again["datasets"]["alice.txt"]["new features"] == 0
+        assert db.query(TextFeature).count() == 1
+
+
+def test_backfill_verb_tags_tags_only_untagged_entries(session_factory, monkeypatch):
+    monkeypatch.setattr(handlers, "extract_verb_tags", lambda text, tokenizer: ["VBD"])
+    with session_factory() as db:
+        dataset = Dataset(title="alice", source="alice.txt")
+        db.add(dataset)
+        db.flush()
+        db.add_all([
+            TextFeature(text="She went.", dataset_id=dataset.id),
+            TextFeature(text="She goes.", dataset_id=dataset.id, verb_tags=" VBZ "),
+            TextFeature(text="She sat.", dataset_id=dataset.id),
+        ])
+        db.commit()
+
+        assert handlers.backfill_verb_tags_job(db, {"batch_size": 1}) == {"tagged": 2}
+        assert [f.verb_tags for f in db.query(TextFeature).order_by(TextFeature.id)] == [" VBD ", " VBZ ", " VBD "]
+        assert handlers.backfill_verb_tags_job(db, {}) == {"tagged": 0}
@@ -0,0 +1,103 @@
+import threading
+
+import pytest
+from sqlalchemy import create_engine
+from sqlalchemy.orm import sessionmaker
+from sqlalchemy.pool import StaticPool
+
+from app.db.database import Base
+from app.service.rate_limit.limiter import Limit, RateLimiter
+
+
+class FakeClock:
+    def __init__(self, now: float = 1000.0) -> None:
+        self.now = now
+
+    def __call__(self) -> float:
+        return self.now
+
+
+LIMITS = {"llm": Limit.per_minute(capacity=2, per_minute=6)}
+
+
+@pytest.fixture
+def make_limiter():
+    """Builds RateLimiters and stops their sync threads after the test."""
+    limiters = []
+
+    def make(*args, **kwargs) -> RateLimiter:
+        limiter = RateLimiter(*args, **kwargs)
+        limiters.append(limiter)
+        return limiter
+
+    yield make
+    for limiter in limiters:
+        limiter.stop()
+
+
+def test_bucket_empties_and_refills():
+    clock = FakeClock()
+    limiter = RateLimiter(LIMITS, clock=clock)
+
+    assert limiter.acquire("user:1", "llm") == 0
+    assert limiter.acquire("user:1", "llm") == 0
+    assert limiter.acquire("user:1", "llm") == 10.0
+    # Other principals have their own bucket.
+    assert limiter.acquire("user:2", "llm") == 0
+
+    clock.now += 10
+    assert limiter.acquire("user:1", "llm") == 0
+    assert limiter.acquire("user:1", "llm") > 0
+
+
+def test_processes_share_buckets_through_the_database(make_limiter):
+    engine = create_engine("sqlite://", connect_args={"check_same_thread": False}, poolclass=StaticPool)
+    Base.metadata.create_all(bind=engine)
+    session_factory = sessionmaker(bind=engine)
+    clock = FakeClock()
+    first = make_limiter(LIMITS, session_factory=session_factory, sync_interval=1, clock=clock)
+    second = make_limiter(LIMITS, session_factory=session_factory, sync_interval=1, clock=clock)
+
+    assert first.acquire("user:1", "llm") == 0
+    assert first.acquire("user:1", "llm") == 0
+    first.sync()
+    # The second process hasn't seen the consumption yet, until its next sync.
+    assert second.acquire("user:1", "llm") == 0
+    second.sync()
+
+    assert second.acquire("user:1", "llm") > 0
+    first.stop()
+    second.stop()
+    Base.metadata.drop_all(bind=engine)
+
+
+def test_failed_sync_keeps_consumption_for_the_next_one(make_limiter):
+    clock = FakeClock()
+
+    def broken_session():
+        raise ConnectionError("database is down")
+
+    limiter = make_limiter(LIMITS, session_factory=broken_session, sync_interval=1, clock=clock)
+    limiter.acquire("user:1", "llm")
+    limiter.sync()
+
+    assert limiter._buckets[("user:1", "llm")].consumed == 1
+
+
+def test_acquire_never_waits_for_the_database_and_syncs_in_the_background():
+    synced = threading.Event()
+    sessions = []
+
+    def session_factory():
+        sessions.append(threading.current_thread().name)
+        synced.set()
+        raise ConnectionError("database is down")
+
+    limiter = RateLimiter(LIMITS, session_factory=session_factory, sync_interval=0.01)
+    try:
+        limiter.acquire("user:1", "llm")
+        assert synced.wait(timeout=5)
+    finally:
+        limiter.stop()
+
+    assert set(sessions) == {"rate-limit-sync"}
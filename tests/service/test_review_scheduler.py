@@ -0,0 +1,36 @@
+import pytest
+
+from app.service.review.scheduler import MIN_EASE, ReviewState, review
+
+
+def test_intervals_grow_with_correct_answers():
+    state = ReviewState()
+    intervals = []
+    for _ in range(4):
+        state = review(state, 4)
+        intervals.append(state.interval_days)
+
+    assert intervals == [1.0, 6.0, 15.0, 38.0]
+    assert state.repetitions == 4
+    assert state.ease == pytest.approx(2.5)
+
+
+def test_wrong_answer_starts_over_and_lowers_ease():
+    state = review(review(review(ReviewState(), 5), 5), 1)
+
+    assert state.repetitions == 0
+    assert state.interval_days == 1.0
+    assert state.ease < 2.7
+
+
+def test_ease_has_a_floor():
+    state = ReviewState()
+    for _ in range(10):
+        state = review(state, 0)
+
+    assert state.ease == MIN_EASE
+
+
+def test_quality_out_of_range():
+    with pytest.raises(ValueError):
+        review(ReviewState(), 6)
@@ -0,0 +1,129 @@
+import json
+import threading
+
+import pytest
+
+from app.db import database
+from app.service.secrets.providers import EnvSecretsProvider, FileSecretsProvider
+from app.service.secrets.refresh import RefreshingSecret
+
+SECRET = {"username": "app", "password": "first", "host": "db", "port": 5432, "dbname": "lexiloop"}
+ROTATED = {**SECRET, "password": "second"}
+
+
+class ScriptedProvider:
+    """Returns the given values in turn, raising the exceptions among them; repeats the last one."""
+
+    def __init__(self, *values) -> None:
+        self.values = list(values)
+        self.calls = 0
+
+    def fetch(self) -> dict:
+        value = self.values[min(self.calls, len(self.values) - 1)]
+        self.calls += 1
+        if isinstance(value, Exception):
+            raise value
+        return value
+
+
+def test_file_provider_reads_the_file_again_on_every_fetch(tmp_path):
+    path = tmp_path / "db.json"
+    path.write_text(json.dumps(SECRET))
+    provider = FileSecretsProvider(str(path))
+    assert provider.fetch() == SECRET
+
+    path.write_text(json.dumps(ROTATED))
+    assert provider.fetch() == ROTATED
+
+
+def test_env_provider_needs_every_variable(monkeypatch):
+    for name, value in (("DB_USER", "app"), ("DB_PASS", "pw"), ("DB_HOST", "db"), ("DB_NAME", "lexiloop")):
+        monkeypatch.setenv(name, value)
+    monkeypatch.delenv("DB_PORT", raising=False)
+    assert EnvSecretsProvider().fetch() == {
+        "username": "app", "password": "pw", "host": "db", "port": 5432, "dbname": "lexiloop",
+    }
+
+    monkeypatch.delenv("DB_PASS")
+    with pytest.raises(ValueError):
+        EnvSecretsProvider().fetch()
+
+
+def test_reads_are_served_from_memory_and_listeners_see_changes():
+    provider = ScriptedProvider(SECRET, SECRET, ROTATED)
+    secret = RefreshingSecret(provider, ttl=0)
+    changes = []
+    secret.on_change(changes.append)
+
+    assert secret.get() == SECRET
+    assert secret.get() == SECRET
+    assert provider.calls == 1
+
+    assert secret.refresh() is False
+    assert secret.refresh() is True
+    assert secret.get() == ROTATED
+    assert changes == [ROTATED]
+
+
+def test_prefetch_fetches_once_and_logs_failures():
+    provider = ScriptedProvider(RuntimeError("throttled"), SECRET)
+    secret = RefreshingSecret(provider, ttl=0)
+
+    secret.prefetch()
+    assert provider.calls == 1
+
+    secret.prefetch()
+    assert secret.get() == SECRET
+    assert provider.calls == 2
+
+
+def test_background_refresh_picks_up_rotation_and_survives_failures():
+    provider = ScriptedProvider(SECRET, RuntimeError("throttled"), ROTATED)
+    secret = RefreshingSecret(provider, ttl=0.01)
+    changed = threading.Event()
+    secret.on_change(lambda value: changed.set())
+
+    assert secret.get() == SECRET
+    try:
+        assert changed.wait(timeout=5)
+    finally:
+        secret.stop()
+    assert secret.get() == ROTATED
+
+
+class FakeDialect:
+
+    class loaded_dbapi:
+        class OperationalError(Exception):
+            pass
+
+    def __init__(self, password: str) -> None:
+        self.password = password
+        self.attempts = []
+
+    def connect(self, *cargs, **cparams):
+        self.attempts.append(cparams["password"])
+        if cparams["password"] != self.password:
+            raise self.loaded_dbapi.OperationalError("password authentication failed")
+        return object()
+
+
+def test_connect_retries_once_with_rotated_credentials(monkeypatch):
+    secret = RefreshingSecret(ScriptedProvider(SECRET, ROTATED), ttl=0)
+    recycled = []
+    secret.on_change(recycled.append)
+    monkeypatch.setattr(database, "db_secret", secret)
+    dialect = FakeDialect(password="second")
+
+    assert database._connect(dialect, None, [""], {}) is not None
+    assert dialect.attempts == ["first", "second"]
+    assert recycled == [ROTATED]
+
+
+def test_connect_does_not_retry_when_credentials_are_unchanged(monkeypatch):
+    monkeypatch.setattr(database, "db_secret", RefreshingSecret(ScriptedProvider(SECRET), ttl=0))
+    dialect = FakeDialect(password="other")
+
+    with pytest.raises(FakeDialect.loaded_dbapi.OperationalError):
+        database._connect(dialect, None, [""], {})
+    assert dialect.attempts == ["first"]
@@ -0,0 +1,46 @@
+import nltk
+import pytest
+from nltk.tokenize import NLTKWordTokenizer
+from app.service.quiz_generator.tokenizer import FastEnglishTokenizer
+from benchmarks.harness import load_corpus
+
+
+@pytest.mark.parametrize("paragraph", load_corpus())
+def test_matches_word_tokenize_on_corpus(paragraph):
+    assert FastEnglishTokenizer().tokenize(paragraph) == nltk.word_tokenize(paragraph)
+
+
+@pytest.mark.parametrize("sentence", [
+    "Alice was beginning to get very tired",
+    "I can't, I won't, and I didn't, said the waistcoat-pocket.",
+    '"Well!" thought Alice to herself, "after such a fall as this."',
+    "(Which was very likely true.)",
+    "Down -- down -- down; would the fall never come to an end?",
+    "It's THEIR book, they'll say: we're sure I'm right!",
+    "I cannot say, I'm gonna guess.",
+    "Please, Ma'am, is this New Zealand?",
+    "It cost 3,000 dollars, i.e. a lot...",
+    "He said ''no'' and left",
+    "The dogs' bowls were empty.",
+    "Curly “quotes” and it’s apostrophes.",
+    '""Twice quoted""',
+])
+def test_matches_treebank_per_sentence(sentence):
+    assert FastEnglishTokenizer().tokenize(sentence) == NLTKWordTokenizer().tokenize(sentence)
+
+
+def test_tokenizes_each_sentence_separately():
+    tokens = FastEnglishTokenizer().tokenize("She sat by the bank. It was hot.")
+
+    assert tokens == ["She", "sat", "by", "the", "bank", ".", "It", "was", "hot", "."]
+
+
+@pytest.mark.parametrize("text, last_word", [
+    ("The answer was no. She left.", "no"),
+    ("He was in Mar. The rest followed.", "Mar"),
+    ("It cost 5 dollars, est. The end came.", "est"),
+])
+def test_sentence_final_period_is_split_off_ordinary_words(text, last_word):
+    tokens = FastEnglishTokenizer().tokenize(text)
+
+    assert tokens[tokens.index(last_word) + 1] == "."
@@ -0,0 +1,19 @@
+import subprocess
+import sys
+from pathlib import Path
+
+# Loaded on first use instead, see benchmarks/bench_startup.py.
+HEAVY_MODULES = ("nltk", "scipy", "openai", "pattern", "boto3", "botocore", "gensim", "bs4")
+
+
+def test_importing_app_does_not_load_heavy_modules():
+    script = (
+        "import sys, app.main\n"
+        f"print(','.join(m for m in {HEAVY_MODULES!r} if m in sys.modules))"
+    )
+    result = subprocess.run(
+        [sys.executable, "-c", script],
+        cwd=Path(__file__).parent.parent, capture_output=True, text=True, check=True,
+    )
+
+    assert result.stdout.strip() == ""
@@ -0,0 +1,94 @@
+import gzip
+
+import pytest
+from starlette.applications import Starlette
+from starlette.responses import Response, StreamingResponse
+from starlette.routing import Route
+from starlette.testclient import TestClient
+
+from app.api import middleware
+from app.api.etags import encoded_etag, etag_matches, make_etag, not_modified
+from app.api.middleware import CompressionMiddleware
+
+BODY = b'{"text": "Alice was beginning to get very tired."}' * 50
+
+
+def make_client():
+    async def json_body(request):
+        response = Response(BODY, media_type="application/json")
+        return not_modified(request, response, '"abc"') or response
+
+    async def small(request):
+        return Response(b'{"ok": true}', media_type="application/json")
+
+    async def image(request):
+        return Response(BODY, media_type="image/png")
+
+    async def stream(request):
+        async def lines():
+            for i in range(3):
+                yield f'{{"line": {i}}}\n'
+        return StreamingResponse(lines(), media_type="application/x-ndjson")
+
+    app = Starlette(routes=[
+        Route("/json", json_body), Route("/small", small), Route("/image", image), Route("/stream", stream),
+    ])
+    app.add_middleware(CompressionMiddleware, minimum_size=100)
+    return TestClient(app)
+
+
+@pytest.fixture(autouse=True)
+def without_brotli(monkeypatch):
+    monkeypatch.setattr(middleware, "brotli", None)
+
+
+def test_compresses_large_json_with_gzip():
+    response = make_client().get("/json", headers={"Accept-Encoding": "gzip"})
+
+    assert response.headers["content-encoding"] == "gzip"
+    assert response.headers["vary"] == "Accept-Encoding"
+    assert response.headers["etag"] == '"abc-gzip"'
+    assert int(response.headers["content-length"]) < len(BODY)
+    assert response.content == BODY
+
+
+@pytest.mark.parametrize("if_none_match, etag", [
+    ('"abc-gzip"', '"abc-gzip"'),
+    ('"abc"', '"abc"'),
+])
+def test_not_modified_keeps_the_etag_the_client_revalidates(if_none_match, etag):
+    response = make_client().get("/json", headers={"Accept-Encoding": "gzip", "If-None-Match": if_none_match})
+
+    assert response.status_code == 304
+    assert response.headers["etag"] == etag
+
+
+@pytest.mark.parametrize("path, accept", [
+    ("/small", "gzip"),
+    ("/image", "gzip"),
+    ("/json", "identity"),
+    ("/json", "gzip;q=0"),
+])
+def test_leaves_response_uncompressed(path, accept):
+    response = make_client().get(path, headers={"Accept-Encoding": accept})
+
+    assert "content-encoding" not in response.headers
+
+
+def test_compresses_streamed_chunks():
+    client = make_client()
+    with client.stream("GET", "/stream", headers={"Accept-Encoding": "gzip"}) as response:
+        raw = b"".join(response.iter_raw())
+
+    assert response.headers["content-encoding"] == "gzip"
+    assert gzip.decompress(raw) == b'{"line": 0}\n{"line": 1}\n{"line": 2}\n'
+
+
+def test_etag_matches_compressed_and_weak_forms():
+    etag = make_etag("dataset", 1, 3)
+
+    assert etag_matches(encoded_etag(etag, "gzip"), etag)
+    assert etag_matches(f'"other", W/{etag}', etag)
+    assert etag_matches("*", etag)
+    assert not etag_matches(make_etag("dataset", 1, 4), etag)
+    assert not etag_matches(None, etag)
@@ -0,0 +1,62 @@
+import asyncio
+import time
+from app.utils.deadline import (
+    current_deadline, deadline_scope, expired, gather_until_deadline, record_dropped, remaining,
+)
+
+
+def test_no_deadline_outside_scope():
+    assert current_deadline() is None
+    assert remaining() is None
+    assert remaining(default=5) == 5
+    assert not expired()
+    record_dropped(3)  # no-op
+
+
+def test_nested_scope_only_shortens_and_shares_dropped():
+    with deadline_scope(10) as outer:
+        with deadline_scope(60) as inner:
+            assert inner.expires_at == outer.expires_at
+            record_dropped(2)
+        with deadline_scope(0.5):
+            assert remaining() <= 0.5
+            record_dropped()
+        assert outer.dropped == 3
+    assert current_deadline() is None
+
+
+def test_expired_scope():
+    with deadline_scope(0):
+        assert expired()
+        assert remaining() == 0.0
+
+
+def test_gather_until_deadline_cancels_slow_tasks():
+    async def work(delay, value):
+        await asyncio.sleep(delay)
+        return value
+
+    async def fail():
+        raise ValueError("boom")
+
+    async def run():
+        with deadline_scope(0.1):
+            start = time.monotonic()
+            results = await gather_until_deadline(work(0, "fast"), work(5, "slow"), fail())
+            return results, time.monotonic() - start
+
+    (fast, slow, failed), elapsed = asyncio.run(run())
+    assert fast == "fast"
+    assert isinstance(slow, asyncio.CancelledError)
+    assert isinstance(failed, ValueError)
+    assert elapsed < 1
+
+
+def test_deadline_reaches_threads_and_tasks():
+    async def run():
+        with deadline_scope(30) as deadline:
+            await asyncio.to_thread(record_dropped, 2)
+            await asyncio.create_task(asyncio.to_thread(record_dropped))
+            return deadline.dropped
+
+    assert asyncio.run(run()) == 3
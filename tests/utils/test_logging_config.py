@@ -0,0 +1,69 @@
+import json
+import logging
+import os
+import sys
+
+import pytest
+
+from app.utils import logging_config
+from app.utils.logging_config import JsonFormatter, SamplingFilter, StructuredQueueHandler, parse_module_levels
+
+
+def make_record(level=logging.DEBUG, msg="verbs %s", args=(2,), **extra):
+    record = logging.LogRecord("app.test", level, __file__, 1, msg, args, None)
+    record.__dict__.update(extra)
+    return record
+
+
+def test_parse_module_levels():
+    assert parse_module_levels("app.service=debug, openai=WARNING,,broken") == {
+        "app.service": "DEBUG",
+        "openai": "WARNING",
+    }
+
+
+def test_json_formatter_includes_extra_fields():
+    entry = json.loads(JsonFormatter().format(make_record(verbs=[(1, ("was", "VBD"))])))
+
+    assert entry["level"] == "DEBUG"
+    assert entry["logger"] == "app.test"
+    assert entry["message"] == "verbs 2"
+    assert entry["verbs"] == [[1, ["was", "VBD"]]]
+
+
+def test_queue_handler_keeps_extra_fields_for_listener():
+    record = StructuredQueueHandler(None).prepare(make_record(verbs=["was"]))
+
+    assert record.msg == "verbs 2"
+    assert record.args is None
+    assert record.verbs == ["was"]
+
+
+def test_sampling_filter_keeps_warnings():
+    sampling = SamplingFilter(rate=0.0)
+
+    assert not sampling.filter(make_record(level=logging.DEBUG))
+    assert sampling.filter(make_record(level=logging.WARNING))
+
+
+@pytest.mark.skipif(not hasattr(os, "fork"), reason="needs fork")
+def test_forked_child_writes_its_records(tmp_path, monkeypatch):
+    log_file = tmp_path / "log.jsonl"
+    logging_config.shutdown_logging()
+    with open(log_file, "w", encoding="utf-8") as out:
+        monkeypatch.setattr(sys, "stdout", out)
+        logging_config.configure_logging()
+        try:
+            pid = os.fork()
+            if pid == 0:
+                logging.getLogger("app.test").warning("from the child")
+                logging_config.shutdown_logging()
+                os._exit(0)
+            os.waitpid(pid, 0)
+        finally:
+            logging_config.shutdown_logging()
+            monkeypatch.undo()
+            logging_config.configure_logging()
+
+    messages = [json.loads(line)["message"] for line in log_file.read_text(encoding="utf-8").splitlines()]
+    assert "from the child" in messages
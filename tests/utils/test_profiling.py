@@ -0,0 +1,42 @@
+import asyncio
+from app.utils.profiling import record_trace, span, traced
+
+
+def test_span_is_noop_without_trace():
+    with span("tokenize"):
+        pass
+
+
+def test_spans_recorded_into_trace():
+    @traced("pos_tag")
+    def tag():
+        return "tagged"
+
+    with record_trace("POST /api/quizzes/simple/from-text") as trace:
+        with span("tokenize"):
+            pass
+        assert tag() == "tagged"
+        with span("tokenize"):
+            pass
+
+    assert [s.name for s in trace.spans] == ["tokenize", "pos_tag", "tokenize"]
+    assert set(trace.totals_ms()) == {"tokenize", "pos_tag"}
+
+    events = trace.to_chrome_trace()["traceEvents"]
+    assert events[0]["name"] == "POST /api/quizzes/simple/from-text"
+    assert all(e["ph"] == "X" and e["dur"] >= 0 for e in events)
+
+
+def test_async_spans_recorded_from_tasks():
+    @traced("llm")
+    async def call_llm():
+        await asyncio.sleep(0)
+
+    async def run():
+        await asyncio.gather(call_llm(), call_llm())
+
+    with record_trace("POST /api/quizzes/context/from-text") as trace:
+        asyncio.run(run())
+
+    assert [s.name for s in trace.spans] == ["llm", "llm"]
+    assert trace.spans[0].track != trace.spans[1].track
@@ -0,0 +1,38 @@
+from app.api.response_cache import ResponseCache, cache_key
+
+
+def test_cache_key_depends_on_every_param():
+    params = {"input": "Alice was tired.", "limit": 3, "seed": 1}
+
+    assert cache_key("simple", params) == cache_key("simple", dict(reversed(params.items())))
+    assert cache_key("simple", params) != cache_key("sequence", params)
+    assert cache_key("simple", params) != cache_key("simple", {**params, "seed": 2})
+
+
+def test_evicts_least_recently_used_by_size():
+    cache = ResponseCache(max_bytes=30, max_entry_bytes=30)
+    cache.put("a", b"x" * 9)
+    cache.put("b", b"x" * 9)
+    cache.put("c", b"x" * 9)
+    cache.get("a")
+
+    cache.put("d", b"x" * 9)
+
+    assert cache.get("b") is None
+    assert cache.get("a") is not None
+    assert cache.size_bytes == 30
+    assert cache.evictions == 1
+
+
+def test_replacing_an_entry_keeps_size_accurate():
+    cache = ResponseCache(max_bytes=100)
+    cache.put("a", b"x" * 10)
+    cache.put("a", b"x" * 4)
+
+    assert len(cache) == 1
+    assert cache.size_bytes == 5
+
+
+def test_skips_oversized_entries_and_disabled_cache():
+    assert not ResponseCache(max_bytes=100, max_entry_bytes=10).put("a", b"x" * 20)
+    assert not ResponseCache(max_bytes=0).put("a", b"x")
@@ -0,0 +1,43 @@
+import pytest
+from app.utils.text_utils import sentence_spans, split_into_sentences
+
+
+@pytest.mark.parametrize("text, expected", [
+    ("", []),
+    ("Alice was tired. She had peeped into the book.", ["Alice was tired.", "She had peeped into the book."]),
+    ("Mr. Smith met Dr. Jones at St. Paul's. They talked.", ["Mr. Smith met Dr. Jones at St. Paul's.", "They talked."]),
+    ("Bring fruit, e.g. apples. Then leave.", ["Bring fruit, e.g. apples.", "Then leave."]),
+    ("It was written by J. R. R. Tolkien. I liked it.", ["It was written by J. R. R. Tolkien.", "I liked it."]),
+    ("So did I. Then we left.", ["So did I.", "Then we left."]),
+    ('"Oh dear! Oh dear! I shall be late!" said the Rabbit.', ['"Oh dear!', 'Oh dear!', 'I shall be late!" said the Rabbit.']),
+    ("'And what is the use of a book,' thought Alice 'without pictures?' Nobody knew.", ["'And what is the use of a book,' thought Alice 'without pictures?'", "Nobody knew."]),
+    ("Down, down, down... Would the fall never end?", ["Down, down, down...", "Would the fall never end?"]),
+    ("  No terminal punctuation  ", ["No terminal punctuation"]),
+    ("It costs 3.50 dollars. Cheap!", ["It costs 3.50 dollars.", "Cheap!"]),
+    ("John F. Kennedy spoke. Then he left.", ["John F. Kennedy spoke.", "Then he left."]),
+    ("See No. 5 and Mar. 3 in vol. 2, pp. 10-12. Done.", ["See No. 5 and Mar. 3 in vol. 2, pp. 10-12.", "Done."]),
+])
+def test_split_into_sentences(text, expected):
+    assert split_into_sentences(text) == expected
+
+
+def test_sentence_spans_point_into_original_text():
+    text = "  First one.\n\nSecond one!  "
+    spans = sentence_spans(text)
+
+    assert spans == [(2, 12), (14, 25)]
+    assert [text[s:e] for s, e in spans] == ["First one.", "Second one!"]
+
+
+@pytest.mark.parametrize("text", [
+    "The answer was no. She left.",
+    "He was in Mar. The rest followed.",
+    "It cost 5 dollars, est. The end came.",
+    "Look at the fig. It was ripe.",
+    "Turn up the vol. Everyone cheered.",
+    "We chose plan B. Then we left.",
+    "They sold it to Acme Co. The deal closed.",
+    "The sun rose at 6 a.m. Nobody was awake.",
+])
+def test_ordinary_words_ending_a_sentence_are_not_abbreviations(text):
+    assert len(split_into_sentences(text)) == 2